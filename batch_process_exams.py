@@ -27,8 +27,11 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # 导入数据处理器
 from src.data_processor import DataProcessor
+from src.cli_options import add_runtime_options, apply_runtime_options, check_runtime_models
 
-def process_exam_file(input_file, output_dir=None, model_name=None, save_debug=False):
+def process_exam_file(input_file, output_dir=None, model_name=None, save_debug=False, hedge_policy=None,
+                      router=None, parquet_dir=None, corpus_db=None, passage_dir=None, csv_passage_refs=False,
+                      stage_pool=None):
     """
     处理单个考研英语真题文件
     
@@ -37,6 +40,13 @@ def process_exam_file(input_file, output_dir=None, model_name=None, save_debug=F
         output_dir: 输出目录，如果为None则自动根据年份创建
         model_name: 模型名称
         save_debug: 是否保存调试信息
+        hedge_policy: 可选的对冲策略（HedgePolicy）
+        router: 可选的模型路由器（ModelRouter）
+        parquet_dir: 可选的Parquet数据集目录，结果会追加到该数据集
+        corpus_db: 可选的语料库数据库路径，处理完成后增量更新该试卷
+        passage_dir: 可选的原文存储目录，分析JSON中的原文以引用形式保存
+        csv_passage_refs: 是否在CSV中也使用原文引用（需要passage_dir）
+        stage_pool: 可选的本地处理进程池（StagePool），文档读取和数据组织在工作进程中执行
     
     Returns:
         tuple: (是否成功, CSV文件路径, 处理时间)
@@ -72,13 +82,16 @@ def process_exam_file(input_file, output_dir=None, model_name=None, save_debug=F
         logger.warning(f"未知的文件类型: {file_extension}，尝试作为文本文件处理")
     
     # 初始化数据处理器
-    processor = DataProcessor(model_name=model_name)
+    processor = DataProcessor(model_name=model_name, hedge_policy=hedge_policy, router=router,
+                              parquet_dir=parquet_dir, corpus_db=corpus_db, passage_dir=passage_dir,
+                              csv_passage_refs=csv_passage_refs)
     
     # 处理文档
     success, csv_path, process_time = processor.process_document(
         document_path=input_file,
         output_dir=output_dir,
-        save_debug=save_debug
+        save_debug=save_debug,
+        stage_pool=stage_pool
     )
     
     # 处理结果
@@ -92,7 +105,8 @@ def process_exam_file(input_file, output_dir=None, model_name=None, save_debug=F
     return success, csv_path, process_time
 
 def batch_process_directory(input_dir, output_base_dir="test_results", model_name=None, 
-                          file_pattern="*.docx;*.txt", save_debug=False):
+                          file_pattern="*.docx;*.txt", save_debug=False, hedge_policy=None, router=None,
+                          parquet_dir=None, corpus_db=None, passage_dir=None, csv_passage_refs=False, workers=1):
     """
     批量处理目录下的所有考研英语真题文件
     
@@ -102,6 +116,14 @@ def batch_process_directory(input_dir, output_base_dir="test_results", model_nam
         model_name: 模型名称
         file_pattern: 文件匹配模式，多个模式用分号分隔
         save_debug: 是否保存调试信息
+        hedge_policy: 可选的对冲策略（HedgePolicy），在整个批次中共享延迟历史
+        router: 可选的模型路由器（ModelRouter），路由会随批次中积累的统计不断调整
+        parquet_dir: 可选的Parquet数据集目录，每份试卷的结果会追加到该数据集
+        corpus_db: 可选的语料库数据库路径，每份试卷处理完成后增量更新
+        passage_dir: 可选的原文存储目录，整个批次共享，相同原文只保存一次
+        csv_passage_refs: 是否在CSV中也使用原文引用（需要passage_dir）
+        workers: 并行处理的文件数；大于1时API请求在线程中并发，
+                 docx解析、数据组织和句子拆分在常驻进程池中执行
     
     Returns:
         list: 处理结果列表
@@ -123,11 +145,7 @@ def batch_process_directory(input_dir, output_base_dir="test_results", model_nam
     
     logger.info(f"找到 {len(all_files)} 个匹配的文件")
     
-    # 处理结果
-    results = []
-    
-    # 处理每个文件
-    for file_path in all_files:
+    def process_one(file_path, stage_pool=None):
         # 尝试从文件名中提取年份
         file_name = os.path.basename(file_path)
         year_match = re.search(r'(\d{4})', file_name)
@@ -141,17 +159,35 @@ def batch_process_directory(input_dir, output_base_dir="test_results", model_nam
             input_file=file_path,
             output_dir=output_dir,
             model_name=model_name,
-            save_debug=save_debug
+            save_debug=save_debug,
+            hedge_policy=hedge_policy,
+            router=router,
+            parquet_dir=parquet_dir,
+            corpus_db=corpus_db,
+            passage_dir=passage_dir,
+            csv_passage_refs=csv_passage_refs,
+            stage_pool=stage_pool
         )
         
         # 记录结果
-        results.append({
+        return {
             "file": file_name,
             "year": year,
             "success": success,
             "csv_path": csv_path,
             "process_time": process_time
-        })
+        }
+    
+    # 处理每个文件
+    if workers > 1 and len(all_files) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        from src.stage_pool import StagePool
+        
+        with StagePool(workers=workers, passage_dir=passage_dir) as stage_pool, \
+                ThreadPoolExecutor(max_workers=workers) as threads:
+            results = list(threads.map(lambda path: process_one(path, stage_pool), all_files))
+    else:
+        results = [process_one(file_path) for file_path in all_files]
     
     # 输出汇总信息
     successful = sum(1 for r in results if r["success"])
@@ -168,6 +204,89 @@ def batch_process_directory(input_dir, output_base_dir="test_results", model_nam
     
     return results
 
+def plan_batch(input_path, model_name=None, file_pattern="*.docx;*.txt", router=None, workers=1):
+    """
+    离线预估文件或目录中每个文档、每个分段的token数、花费和耗时，并打印提取计划（--plan）
+    
+    Args:
+        input_path: 输入文件或目录
+        model_name: 模型名称
+        file_pattern: 目录的文件匹配模式，多个模式用分号分隔
+        router: 可选的模型路由器（ModelRouter），每个分段按路由结果选择模型
+        workers: 并行处理的文件数，用于估算批次总耗时
+    
+    Returns:
+        int: 退出码，全部文件均可读取时为0
+    """
+    from src.extraction_plan import ExtractionPlanner, format_plan
+    
+    if os.path.isdir(input_path):
+        all_files = []
+        for pattern in file_pattern.split(';'):
+            all_files.extend(glob.glob(os.path.join(input_path, pattern.strip())))
+        all_files = sorted(set(all_files))
+    else:
+        all_files = [input_path]
+    
+    planner = ExtractionPlanner(model=model_name, router=router)
+    plans = [planner.plan_file(file_path) for file_path in all_files]
+    readable = [plan for plan in plans if plan is not None]
+    print(format_plan(readable, workers=workers))
+    return 0 if len(readable) == len(plans) else 1
+
+def watch_directory(input_dir, output_base_dir="test_results", model_name=None,
+                    file_pattern="*.docx;*.txt", save_debug=False, hedge_policy=None, router=None,
+                    parquet_dir=None, corpus_db=None, passage_dir=None, csv_passage_refs=False, workers=1,
+                    poll_interval=2.0):
+    """
+    持续监视目录，新到达或被修改的真题文件写入完成后立即处理
+    
+    进程池和线程池在整个监视期间常驻，新文件无需重新启动解释器和加载依赖。
+    已处理文件的记录保存在输出目录的.watch_state.json中，重启后不会重复处理。
+    
+    Args:
+        input_dir: 监视的输入目录
+        output_base_dir: 输出基础目录，结果按年份写入子目录
+        workers: 同时处理的文件数
+        poll_interval: inotify不可用时的轮询间隔（秒）
+        其余参数同batch_process_directory
+    """
+    from src.stage_pool import StagePool
+    from src.watcher import FolderWatcher
+    
+    os.makedirs(output_base_dir, exist_ok=True)
+    
+    with StagePool(workers=workers, passage_dir=passage_dir) as stage_pool:
+        def handle(file_path):
+            file_name = os.path.basename(file_path)
+            year_match = re.search(r'(\d{4})', file_name)
+            year = year_match.group(1) if year_match else "unknown"
+            
+            success, _, _ = process_exam_file(
+                input_file=file_path,
+                output_dir=os.path.join(output_base_dir, year),
+                model_name=model_name,
+                save_debug=save_debug,
+                hedge_policy=hedge_policy,
+                router=router,
+                parquet_dir=parquet_dir,
+                corpus_db=corpus_db,
+                passage_dir=passage_dir,
+                csv_passage_refs=csv_passage_refs,
+                stage_pool=stage_pool
+            )
+            return success
+        
+        watcher = FolderWatcher(
+            input_dir,
+            handle,
+            file_pattern=file_pattern,
+            workers=workers,
+            poll_interval=poll_interval,
+            state_path=os.path.join(output_base_dir, ".watch_state.json")
+        )
+        watcher.run()
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="考研英语真题批量处理工具")
@@ -178,6 +297,12 @@ def main():
     parser.add_argument('--pattern', '-p', default="*.docx;*.txt", help="文件匹配模式，多种格式用分号分隔")
     parser.add_argument('--debug', '-d', action='store_true', help="保存调试信息")
     parser.add_argument('--year', '-y', help="手动指定年份（单文件处理时）")
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help="批量模式下并行处理的文件数（默认1）；API请求走线程，docx解析和句子拆分走进程池")
+    parser.add_argument('--watch', action='store_true', help="监视模式：持续监视输入目录，处理新到达或被修改的文件（Ctrl+C退出）")
+    parser.add_argument('--plan', action='store_true', help="只预估每个文件、每个分段的token数、花费和耗时，不调用API（离线）")
+    parser.add_argument('--poll-interval', type=float, default=2.0, help="监视模式下inotify不可用时的轮询间隔（秒，默认2）")
+    add_runtime_options(parser)
     
     # 细节说明
     parser.epilog = """
@@ -191,8 +316,14 @@ def main():
   # 批量处理目录下的所有docx和txt文件
   python batch_process_exams.py --batch --input ./exams/ --pattern "*.docx;*.txt" --debug
   
+  # 监视目录，新文件到达后自动处理（结果按年份写入输出目录）
+  python batch_process_exams.py --watch --input ./inbox/ --workers 2
+  
+  # 批次开始前离线预估token数、花费和耗时（不调用API）
+  python batch_process_exams.py --batch --input ./exams/ --plan --workers 2
+  
   # 使用特定模型处理
-  python batch_process_exams.py --input 2023年考研英语.docx --model anthropic/claude-3-5-sonnet
+  python batch_process_exams.py --input 2023年考研英语.docx --model anthropic/claude-3.5-sonnet
   
 功能说明:
   - 自动识别docx和txt格式的考研英语真题文件
@@ -213,6 +344,41 @@ def main():
         logger.error(f"输入路径不存在: {args.input}")
         return 1
     
+    # 运行时选项（写入环境变量，进程池中的工作进程使用相同设置），对冲策略和模型路由在整个批次中共享
+    hedge_policy, router = apply_runtime_options(parser, args)
+    
+    # 预估模式：只输出提取计划，不校验模型也不调用API
+    if args.plan:
+        return plan_batch(args.input, model_name=args.model, file_pattern=args.pattern,
+                          router=router, workers=args.workers)
+    
+    # 在读取文档之前校验模型ID（模型目录缓存有效时不产生网络请求）
+    if not check_runtime_models(args, hedge_policy, router):
+        return 1
+    
+    # 监视模式
+    if args.watch:
+        if not os.path.isdir(args.input):
+            logger.error(f"监视模式需要指定目录: {args.input}")
+            return 1
+        
+        watch_directory(
+            input_dir=args.input,
+            output_base_dir=args.output_dir,
+            model_name=args.model,
+            file_pattern=args.pattern,
+            save_debug=args.debug,
+            hedge_policy=hedge_policy,
+            router=router,
+            parquet_dir=args.parquet_dir,
+            corpus_db=args.corpus_db,
+            passage_dir=args.passage_store,
+            csv_passage_refs=args.csv_passage_refs,
+            workers=args.workers,
+            poll_interval=args.poll_interval
+        )
+        return 0
+    
     # 批量处理模式
     if args.batch or os.path.isdir(args.input):
         if not os.path.isdir(args.input):
@@ -224,7 +390,14 @@ def main():
             output_base_dir=args.output_dir,
             model_name=args.model,
             file_pattern=args.pattern,
-            save_debug=args.debug
+            save_debug=args.debug,
+            hedge_policy=hedge_policy,
+            router=router,
+            parquet_dir=args.parquet_dir,
+            corpus_db=args.corpus_db,
+            passage_dir=args.passage_store,
+            csv_passage_refs=args.csv_passage_refs,
+            workers=args.workers
         )
         
         # 返回成功与否
@@ -241,7 +414,13 @@ def main():
             input_file=args.input,
             output_dir=output_dir,
             model_name=args.model,
-            save_debug=args.debug
+            save_debug=args.debug,
+            hedge_policy=hedge_policy,
+            router=router,
+            parquet_dir=args.parquet_dir,
+            corpus_db=args.corpus_db,
+            passage_dir=args.passage_store,
+            csv_passage_refs=args.csv_passage_refs
         )
         
         return 0 if success else 1
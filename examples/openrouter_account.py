@@ -19,6 +19,7 @@ from dotenv import load_dotenv
 # 添加父目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.openrouter_api import OpenRouterAPI
+from src.model_catalog import get_model_catalog
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -44,23 +45,17 @@ class OpenRouterAccount:
             "Content-Type": "application/json"
         }
     
-    def get_models(self):
-        """获取可用模型列表"""
+    def get_models(self, force_refresh=False):
+        """获取可用模型列表（使用带TTL的本地缓存）"""
         logger.info("获取可用模型列表...")
         
         try:
-            response = requests.get(
-                f"{self.base_url}/models",
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("data", [])
-            else:
-                logger.error(f"获取模型列表失败，状态码: {response.status_code}")
-                logger.error(f"错误详情: {response.text}")
-                return []
+            catalog = get_model_catalog()
+            if catalog.load(force_refresh=force_refresh):
+                logger.info(f"模型列表来源: {catalog.source}")
+                return catalog.models()
+            logger.error("获取模型列表失败")
+            return []
                 
         except Exception as e:
             logger.exception(f"获取模型列表时出错: {str(e)}")
@@ -135,8 +130,9 @@ def format_model_list(models):
     for model in models:
         context_length = model.get("context_length", "未知")
         pricing = model.get("pricing", {})
-        input_price = pricing.get("input", 0) * 1000  # 转换为每1000个token的价格
-        output_price = pricing.get("output", 0) * 1000
+        # /models接口返回的价格为每个token的美元价格（字符串）
+        input_price = float(pricing.get("prompt") or 0) * 1000  # 转换为每1000个token的价格
+        output_price = float(pricing.get("completion") or 0) * 1000
         
         table_data.append([
             model.get("id", "未知"),
@@ -170,6 +166,7 @@ def main():
     parser.add_argument("--usage", action="store_true", help="获取使用情况")
     parser.add_argument("--test", action="store_true", help="测试API连接")
     parser.add_argument("--all", action="store_true", help="显示所有信息")
+    parser.add_argument("--refresh", action="store_true", help="忽略本地缓存，重新获取模型列表")
     
     args = parser.parse_args()
     
@@ -191,7 +188,7 @@ def main():
             print(f"\nAPI连接测试: {'成功' if test_result else '失败'}")
             
         if args.all or args.models:
-            models = account.get_models()
+            models = account.get_models(force_refresh=args.refresh)
             print("\n=== 可用模型列表 ===")
             print(format_model_list(models))
             
@@ -16,6 +16,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.content_analyzer import ContentAnalyzer
 from src.data_organizer import DataOrganizer
+from src.question_record import to_rows
 from src.csv_generator import CSVGenerator
 
 def setup_logging(level="info"):
@@ -177,7 +178,7 @@ def process_and_save_mock_data(output_dir="./test_results"):
         # 保存组织后的数据
         organized_data_file = os.path.join(output_dir, "organized_original_text_data.json")
         with open(organized_data_file, "w", encoding="utf-8") as f:
-            json.dump(organized_data, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(organized_data), f, ensure_ascii=False, indent=2)
         logger.info(f"组织后的数据已保存到: {organized_data_file}")
         
         # 生成CSV文件
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试命令行启动时间
+此脚本基于python -X importtime检查入口模块的导入耗时，
+并确认pandas、nltk、docx、requests等较重的依赖没有在启动时被导入
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import subprocess
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("test_import_time")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块
+ENTRY_MODULES = ["src.main", "src.data_processor", "batch_process_exams"]
+
+# 启动时不应导入的较重依赖
+HEAVY_MODULES = ["pandas", "nltk", "docx", "requests"]
+
+def measure_import(module):
+    """
+    使用-X importtime测量模块的导入耗时
+
+    Args:
+        module: 模块名
+
+    Returns:
+        tuple: (自身累计导入耗时（毫秒）, 导入的顶层模块集合)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    cumulative_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        name = parts[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(parts[1].strip())
+    return cumulative_us / 1000.0, imported
+
+def measure_command(args, runs=5):
+    """
+    测量命令的最短墙钟耗时（毫秒）
+
+    Args:
+        args: 命令参数列表
+        runs: 运行次数
+
+    Returns:
+        float: 最短耗时
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=PROJECT_ROOT, capture_output=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    """程序主入口"""
+    parser = argparse.ArgumentParser(description="测试命令行启动时间")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="--list-models相对于空解释器启动的额外耗时上限（毫秒）")
+    args = parser.parse_args()
+
+    success = True
+
+    for module in ENTRY_MODULES:
+        import_ms, imported = measure_import(module)
+        heavy = [m for m in HEAVY_MODULES if m in imported]
+        logger.info(f"{module}: 导入耗时 {import_ms:.1f} ms")
+        if heavy:
+            logger.error(f"{module} 在导入时加载了较重的依赖: {', '.join(heavy)}")
+            success = False
+
+    baseline_ms = measure_command([sys.executable, "-c", "pass"])
+    list_models_ms = measure_command([sys.executable, "-m", "src.main", "--list-models"])
+    overhead_ms = list_models_ms - baseline_ms
+    logger.info(f"空解释器启动: {baseline_ms:.1f} ms，--list-models: {list_models_ms:.1f} ms，"
+                f"额外耗时: {overhead_ms:.1f} ms（上限 {args.budget_ms:.0f} ms）")
+    if overhead_ms > args.budget_ms:
+        logger.error("--list-models启动耗时超出上限")
+        success = False
+
+    if success:
+        logger.info("测试完成，启动耗时符合要求")
+    else:
+        logger.error("测试失败，启动路径中存在较慢的导入")
+
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
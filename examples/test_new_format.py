@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 导入工具模块
 from src.data_organizer import DataOrganizer
+from src.question_record import to_rows
 from src.content_analyzer import ContentAnalyzer
 from src.csv_generator import CSVGenerator
 from src.utils import setup_logging, ensure_directory_exists
@@ -131,7 +132,7 @@ def test_data_processing(output_dir="./test_results"):
         # 保存组织后的数据
         organized_data_file = os.path.join(output_dir, "organized_data.json")
         with open(organized_data_file, "w", encoding="utf-8") as f:
-            json.dump(organized_data, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(organized_data), f, ensure_ascii=False, indent=2)
         logger.info(f"组织后的数据已保存到: {organized_data_file}")
         
         # 生成CSV文件
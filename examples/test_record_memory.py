@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试题目记录（QuestionRecord）的内存占用
+此脚本把一份已保存的提取结果复制为多份试卷（模拟大型语料库），分别测量：
+1. 题目记录：同一篇原文的题目共享Passage对象，句子拆分按原文执行一次
+2. 逐行字典：每道题一个12键字典，句子拆分逐行执行（之前的数据表示方式）
+两种方式输出的数据行必须一致
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+
+# 配置日志
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("test_record_memory")
+logger.setLevel(logging.INFO)
+
+# 添加父目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_organizer import DataOrganizer
+from src.sentence_splitter import split_sentences
+from src.question_record import to_rows
+
+def load_papers(input_file, copies):
+    """读取提取结果并复制为多份独立的试卷数据（每份的字符串互不共享）"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    papers = []
+    for i in range(copies):
+        data = json.loads(text)
+        if "result" in data:
+            data = data["result"]
+        data.setdefault("metadata", {})["year"] = str(1000 + i)
+        papers.append(data)
+    return papers
+
+def organize_records(papers):
+    """使用题目记录组织全部试卷"""
+    organizer = DataOrganizer()
+    corpus = []
+    for paper in papers:
+        records = organizer.ensure_complete_dataset(organizer.organize_data(paper))
+        corpus.extend(organizer.apply_sentence_splitter(records, split_sentences))
+    return corpus
+
+def organize_dicts(papers):
+    """使用逐行字典组织全部试卷（每行单独拆分句子）"""
+    organizer = DataOrganizer()
+    corpus = []
+    for paper in papers:
+        rows = to_rows(organizer.ensure_complete_dataset(organizer.organize_data(paper)))
+        corpus.extend(organizer.apply_sentence_splitter(rows, split_sentences))
+    return corpus
+
+def measure(func, papers):
+    """返回(结果, 结果占用的内存字节数, 耗时)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+    result = func(papers)
+    elapsed = time.time() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def main():
+    """程序主入口"""
+    parser = argparse.ArgumentParser(description="测试题目记录的内存占用")
+    parser.add_argument("--input", required=True, help="已保存的提取结果JSON（extraction_result_*.json）")
+    parser.add_argument("--copies", type=int, default=200, help="模拟的试卷份数")
+    args = parser.parse_args()
+
+    # 预热：导入句子拆分器等依赖，避免把模块加载计入第一次测量
+    organize_dicts(load_papers(args.input, 1))
+
+    records, record_bytes, record_time = measure(organize_records, load_papers(args.input, args.copies))
+    logger.info(f"题目记录: {len(records)} 行，{record_bytes / 1024 / 1024:.1f} MB，耗时 {record_time:.2f} 秒")
+
+    rows, dict_bytes, dict_time = measure(organize_dicts, load_papers(args.input, args.copies))
+    logger.info(f"逐行字典: {len(rows)} 行，{dict_bytes / 1024 / 1024:.1f} MB，耗时 {dict_time:.2f} 秒")
+
+    logger.info(f"内存减少 {(1 - record_bytes / dict_bytes) * 100:.0f}%")
+
+    success = to_rows(records) == rows
+    if success:
+        logger.info("测试完成，两种表示方式输出的数据行一致")
+    else:
+        logger.error("测试失败，两种表示方式输出的数据行不一致")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试请求去重和持久化响应缓存
+此脚本使用模拟的HTTP会话（不调用API），检查：
+1. 并发的相同请求只发出一次网络请求，各调用方得到互不共享的结果对象
+2. 无法解析的响应不写入缓存，之后的相同请求重新调用API；成功解析的响应写入缓存并被复用
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+
+# 配置日志
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("test_response_cache")
+logger.setLevel(logging.INFO)
+
+# 添加父目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import response_cache
+from src.model_config import ModelStatsStore
+from src.openrouter_handler import OpenRouterHandler
+
+VALID_REPLY = '{"metadata": {}, "sections": {}, "questions": [{"number": 1}]}'
+
+class MockResponse:
+    """模拟的API响应"""
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}, "finish_reason": "stop"}]}
+
+class MockSession:
+    """按顺序返回预设回答的模拟会话，记录发出的请求数"""
+
+    def __init__(self, replies, delay=0.0):
+        self.replies = list(replies)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+            content = self.replies.pop(0)
+        time.sleep(self.delay)
+        return MockResponse(content)
+
+def create_handler():
+    """创建不持久化调用统计的处理器"""
+    return OpenRouterHandler(model="mock/model", api_key="mock_key", stats=ModelStatsStore(path=None))
+
+def test_single_flight(callers=5, output_dir=None):
+    """并发的相同请求只发出一次网络请求"""
+    handler = create_handler()
+    session = MockSession([VALID_REPLY], delay=0.5)
+    results = [None] * callers
+
+    def call(index):
+        results[index] = handler.get_structured_data("并发测试提示词", output_dir=output_dir, session=session)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    complete = all(result is not None and len(result["questions"]) == 1 for result in results)
+    # 修改一个调用方的结果不影响其他调用方
+    results[0]["questions"].append({"number": 2})
+    unaliased = all(len(result["questions"]) == 1 for result in results[1:])
+    logger.info(f"{callers} 个并发的相同请求发出 {session.calls} 次网络请求，"
+                f"结果完整: {complete}，结果对象互不共享: {unaliased}")
+    return session.calls == 1 and complete and unaliased
+
+def test_unparseable_not_cached(output_dir=None):
+    """无法解析的响应不写入缓存，成功解析的响应写入缓存并被复用"""
+    cache_dir = tempfile.mkdtemp(prefix="response_cache_")
+    handler = create_handler()
+    session = MockSession(["这不是JSON", VALID_REPLY])
+
+    def cached_files():
+        return [name for _, _, names in os.walk(cache_dir) for name in names]
+
+    previous_dir = response_cache.RESPONSE_CACHE_DIR
+    response_cache.RESPONSE_CACHE_DIR = cache_dir
+    try:
+        # 无法解析的响应：返回空结构，不写入缓存
+        result = handler.get_structured_data("缓存测试提示词", output_dir=output_dir, session=session)
+        not_cached = result["questions"] == [] and not cached_files()
+        logger.info(f"无法解析的响应没有写入缓存: {not_cached}")
+
+        # 相同的请求重新调用API，解析成功后写入缓存
+        result = handler.get_structured_data("缓存测试提示词", output_dir=output_dir, session=session)
+        retried = session.calls == 2 and len(result["questions"]) == 1 and len(cached_files()) == 1
+        logger.info(f"相同的请求重新调用了API，解析成功后写入缓存: {retried}")
+
+        # 再次请求直接使用缓存的响应
+        result = handler.get_structured_data("缓存测试提示词", output_dir=output_dir, session=session)
+        reused = session.calls == 2 and len(result["questions"]) == 1
+        logger.info(f"第三次请求使用了缓存的响应: {reused}")
+    finally:
+        response_cache.RESPONSE_CACHE_DIR = previous_dir
+
+    return not_cached and retried and reused
+
+def main():
+    """程序主入口"""
+    # 调试输出写入临时目录
+    output_dir = tempfile.mkdtemp(prefix="response_cache_debug_")
+    success = test_single_flight(output_dir=output_dir) and test_unparseable_not_cached(output_dir=output_dir)
+    if success:
+        logger.info("测试完成，请求去重和响应缓存工作正常")
+    else:
+        logger.error("测试失败")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试句子拆分引擎的一致性和速度
+此脚本从已保存的结果（CSV和organized_data_*.json）中读取原文（还原后）及当时用Punkt
+生成的句子拆解结果，检查：
+1. regex引擎的输出与已保存的Punkt结果一致
+2. 两种引擎的拆分速度（punkt引擎需要本地已有NLTK punkt数据，否则跳过）
+3. punkt数据可用时，两种引擎在全部原文上的输出一致
+"""
+
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import logging
+import argparse
+
+# 配置日志
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("test_sentence_splitter")
+logger.setLevel(logging.INFO)
+
+# 添加父目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sentence_splitter import RegexSentenceSplitter, SentenceSplitter
+
+def load_fixtures(results_dir):
+    """读取已保存结果中的 原文（还原后） -> 原文（句子拆解后） 对照"""
+    fixtures = {}
+    paths = glob.glob(os.path.join(results_dir, "**", "*.csv"), recursive=True)
+    paths += glob.glob(os.path.join(results_dir, "**", "organized_data_*.json"), recursive=True)
+    for path in sorted(paths):
+        if path.endswith(".csv"):
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                rows = list(csv.DictReader(f))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+        for row in rows:
+            text = row.get("原文（还原后）", "")
+            split = row.get("原文（句子拆解后）", "")
+            # 拆分失败时保存的是原文本身，不能作为对照
+            if text and split and split != text:
+                fixtures[text] = split
+    return fixtures
+
+def punkt_available():
+    """检查本地是否有NLTK punkt数据（不触发下载）"""
+    try:
+        import nltk
+        nltk.data.find('tokenizers/punkt')
+        return True
+    except LookupError:
+        return False
+
+def benchmark(splitter, texts, rounds):
+    """返回(输出列表, 每篇原文的平均耗时毫秒)"""
+    outputs = [splitter.split_text(text) for text in texts]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            splitter.split_text(text)
+    elapsed = time.perf_counter() - start
+    return outputs, elapsed * 1000 / (rounds * len(texts))
+
+def main():
+    """程序主入口"""
+    parser = argparse.ArgumentParser(description="测试句子拆分引擎的一致性和速度")
+    parser.add_argument("--results-dir", default="test_results", help="已保存结果的目录")
+    parser.add_argument("--rounds", type=int, default=200, help="计时的重复次数")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.results_dir)
+    if not fixtures:
+        logger.error(f"{args.results_dir} 中没有找到句子拆解结果")
+        return 1
+    texts = list(fixtures)
+    logger.info(f"读取 {len(texts)} 篇原文，共 {sum(len(text) for text in texts)} 个字符")
+
+    regex_outputs, regex_ms = benchmark(RegexSentenceSplitter(), texts, args.rounds)
+    logger.info(f"regex引擎: 每篇 {regex_ms:.3f} 毫秒")
+
+    mismatches = [text for text, output in zip(texts, regex_outputs) if output != fixtures[text]]
+    for text in mismatches:
+        logger.error(f"与已保存的Punkt结果不一致: {text[:60]!r}")
+    logger.info(f"与已保存的Punkt结果一致: {len(texts) - len(mismatches)}/{len(texts)}")
+    success = not mismatches
+
+    if punkt_available():
+        punkt_outputs, punkt_ms = benchmark(SentenceSplitter(), texts, args.rounds)
+        logger.info(f"punkt引擎: 每篇 {punkt_ms:.3f} 毫秒，regex引擎快 {punkt_ms / regex_ms:.1f} 倍")
+        same = sum(1 for a, b in zip(regex_outputs, punkt_outputs) if a == b)
+        logger.info(f"两种引擎输出一致: {same}/{len(texts)}")
+        success = success and same == len(texts)
+    else:
+        logger.warning("本地没有NLTK punkt数据，跳过punkt引擎计时（可运行 python -m nltk.downloader punkt）")
+
+    if success:
+        logger.info("测试完成，regex引擎的拆分结果与Punkt一致")
+    else:
+        logger.error("测试失败，regex引擎的拆分结果与Punkt不一致")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
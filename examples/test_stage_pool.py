@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试本地处理进程池的吞吐量
+此脚本使用已保存的提取结果重复执行数据组织和句子拆分（不调用API），
+比较单进程顺序处理与StagePool并行处理的耗时
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+# 配置日志
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("test_stage_pool")
+logger.setLevel(logging.INFO)
+
+# 添加父目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_organizer import DataOrganizer
+from src.sentence_splitter import split_sentences
+from src.stage_pool import StagePool
+
+def organize_serial(results):
+    """在当前进程中顺序组织数据"""
+    organizer = DataOrganizer()
+    processed = []
+    for result in results:
+        processed.append(organizer.postprocess(result, split_sentences))
+    return processed
+
+def organize_pooled(results, workers):
+    """使用StagePool并行组织数据"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with StagePool(workers=workers) as pool:
+        # 预热：确保所有工作进程已完成初始化
+        list(pool.executor.map(abs, range(workers)))
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            processed = list(threads.map(pool.organize, results))
+        return processed, time.time() - start
+
+def main():
+    """程序主入口"""
+    parser = argparse.ArgumentParser(description="测试本地处理进程池的吞吐量")
+    parser.add_argument("--input", required=True, help="已保存的提取结果JSON（extraction_result_*.json）")
+    parser.add_argument("--copies", type=int, default=32, help="重复处理的份数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="工作进程数")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+    results = [result] * args.copies
+
+    start = time.time()
+    serial = organize_serial(results)
+    serial_time = time.time() - start
+    logger.info(f"顺序处理 {args.copies} 份: {serial_time:.2f} 秒")
+
+    pooled, pooled_time = organize_pooled(results, args.workers)
+    logger.info(f"进程池处理 {args.copies} 份（{args.workers} 个工作进程）: {pooled_time:.2f} 秒，"
+                f"加速比 {serial_time / pooled_time:.1f}x")
+
+    success = serial == pooled
+    if success:
+        logger.info("测试完成，进程池结果与顺序处理一致")
+    else:
+        logger.error("测试失败，进程池结果与顺序处理不一致")
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -134,7 +134,7 @@ def main():
   python process_exam.py kaoyan_english.txt --year 2021
   
   # 指定输出目录和使用特定模型
-  python process_exam.py 2023年考研英语.docx --output-dir my_results/2023 --model anthropic/claude-3-5-sonnet
+  python process_exam.py 2023年考研英语.docx --output-dir my_results/2023 --model anthropic/claude-3.5-sonnet
     """
     
     args = parser.parse_args()
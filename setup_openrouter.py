@@ -15,6 +15,7 @@ from dotenv import load_dotenv, set_key, find_dotenv
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from src.model_config import list_available_models, get_free_models, get_model
 from src.openrouter_api import OPENROUTER_API_URL, OPENROUTER_MODELS_API_URL
+from src.model_catalog import validate_models
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -93,9 +94,17 @@ def main():
             else:
                 print("\n无效的选择，保持默认模型不变")
         else:
-            # 直接使用输入的模型名称
-            set_key(dotenv_path, "DEFAULT_MODEL", model_choice)
-            print(f"\n默认模型已设置为: {model_choice}")
+            # 直接使用输入的模型名称，保存前先在模型目录中校验
+            errors = validate_models([model_choice])
+            if errors:
+                print(f"\n警告: {errors[0]}")
+                confirm = input("您确定要使用这个模型吗? (y/n) > ").strip().lower()
+                if confirm != 'y':
+                    print("保持默认模型不变")
+                    model_choice = None
+            if model_choice:
+                set_key(dotenv_path, "DEFAULT_MODEL", model_choice)
+                print(f"\n默认模型已设置为: {model_choice}")
     else:
         print("\n保持默认模型不变")
     
@@ -8,5 +8,16 @@
 __version__ = '1.0.0'
 __author__ = '考研英语真题处理项目团队'
 
-# 导出常用模块，简化导入
-from .model_config import get_model, list_available_models, get_model_info
\ No newline at end of file
+# 导出常用模块，简化导入（按需导入，避免导入包时加载全部配置）
+_LAZY_EXPORTS = {
+    "get_model": "model_config",
+    "list_available_models": "model_config",
+    "get_model_info": "model_config",
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(f".{_LAZY_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
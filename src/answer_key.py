@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+参考答案解析模块，从文档自带的参考答案中解析选择题的 题号 -> 答案字母 映射。
+
+参考答案部分由DocxReader.extract_answer_key定位，其中的答案表格常见写法有
+"1.D | 2.C | 3.B"、"Text 1 21.D 22.D"、"41.E、42.C"以及"1.[D]"等。解析结果直接作为
+答案映射使用，模型不再需要输出各板块的答案汇总，也可以用来核对模型给出的答案。
+"""
+
+import re
+import logging
+
+from src.docx_reader import DocxReader
+from src.exam_layout import get_exam_layout
+
+logger = logging.getLogger("考研英语真题处理.answer_key")
+
+# 题号和答案字母，如"21.D"、"21. D"、"21、D"、"21.[D]"；字母后必须是分隔符，
+# 避免把"1.[A]Through"这样的选项行或"21.A study..."这样的题干当作答案
+_KEY_ITEM = re.compile(r"(?<!\d)(\d{1,2})\s*[.．、:：]\s*\[?([A-G])\]?(?=[\s|,，;；/]|$)")
+
+# 翻译题的中文参考译文，如"46.它们有时会……"
+_TRANSLATION_ITEM = re.compile(r"^[ \t]*(\d{1,2})[ \t]*[.．、][ \t]*(?=[^\n]*[一-鿿])[^\n]+", re.MULTILINE)
+
+
+def parse_answer_key(document_text, exam_type=None):
+    """
+    从文档的参考答案部分解析选择题答案
+
+    同一题号出现多次时使用第一次出现的答案；只保留试卷结构中选择题的题号。
+
+    Args:
+        document_text (str): 文档全文
+        exam_type (str, optional): 考试类型，用于确定选择题的题号范围
+
+    Returns:
+        dict: 题号(int) -> 答案字母，文档中没有参考答案时返回空字典
+    """
+    if not document_text:
+        return {}
+
+    key_text = DocxReader().extract_answer_key(document_text)
+    if not key_text:
+        logger.info("文档中没有找到参考答案部分")
+        return {}
+
+    objective_numbers = set(get_exam_layout(exam_type).objective_numbers())
+    answers = {}
+    for match in _KEY_ITEM.finditer(key_text):
+        number = int(match.group(1))
+        if number in objective_numbers and number not in answers:
+            answers[number] = match.group(2)
+
+    if answers:
+        missing = sorted(objective_numbers - set(answers))
+        logger.info(f"从参考答案中解析到 {len(answers)}/{len(objective_numbers)} 道选择题的答案")
+        if missing:
+            logger.debug(f"参考答案中缺少的题号: {missing}")
+    else:
+        logger.info("参考答案部分中没有找到选择题答案")
+    return dict(sorted(answers.items()))
+
+
+def parse_translation_reference(document_text, exam_type=None):
+    """
+    从文档的参考答案部分解析翻译题的参考译文，如"46.它们有时会行走60多英里……"
+
+    Args:
+        document_text (str): 文档全文
+        exam_type (str, optional): 考试类型，用于确定翻译题的题号范围
+
+    Returns:
+        str: 按题号排列、每题一行的参考译文，没有找到时返回空字符串
+    """
+    key_text = DocxReader().extract_answer_key(document_text) if document_text else None
+    if not key_text:
+        return ""
+
+    numbers = set()
+    for section in get_exam_layout(exam_type).sections:
+        if section.section_key == "translation":
+            numbers.update(range(section.first, section.last + 1))
+
+    references = {}
+    for match in _TRANSLATION_ITEM.finditer(key_text):
+        number = int(match.group(1))
+        if number in numbers and number not in references:
+            references[number] = match.group(0).strip()
+    return "\n".join(references[number] for number in sorted(references))
+
+
+def attach_answer_key(result, document_text):
+    """
+    解析文档的参考答案并写入提取结果：选择题答案写入answer_key字段（题号为字符串，便于保存为JSON），
+    翻译题的参考译文写入translation_reference字段
+
+    Args:
+        result (dict): 模型的提取结果
+        document_text (str): 文档全文
+
+    Returns:
+        dict: 传入的提取结果
+    """
+    if not isinstance(result, dict):
+        return result
+    metadata = result.get("metadata")
+    exam_type = metadata.get("exam_type") if isinstance(metadata, dict) else None
+    answers = parse_answer_key(document_text, exam_type)
+    if answers:
+        result["answer_key"] = {str(number): letter for number, letter in answers.items()}
+    translation_reference = parse_translation_reference(document_text, exam_type)
+    if translation_reference:
+        result["translation_reference"] = translation_reference
+    return result
+
+
+def format_answers(answers, first, last):
+    """
+    将题号范围内的答案格式化为答案汇总字符串
+
+    Args:
+        answers (dict): 题号(int) -> 答案字母
+        first (int): 第一题题号
+        last (int): 最后一题题号
+
+    Returns:
+        str: 答案汇总，如"1.D 2.C 3.B"，范围内没有答案时返回空字符串
+    """
+    return " ".join(f"{number}.{answers[number]}" for number in range(first, last + 1) if answers.get(number))
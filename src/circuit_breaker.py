@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模型熔断模块，在某个模型连续出错或超时时暂停使用它，将新的请求转给备用模型。
+
+每个模型ID在进程内共享一个熔断器：
+    closed: 正常使用；连续失败达到阈值后进入open
+    open: 新的请求直接改用备用模型；冷却时间过后进入half_open
+    half_open: 只放行一个探测请求，成功则恢复closed，失败则重新open
+
+只有连接错误、超时、429和5xx响应计为失败（其他4xx是请求本身的问题）。状态变化写入日志，
+并记录在模型调用统计中（model_stats.json的breaker字段）。
+
+备用模型可通过环境变量FALLBACK_MODEL或命令行参数--fallback-model设置，未设置时
+按balanced、most_capable、fastest的顺序选择与原模型不同的模型。
+"""
+
+import os
+import time
+import logging
+import threading
+
+from src.model_config import OPENROUTER_MODELS, get_model_stats
+
+logger = logging.getLogger("考研英语真题处理.circuit_breaker")
+
+# 熔断阈值（连续失败次数）和冷却时间（秒）
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+# 默认的备用模型，为None时按FALLBACK_TIER_ORDER选择
+FALLBACK_MODEL = os.getenv("FALLBACK_MODEL") or None
+
+# 未配置备用模型时的候选顺序（取自OPENROUTER_MODELS['by_tier']）
+FALLBACK_TIER_ORDER = ["balanced", "most_capable", "fastest"]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_model_failure(error):
+    """
+    判断请求异常是否说明模型不可用（计入熔断）
+
+    Args:
+        error (Exception): 请求异常
+
+    Returns:
+        bool: 连接错误、超时、429和5xx响应为True
+    """
+    import requests
+
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    单个模型的熔断器。
+    """
+
+    def __init__(self, model, threshold=None, cooldown=None, stats=None):
+        """
+        初始化熔断器
+
+        Args:
+            model (str): 模型ID
+            threshold (int, optional): 进入open所需的连续失败次数，默认BREAKER_THRESHOLD
+            cooldown (float, optional): open状态的冷却时间（秒），默认BREAKER_COOLDOWN
+            stats (ModelStatsStore, optional): 记录状态变化的统计存储，默认使用共享实例
+        """
+        self.model = model
+        self.threshold = threshold or BREAKER_THRESHOLD
+        self.cooldown = cooldown if cooldown is not None else BREAKER_COOLDOWN
+        self.stats = stats or get_model_stats()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state, reason):
+        """切换状态并记录（调用方持有锁）"""
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        message = f"模型 {self.model} 熔断状态 {previous} -> {state}（{reason}）"
+        if state == OPEN:
+            logger.warning(message)
+        else:
+            logger.info(message)
+        self.stats.record_breaker(self.model, state)
+
+    def available(self):
+        """是否可以向该模型发送请求（不占用half_open的探测名额）"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.cooldown
+            return not self._probing
+
+    def allow(self):
+        """
+        请求发送前调用，判断是否放行
+
+        Returns:
+            bool: 放行时为True；冷却结束后第一个请求作为探测请求放行
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self._transition(HALF_OPEN, f"冷却{self.cooldown:g}秒结束，发送探测请求")
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        """记录一次成功的请求"""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(CLOSED, "请求成功")
+
+    def record_failure(self, error=None):
+        """
+        记录一次失败的请求
+
+        Args:
+            error (Exception, optional): 失败原因，用于日志
+        """
+        with self._lock:
+            self.failures += 1
+            probe_failed = self.state == HALF_OPEN
+            self._probing = False
+            if probe_failed or (self.state == CLOSED and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                reason = "探测请求失败" if probe_failed else f"连续失败{self.failures}次"
+                if error is not None:
+                    reason += f": {str(error)[:100]}"
+                self._transition(OPEN, reason)
+
+    def release(self):
+        """请求没有结果（如被取消）时释放探测名额"""
+        with self._lock:
+            self._probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(model):
+    """
+    获取进程内共享的模型熔断器
+
+    Args:
+        model (str): 模型ID
+
+    Returns:
+        CircuitBreaker: 该模型的熔断器
+    """
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(model)
+        return _breakers[model]
+
+
+def fallback_models(model):
+    """
+    返回模型的备用模型候选（按优先顺序）
+
+    Args:
+        model (str): 原模型ID
+
+    Returns:
+        list: 与原模型不同的备用模型ID
+    """
+    candidates = [FALLBACK_MODEL] if FALLBACK_MODEL else []
+    by_tier = OPENROUTER_MODELS["by_tier"]
+    candidates.extend(by_tier.get(tier) for tier in FALLBACK_TIER_ORDER)
+    result = []
+    for candidate in candidates:
+        if candidate and candidate != model and candidate not in result:
+            result.append(candidate)
+    return result
+
+
+def select_model(model):
+    """
+    为一次请求选择模型：原模型熔断时改用第一个可用的备用模型
+
+    Args:
+        model (str): 原模型ID
+
+    Returns:
+        str: 本次请求使用的模型；所有备用模型也都熔断时仍返回原模型
+    """
+    if get_breaker(model).allow():
+        return model
+    for fallback in fallback_models(model):
+        if get_breaker(fallback).allow():
+            logger.info(f"模型 {model} 已熔断，本次请求改用备用模型 {fallback}")
+            return fallback
+    logger.warning(f"模型 {model} 及所有备用模型均已熔断，仍使用 {model}")
+    return model
+
+
+def set_default_fallback(model):
+    """
+    设置默认的备用模型（同时写入环境变量，进程池中的工作进程使用相同设置）
+
+    Args:
+        model (str): 备用模型ID
+    """
+    global FALLBACK_MODEL
+    FALLBACK_MODEL = model
+    os.environ["FALLBACK_MODEL"] = model
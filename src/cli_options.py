@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令行公共选项模块，src/main.py（单文件和serve子命令）与batch_process_exams.py共用。
+
+运行时选项包括句子拆分、降噪、超时和期限、熔断备用模型、响应缓存、对冲、模型路由、
+模型ID校验，以及Parquet数据集、语料库和原文存储等输出选项。各入口只需调用：
+    add_runtime_options(parser)              注册选项
+    apply_runtime_options(parser, args)      写入默认设置，返回(对冲策略, 模型路由器)
+    check_runtime_models(args, ...)          处理文档前校验模型ID
+"""
+
+import logging
+
+from src.model_config import get_model
+
+logger = logging.getLogger("考研英语真题处理.cli_options")
+
+
+def add_runtime_options(parser):
+    """
+    注册各入口共用的运行时选项
+
+    Args:
+        parser (argparse.ArgumentParser): 命令行解析器
+    """
+    parser.add_argument('--skip-model-check', action='store_true', help="跳过启动时的模型ID校验")
+    parser.add_argument('--hedge', action='store_true', help="启用对冲请求：分段请求超时未返回时向第二个模型发出相同请求")
+    parser.add_argument('--hedge-percentile', type=float, default=90, help="触发对冲的历史延迟分位数（默认90）")
+    parser.add_argument('--hedge-budget', type=float, default=0.05, help="每个文档对冲请求的花费上限（美元，默认0.05）")
+    parser.add_argument('--hedge-model', help="对冲使用的模型，默认从by_tier中选择与主模型不同的模型")
+    parser.add_argument('--route', action='store_true', help="启用模型路由：根据历史延迟、成功率和价格为每个分段选择模型")
+    parser.add_argument('--doc-cost', type=float, help="模型路由的单文档花费目标（美元）")
+    parser.add_argument('--doc-latency', type=float, help="模型路由的单文档延迟目标（秒）")
+    parser.add_argument('--parquet-dir', help="同时将结果追加到指定的Parquet数据集（按年份/考试类型分区，需要pyarrow）")
+    parser.add_argument('--corpus-db', help="同时将结果写入指定的SQLite语料库，可用search子命令检索")
+    parser.add_argument('--passage-store', help="原文存储目录：分析JSON中的原文按内容哈希只保存一次，以引用形式写入")
+    parser.add_argument('--csv-passage-refs', action='store_true', help="CSV中的原文也使用引用（需要--passage-store）")
+    parser.add_argument('--splitter', choices=["regex", "punkt"], help="句子拆分引擎：regex（默认，离线）或punkt（需要NLTK punkt数据），也可通过环境变量SENTENCE_SPLITTER设置")
+    parser.add_argument('--strip-noise', metavar='CATEGORIES', help="降噪：构建提示词前删除的内容，all（默认）、none，或逗号分隔的notes,page_lines,explanations,sample_essays,translation_refs，也可通过环境变量NOISE_FILTER设置")
+    parser.add_argument('--read-timeout', type=float, help="每次API请求的读取超时（秒，默认300），也可通过环境变量READ_TIMEOUT设置")
+    parser.add_argument('--doc-deadline', type=float, help="单文档处理期限（秒），到期后取消尚未完成的分段并返回部分结果，也可通过环境变量DOC_DEADLINE设置")
+    parser.add_argument('--fallback-model', help="模型熔断（连续出错或超时）后改用的备用模型，也可通过环境变量FALLBACK_MODEL设置")
+    parser.add_argument('--response-cache', metavar='DIR', help="持久化响应缓存目录，相同的请求直接使用缓存的响应，也可通过环境变量RESPONSE_CACHE_DIR设置")
+
+
+def apply_runtime_options(parser, args):
+    """
+    应用运行时选项：写入默认设置（同时写入环境变量，进程池中的工作进程使用相同设置），
+    并创建对冲策略和模型路由器
+
+    Args:
+        parser (argparse.ArgumentParser): 命令行解析器，选项值无效时用于报告错误
+        args (argparse.Namespace): 解析后的参数
+
+    Returns:
+        tuple: (HedgePolicy或None, ModelRouter或None)；多个文档共享时预算按文档单独计算
+    """
+    if args.splitter:
+        from src.sentence_splitter import set_default_engine
+        set_default_engine(args.splitter)
+
+    if args.strip_noise is not None:
+        from src.noise_filter import set_default_categories
+        try:
+            set_default_categories(args.strip_noise)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.read_timeout is not None or args.doc_deadline is not None:
+        from src.deadline import set_default_timeouts
+        try:
+            set_default_timeouts(read_timeout=args.read_timeout, doc_deadline=args.doc_deadline)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.fallback_model:
+        from src.circuit_breaker import set_default_fallback
+        set_default_fallback(get_model(args.fallback_model))
+
+    if args.response_cache:
+        from src.response_cache import set_default_cache_dir
+        set_default_cache_dir(args.response_cache)
+
+    # 对冲策略（可选）
+    hedge_policy = None
+    if args.hedge:
+        from src.hedging import HedgePolicy
+        hedge_policy = HedgePolicy(
+            percentile=args.hedge_percentile,
+            hedge_model=args.hedge_model,
+            max_hedge_cost=args.hedge_budget
+        )
+
+    # 模型路由（可选）
+    router = None
+    if args.route:
+        from src.model_config import ModelRouter
+        router = ModelRouter(cost_budget=args.doc_cost, latency_budget=args.doc_latency)
+
+    return hedge_policy, router
+
+
+def check_runtime_models(args, hedge_policy=None, router=None):
+    """
+    在读取文档之前校验模型ID（模型目录缓存有效时不产生网络请求），指定了--skip-model-check时跳过
+
+    Args:
+        args (argparse.Namespace): 解析后的参数（使用model、fallback_model和skip_model_check）
+        hedge_policy: 对冲策略，指定了对冲模型时一并校验
+        router: 模型路由器，校验其候选模型
+
+    Returns:
+        bool: 校验通过或已跳过时为True
+    """
+    if args.skip_model_check:
+        return True
+
+    from src.model_catalog import check_models
+    model_ids = [get_model(args.model)]
+    if hedge_policy and hedge_policy.hedge_model:
+        model_ids.append(hedge_policy.hedge_model)
+    if args.fallback_model:
+        model_ids.append(get_model(args.fallback_model))
+    if not check_models(model_ids, router=router):
+        logger.error("模型校验失败，请检查模型名称（或使用--skip-model-check跳过校验）")
+        return False
+    return True
@@ -9,16 +9,59 @@ import os
 import json
 import logging
 import time
+from collections import Counter
 from datetime import datetime
 
+from src.answer_key import attach_answer_key
+from src.deadline import DeadlineExceeded, document_deadline
+from src.noise_filter import NoiseFilter
+from src.token_estimator import estimate_tokens
+from src.exam_layout import get_exam_layout
+from src.model_config import get_model, get_model_max_tokens, get_model_stats
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("content_analyzer")
 
+class _DocumentContext:
+    """单个文档的提取状态：处理期限、对冲和路由预算、因期限到达而取消的分段和最近一次请求使用的模型"""
+    
+    def __init__(self, deadline=None, hedge_budget=None, route_budget=None):
+        """
+        初始化文档提取状态
+        
+        Args:
+            deadline: 文档处理期限（Deadline），为None时不限制
+            hedge_budget: 文档的对冲预算（HedgeBudget），未启用对冲时为None
+            route_budget: 文档的路由预算（RouteBudget），未启用路由时为None
+        """
+        self.deadline = deadline
+        self.hedge_budget = hedge_budget
+        self.route_budget = route_budget
+        self.cancelled_segments = []
+        self.last_model = None
+
 class ContentAnalyzer:
     """内容分析器，负责调用API分析文档内容并提取结构化数据"""
     
-    def __init__(self, api_handler, max_tokens=4096, temperature=0.1):
+    # 分段提取的分段编号
+    SEGMENTS = (1, 2, 3, 4, 5)
+    
+    # 各分段负责的内容：sections中的板块，或题号范围
+    SEGMENT_SECTIONS = {1: ("cloze", "reading"), 2: ("new_type", "translation", "writing")}
+    SEGMENT_QUESTIONS = {3: (1, 25), 4: (26, 40), 5: (41, 52)}
+    
+    # 一次性提取的预计输出：原文和题目约为输入文本的token数再加上JSON转义和字段名（约20%），
+    # 另加每道题目的字段开销
+    FULL_OUTPUT_RATIO = 1.2
+    QUESTION_OUTPUT_TOKENS = 30
+    
+    # 模型一次性提取的历史完整率低于该值时直接分段（至少需要MIN_FULL_HISTORY次记录）
+    MIN_FULL_COMPLETE_RATE = 0.5
+    MIN_FULL_HISTORY = 3
+    
+    def __init__(self, api_handler, max_tokens=4096, temperature=0.1, hedge_policy=None, router=None, noise_filter=None,
+                 doc_deadline=None):
         """
         初始化内容分析器
         
@@ -26,10 +69,28 @@ class ContentAnalyzer:
             api_handler: API处理器实例，用于调用外部API
             max_tokens: 最大生成token数
             temperature: 生成温度，越低越确定性
+            hedge_policy: 可选的对冲策略（HedgePolicy），为None时不发出对冲请求
+            router: 可选的模型路由器（ModelRouter），为None时所有分段使用api_handler的模型
+            noise_filter: 可选的降噪器（NoiseFilter），为None时按默认设置（NOISE_FILTER）删除解析、范文等内容
+            doc_deadline: 单文档处理期限（秒），为None时使用默认设置（DOC_DEADLINE）
         """
         self.api_handler = api_handler
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.hedge_policy = hedge_policy
+        self.router = router
+        self.noise_filter = noise_filter if noise_filter is not None else NoiseFilter()
+        
+        # 单文档处理期限；每个文档的期限和取消的分段保存在_DocumentContext中，
+        # 同一个分析器可以在多个线程中同时处理不同的文档
+        self.doc_deadline = doc_deadline
+        
+        # 启用对冲时，所有请求经由HedgedRequester发出
+        if hedge_policy is not None:
+            from src.hedging import HedgedRequester
+            self.requester = HedgedRequester(api_handler, hedge_policy)
+        else:
+            self.requester = api_handler
     
     def extract_data(self, document_text, save_debug=False, output_dir="test_results"):
         """
@@ -48,23 +109,40 @@ class ContentAnalyzer:
         # 记录开始时间
         start_time = time.time()
         
+        context = self._start_document()
+        
         try:
-            # 检查文档长度，如果超过一定阈值（3000字符），直接使用分段处理
-            if len(document_text) > 3000:
-                logger.info(f"文档较长（{len(document_text)}字符），直接使用分段处理...")
-                result = self._extract_data_in_segments(document_text, output_dir)
+            # 删除解析、范文、参考译文等内容后再构建提示词（参考答案在本地从完整文档中解析）
+            prompt_text = self.noise_filter.reduce(document_text)
+            
+            # 预计一次性提取的输出超过模型的输出上限，或该模型一次性提取经常不完整时，直接分段处理
+            if self.extraction_mode(prompt_text) == "segments":
+                result = self._extract_data_in_segments(prompt_text, output_dir, context=context)
             else:
-                # 对于较短的文档，尝试一次性提取
-                logger.info(f"文档较短（{len(document_text)}字符），尝试一次性提取...")
-                result = self._extract_full_data(document_text, output_dir)
+                try:
+                    result = self._extract_full_data(prompt_text, output_dir, context=context)
+                except DeadlineExceeded as e:
+                    logger.error(f"一次性提取失败: {str(e)}")
+                    result = {"metadata": {}, "sections": {}, "questions": []}
                 
-                # 检查提取的题目数量是否完整
-                questions = result.get("questions", [])
-                if len(questions) < 52:
-                    logger.info(f"提取的题目数量不完整（{len(questions)}/52），切换到分段提取...")
+                # 检查提取的题号是否完整（重复的题号不能弥补缺失的题号）
+                expected = set(get_exam_layout().numbers())
+                numbers = {q.get("number") for q in result.get("questions") or []
+                           if isinstance(q, dict) and isinstance(q.get("number"), int)}
+                complete = expected <= numbers
+                if "full" not in context.cancelled_segments:
+                    self._stats().record_full_extraction(context.last_model, complete)
+                if not complete:
+                    logger.info(f"提取的题号不完整（{len(expected & numbers)}/{len(expected)}），分段提取缺少的部分...")
                     
-                    # 分段提取并合并结果
-                    result = self._extract_data_in_segments(document_text, output_dir)
+                    # 复用一次性提取中已完整的分段，只请求缺少的分段
+                    result = self._extract_data_in_segments(prompt_text, output_dir, partial=result, context=context)
+            
+            # 文档自带参考答案时在本地解析选择题答案和翻译参考译文，整理数据时直接使用
+            attach_answer_key(result, document_text)
+            
+            # 记录提取状态：期限到达时结果不完整，列出被取消的分段
+            result["extraction_status"] = self._extraction_status(context)
             
             # 计算处理时间
             elapsed_time = time.time() - start_time
@@ -79,34 +157,237 @@ class ContentAnalyzer:
         except Exception as e:
             logger.error(f"提取数据时发生错误: {str(e)}")
             raise
+        
+        finally:
+            # 持久化模型调用统计，供后续运行的路由和对冲使用
+            stats = getattr(self.api_handler, "stats", None)
+            if stats is not None:
+                try:
+                    stats.save()
+                except OSError as e:
+                    logger.warning(f"保存模型调用统计失败: {str(e)}")
+    
+    def _start_document(self):
+        """
+        开始处理一个文档，创建该文档的提取状态（处理期限、对冲和路由预算）
+        
+        Returns:
+            _DocumentContext: 文档提取状态
+        """
+        hedge_budget = self.hedge_policy.start_document() if self.hedge_policy is not None else None
+        route_budget = self.router.start_document() if self.router is not None else None
+        return _DocumentContext(document_deadline(self.doc_deadline), hedge_budget, route_budget)
+    
+    def _extraction_status(self, context):
+        """
+        返回文档的提取状态
+        
+        Args:
+            context: 文档提取状态（_DocumentContext）
+        
+        Returns:
+            dict: status为"complete"，或期限到达时为"deadline_exceeded"并附带被取消的分段和期限
+        """
+        if not context.cancelled_segments:
+            return {"status": "complete"}
+        logger.warning(f"文档处理超过期限（{context.deadline.seconds:g}秒），返回部分结果，"
+                       f"取消的分段: {context.cancelled_segments}")
+        return {
+            "status": "deadline_exceeded",
+            "cancelled_segments": list(context.cancelled_segments),
+            "deadline_seconds": context.deadline.seconds
+        }
+    
+    def _stats(self):
+        """返回模型调用统计（API处理器的统计，没有时使用共享实例）"""
+        return getattr(self.api_handler, "stats", None) or get_model_stats()
+    
+    def _full_model(self, prompt_text):
+        """返回一次性提取将使用的模型（启用路由时为路由的首选模型，不扣除预算）"""
+        if self.router is not None:
+            return self.router.rank("full", prompt_tokens=estimate_tokens(prompt_text))[0][0]
+        return getattr(self.api_handler, "model", None) or get_model()
+    
+    def full_output_tokens(self, prompt_text, model=None):
+        """
+        预计一次性提取的输出token数
+        
+        Args:
+            prompt_text: 降噪后的文档文本
+            model: 模型名称，用于按模型系列估计token数
+        
+        Returns:
+            int: 预计的输出token数
+        """
+        question_tokens = len(get_exam_layout().numbers()) * self.QUESTION_OUTPUT_TOKENS
+        return int(estimate_tokens(prompt_text, model) * self.FULL_OUTPUT_RATIO) + question_tokens
+    
+    def extraction_mode(self, prompt_text, model=None):
+        """
+        判断文档使用一次性提取还是分段提取
+        
+        预计的输出token数超过本次请求的输出上限（max_tokens与模型最大输出取较小值）时分段提取；
+        否则参考该模型一次性提取的历史记录，经常返回不完整结果的模型也直接分段提取，
+        避免先发出一次注定不完整的请求。
+        
+        Args:
+            prompt_text: 降噪后的文档文本
+            model: 一次性提取使用的模型，默认为路由首选或API处理器的模型
+        
+        Returns:
+            str: "full"（一次性提取）或"segments"（分段提取）
+        """
+        model = model or self._full_model(prompt_text)
+        output_limit = min(self.max_tokens, get_model_max_tokens(model))
+        expected = self.full_output_tokens(prompt_text, model)
+        if expected > output_limit:
+            logger.info(f"预计一次性提取输出约 {expected} tokens，超过 {model} 的输出上限 {output_limit}，直接分段提取")
+            return "segments"
+        
+        complete_rate = self._stats().full_complete_rate(model, self.MIN_FULL_HISTORY)
+        if complete_rate is not None and complete_rate < self.MIN_FULL_COMPLETE_RATE:
+            logger.info(f"{model} 一次性提取的完整率为 {complete_rate:.0%}，直接分段提取")
+            return "segments"
+        
+        logger.info(f"预计一次性提取输出约 {expected}/{output_limit} tokens，尝试一次性提取")
+        return "full"
+    
+    def plan_prompts(self, document_text, model=None):
+        """
+        构建提取一个文档将要发送的提示词（不发送请求），用于预估token和花费
+        
+        Args:
+            document_text: 文档文本内容
+            model: 一次性提取使用的模型，默认为路由首选或API处理器的模型
+        
+        Returns:
+            tuple: (降噪后的文本, 提取方式, [(分段编号或"full", 提示词), ...])
+        """
+        prompt_text, _ = self.noise_filter.filter(document_text)
+        mode = self.extraction_mode(prompt_text, model)
+        if mode == "segments":
+            prompts = [(segment, self._create_segment_prompt(prompt_text, segment=segment)) for segment in self.SEGMENTS]
+        else:
+            prompts = [("full", self._create_extraction_prompt(prompt_text))]
+        return prompt_text, mode, prompts
+    
+    def _request(self, prompt, output_dir="test_results", segment="full", context=None):
+        """
+        发送一次提取请求，启用路由时为该分段选择模型
+        
+        Args:
+            prompt: 提示词
+            output_dir: 输出目录，用于保存调试信息
+            segment: 分段编号（1-5）或"full"，用于模型路由
+            context: 文档提取状态（_DocumentContext），为None时不限制期限
+        
+        Returns:
+            dict: 解析后的结构化数据
+        
+        Raises:
+            DeadlineExceeded: 文档处理期限已到，该分段被取消
+        """
+        context = context or _DocumentContext()
+        kwargs = {}
+        try:
+            if context.deadline is not None:
+                context.deadline.check(f"分段 {segment}")
+                kwargs["deadline"] = context.deadline
+            if self.router is not None:
+                model = self.router.choose(segment, prompt_tokens=estimate_tokens(prompt), budget=context.route_budget)
+                logger.info(f"分段 {segment} 路由到模型: {model}")
+                kwargs["model"] = model
+            if context.hedge_budget is not None:
+                kwargs["budget"] = context.hedge_budget
+            context.last_model = kwargs.get("model") or getattr(self.api_handler, "model", None) or get_model()
+            
+            return self.requester.get_structured_data(
+                prompt,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                output_dir=output_dir,
+                **kwargs
+            )
+        except DeadlineExceeded:
+            if segment not in context.cancelled_segments:
+                context.cancelled_segments.append(segment)
+            raise
     
-    def _extract_full_data(self, document_text, output_dir="test_results"):
+    def _extract_full_data(self, document_text, output_dir="test_results", context=None):
         """
         尝试提取完整的结构化数据
         
         Args:
             document_text: 文档文本内容
             output_dir: 输出目录，用于保存调试信息
+            context: 文档提取状态（_DocumentContext）
         
         Returns:
             dict: 提取的结构化数据
         """
         prompt = self._create_extraction_prompt(document_text)
-        response = self.api_handler.get_structured_data(
-            prompt, 
-            max_tokens=self.max_tokens, 
-            temperature=self.temperature,
-            output_dir=output_dir
+        response = self._request(
+            prompt,
+            output_dir=output_dir,
+            segment="full",
+            context=context
         )
         return response
     
-    def _extract_data_in_segments(self, document_text, output_dir="test_results"):
+    def _reusable_segments(self, partial):
+        """
+        从一次性提取的部分结果中找出内容完整的分段
+        
+        Args:
+            partial: 一次性提取的结果
+        
+        Returns:
+            dict: 分段编号 -> 与该分段请求结果格式相同的数据
+        """
+        if not isinstance(partial, dict):
+            return {}
+        
+        reusable = {}
+        sections = partial.get("sections") or {}
+        metadata = partial.get("metadata") or {}
+        for segment, keys in self.SEGMENT_SECTIONS.items():
+            if all(self._section_complete(key, sections.get(key)) for key in keys):
+                response = {"sections": {key: sections[key] for key in keys}}
+                if segment == 1:
+                    if not metadata:
+                        continue
+                    response["metadata"] = metadata
+                reusable[segment] = response
+        
+        questions = [q for q in partial.get("questions") or [] if isinstance(q, dict)]
+        for segment, (first, last) in self.SEGMENT_QUESTIONS.items():
+            in_range = [q for q in questions if isinstance(q.get("number"), int) and first <= q["number"] <= last]
+            if {q["number"] for q in in_range} == set(range(first, last + 1)):
+                reusable[segment] = {"questions": in_range}
+        return reusable
+    
+    @staticmethod
+    def _section_complete(key, value):
+        """判断sections中的一个板块是否包含全部原文"""
+        if not isinstance(value, dict):
+            return False
+        if key == "reading":
+            parts = [f"text_{i}" for i in range(1, 5)]
+        elif key == "writing":
+            parts = ["part_a", "part_b"]
+        else:
+            return bool(value.get("original_text"))
+        return all(isinstance(value.get(part), dict) and value[part].get("original_text") for part in parts)
+    
+    def _extract_data_in_segments(self, document_text, output_dir="test_results", partial=None, context=None):
         """
         分段提取数据并合并结果
         
         Args:
             document_text: 文档文本内容
             output_dir: 输出目录，用于保存调试信息
+            partial: 可选的一次性提取结果，其中内容完整的分段直接复用，不再请求
+            context: 文档提取状态（_DocumentContext），为None时为本次调用创建
             
         将提取分为五部分：
         1. 提取基本信息(metadata)和sections中的cloze和readings部分
@@ -116,103 +397,124 @@ class ContentAnalyzer:
         5. 提取题目41-52
         """
         logger.info("开始分段提取数据...")
+        context = context or self._start_document()
+        
+        reused = self._reusable_segments(partial)
+        if reused:
+            missing = [segment for segment in self.SEGMENTS if segment not in reused]
+            logger.info(f"复用一次性提取结果中的分段 {sorted(reused)}，只请求分段 {missing}")
         
         # 第一部分：提取基本信息和sections中的cloze和readings部分
-        logger.info("提取第一部分数据：基本信息和sections中的cloze和readings部分...")
-        first_prompt = self._create_segment_prompt(document_text, segment=1)
-        try:
-            first_response = self.api_handler.get_structured_data(
-                first_prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                output_dir=output_dir
-            )
-        except Exception as e:
-            logger.error(f"第一部分数据提取失败: {str(e)}")
-            # 创建基本结构
-            first_response = {
-                "metadata": {"year": "2024", "exam_type": "英语（一）"},
-                "sections": {
-                    "cloze": {},
-                    "reading": {}
+        if 1 in reused:
+            first_response = reused[1]
+        else:
+            logger.info("提取第一部分数据：基本信息和sections中的cloze和readings部分...")
+            first_prompt = self._create_segment_prompt(document_text, segment=1)
+            try:
+                first_response = self._request(
+                    first_prompt,
+                    output_dir=output_dir,
+                    segment=1,
+                    context=context
+                )
+            except Exception as e:
+                logger.error(f"第一部分数据提取失败: {str(e)}")
+                # 创建基本结构
+                first_response = {
+                    "metadata": {"year": "2024", "exam_type": "英语（一）"},
+                    "sections": {
+                        "cloze": {},
+                        "reading": {}
+                    }
                 }
-            }
         
         logger.info("第一部分数据提取完成，开始提取第二部分...")
         
         # 第二部分：提取sections中的剩余部分(new_type, translation, writing)
-        logger.info("提取第二部分数据：sections中的剩余部分...")
-        second_prompt = self._create_segment_prompt(document_text, segment=2)
-        try:
-            second_response = self.api_handler.get_structured_data(
-                second_prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                output_dir=output_dir
-            )
-        except Exception as e:
-            logger.error(f"第二部分数据提取失败: {str(e)}")
-            second_response = {"sections": {}}
+        if 2 in reused:
+            second_response = reused[2]
+        else:
+            logger.info("提取第二部分数据：sections中的剩余部分...")
+            second_prompt = self._create_segment_prompt(document_text, segment=2)
+            try:
+                second_response = self._request(
+                    second_prompt,
+                    output_dir=output_dir,
+                    segment=2,
+                    context=context
+                )
+            except Exception as e:
+                logger.error(f"第二部分数据提取失败: {str(e)}")
+                second_response = {"sections": {}}
         
         logger.info("第二部分数据提取完成，开始提取第三部分...")
         
         # 第三部分：提取题目1-25
-        logger.info("提取第三部分数据：题目1-25...")
-        third_prompt = self._create_segment_prompt(document_text, segment=3)
-        try:
-            third_response = self.api_handler.get_structured_data(
-                third_prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                output_dir=output_dir
-            )
-            
-            # 检查第三部分是否提取成功
-            if not third_response.get("questions"):
-                logger.warning("第三部分未能提取到题目，尝试使用备用提示词...")
-                # 尝试使用更简单的提示词
-                backup_prompt = self._create_simplified_prompt(document_text, segment=3)
-                third_response = self.api_handler.get_structured_data(
-                    backup_prompt,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    output_dir=output_dir
+        if 3 in reused:
+            third_response = reused[3]
+        else:
+            logger.info("提取第三部分数据：题目1-25...")
+            third_prompt = self._create_segment_prompt(document_text, segment=3)
+            try:
+                third_response = self._request(
+                    third_prompt,
+                    output_dir=output_dir,
+                    segment=3,
+                    context=context
                 )
-        except Exception as e:
-            logger.error(f"第三部分数据提取失败: {str(e)}")
-            third_response = {"questions": []}
+                
+                # 检查第三部分是否提取成功
+                if not third_response.get("questions"):
+                    logger.warning("第三部分未能提取到题目，尝试使用备用提示词...")
+                    # 尝试使用更简单的提示词
+                    backup_prompt = self._create_simplified_prompt(document_text, segment=3)
+                    third_response = self._request(
+                        backup_prompt,
+                        output_dir=output_dir,
+                        segment=3,
+                        context=context
+                    )
+            except Exception as e:
+                logger.error(f"第三部分数据提取失败: {str(e)}")
+                third_response = {"questions": []}
         
         logger.info("第三部分数据提取完成，开始提取第四部分...")
         
         # 第四部分：提取题目26-40
-        logger.info("提取第四部分数据：题目26-40...")
-        fourth_prompt = self._create_segment_prompt(document_text, segment=4)
-        try:
-            fourth_response = self.api_handler.get_structured_data(
-                fourth_prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                output_dir=output_dir
-            )
-        except Exception as e:
-            logger.error(f"第四部分数据提取失败: {str(e)}")
-            fourth_response = {"questions": []}
+        if 4 in reused:
+            fourth_response = reused[4]
+        else:
+            logger.info("提取第四部分数据：题目26-40...")
+            fourth_prompt = self._create_segment_prompt(document_text, segment=4)
+            try:
+                fourth_response = self._request(
+                    fourth_prompt,
+                    output_dir=output_dir,
+                    segment=4,
+                    context=context
+                )
+            except Exception as e:
+                logger.error(f"第四部分数据提取失败: {str(e)}")
+                fourth_response = {"questions": []}
             
         logger.info("第四部分数据提取完成，开始提取第五部分...")
         
         # 第五部分：提取题目41-52
-        logger.info("提取第五部分数据：题目41-52...")
-        fifth_prompt = self._create_segment_prompt(document_text, segment=5)
-        try:
-            fifth_response = self.api_handler.get_structured_data(
-                fifth_prompt,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                output_dir=output_dir
-            )
-        except Exception as e:
-            logger.error(f"第五部分数据提取失败: {str(e)}")
-            fifth_response = {"questions": []}
+        if 5 in reused:
+            fifth_response = reused[5]
+        else:
+            logger.info("提取第五部分数据：题目41-52...")
+            fifth_prompt = self._create_segment_prompt(document_text, segment=5)
+            try:
+                fifth_response = self._request(
+                    fifth_prompt,
+                    output_dir=output_dir,
+                    segment=5,
+                    context=context
+                )
+            except Exception as e:
+                logger.error(f"第五部分数据提取失败: {str(e)}")
+                fifth_response = {"questions": []}
         
         logger.info("第五部分数据提取完成，开始合并结果...")
         
@@ -259,17 +561,16 @@ class ContentAnalyzer:
 # 分析任务
 请分析这份考研英语真题文档，并提取以下信息：
 1. 基本信息（年份、考试类型）
-2. 各部分原文和答案汇总
-3. 所有52道题目的详细信息（题干、选项、正确答案、干扰项等）
+2. 各部分原文（选择题的答案汇总会根据文档的参考答案在本地生成，不需要输出）
+3. 所有52道题目的详细信息（题干、选项、答案字母）
 
 # 重要说明
 1. 请确保返回完整的JSON结构，包含所有52道题目
 2. 原文在sections部分只需生成一次，不要在questions部分重复
 3. 完形填空的原文请包含空格标记([1], [2]等)
-4. 对于每个题目，请提供准确的题干、选项、正确答案和干扰项（干扰项是指除正确答案外的选项）
-5. 答案汇总应该按照顺序排列
+4. 对于每个题目，请提供准确的题干、选项和正确选项的字母（answer），正确答案和干扰项会根据选项在本地生成，不要重复输出选项内容
+5. 完形填空、阅读和新题型不需要提供答案汇总（answers_summary）
 6. 对于完形填空题(1-20题)，不需要提供stem，可以将stem设置为空字符串或"/"
-7. 对于阅读理解题和新题型题，正确答案格式应为"字母]选项内容"，如"D]hiding them from the locals."，而不仅仅是字母
 
 # 文档内容
 {document_text}
@@ -285,14 +586,11 @@ class ContentAnalyzer:
   }},
   "sections": {{
     "cloze": {{
-      "original_text": "完形填空原文（卷面版本，包含[1], [2]等标记）",
-      "restored_text": "完形填空原文（还原后版本，已将答案填入）",
-      "answers_summary": "完形填空答案汇总，如'1.D 2.C 3.B...'"
+      "original_text": "完形填空原文（卷面版本，包含[1], [2]等标记）"
     }},
     "reading": {{
       "text_1": {{
-        "original_text": "阅读Text 1原文",
-        "answers_summary": "阅读Text 1答案汇总，如'21.D 22.D 23.A...'"
+        "original_text": "阅读Text 1原文"
       }},
       // 其他text_2, text_3, text_4等
     }},
@@ -304,16 +602,14 @@ class ContentAnalyzer:
       "section_type": "完形填空",
       "stem": "",  // 完形填空题无需提供stem，设置为空字符串
       "options": "选项文本，如'A. Without, B. Though, C. Despite, D. Besides'",
-      "correct_answer": "D. Without",
-      "distractors": "干扰项，即除正确答案外的选项，如'A. Though, B. Despite, C. Besides'"
+      "answer": "D"  // 只需正确选项的字母
     }},
     {{
       "number": 21,
       "section_type": "阅读理解",
       "stem": "题干文本",
       "options": "A]选项A内容\\n[B]选项B内容\\n[C]选项C内容\\n[D]选项D内容",
-      "correct_answer": "D]选项D的完整内容",  // 带字母和选项内容
-      "distractors": "A]选项A内容\\n[B]选项B内容\\n[C]选项C内容"  // 除正确答案外的选项
+      "answer": "D"  // 只需正确选项的字母
     }},
     // ... 所有52道题目
   ]
@@ -349,7 +645,7 @@ class ContentAnalyzer:
 # 分析任务
 请分析这份考研英语真题文档，并提取以下信息：
 1. 基本信息（年份、考试类型）
-2. sections部分中的cloze（完形填空）和readings（阅读理解）部分原文及答案汇总
+2. sections部分中的cloze（完形填空）和readings（阅读理解）部分原文
 不需要提取题目信息。
 
 # 重要说明
@@ -357,6 +653,8 @@ class ContentAnalyzer:
 2. 必须包含完形填空和阅读原文
 3. 不需要提取题目信息，题目将在后续步骤提取
 4. 完形填空的原文请包含空格标记([1], [2]等)
+5. 不需要提供还原后的原文（已将答案填入的版本），还原版本会根据选项和答案在本地生成
+6. 不需要提供答案汇总，选择题答案会从文档的参考答案中在本地解析
 
 # 文档内容
 {document_text}
@@ -372,33 +670,27 @@ class ContentAnalyzer:
   }},
   "sections": {{
     "cloze": {{
-      "original_text": "完形填空原文（卷面版本，包含[1], [2]等标记）",
-      "restored_text": "完形填空原文（还原后版本，已将答案填入）",
-      "answers_summary": "完形填空答案汇总，如'1.D 2.C 3.B...'"
+      "original_text": "完形填空原文（卷面版本，包含[1], [2]等标记）"
     }},
     "reading": {{
       "text_1": {{
-        "original_text": "阅读Text 1原文",
-        "answers_summary": "阅读Text 1答案汇总，如'21.D 22.D 23.A...'"
+        "original_text": "阅读Text 1原文"
       }},
       "text_2": {{
-        "original_text": "阅读Text 2原文",
-        "answers_summary": "阅读Text 2答案汇总"
+        "original_text": "阅读Text 2原文"
       }},
       "text_3": {{
-        "original_text": "阅读Text 3原文",
-        "answers_summary": "阅读Text 3答案汇总"
+        "original_text": "阅读Text 3原文"
       }},
       "text_4": {{
-        "original_text": "阅读Text 4原文",
-        "answers_summary": "阅读Text 4答案汇总"
+        "original_text": "阅读Text 4原文"
       }}
     }}
   }}
 }}
 ```
 
-请确保返回完整的JSON结构，必须包含完形填空和阅读部分的原文和答案汇总，但不要提取具体题目信息。
+请确保返回完整的JSON结构，必须包含完形填空和阅读部分的原文，但不要提取具体题目信息。
             """
         elif segment == 2:
             # 第二部分：sections中的剩余部分(new_type, translation, writing)
@@ -418,7 +710,8 @@ class ContentAnalyzer:
 2. 必须包含new_type, translation, writing等完整原文
 3. 不需要提取cloze和reading部分，它们已在之前步骤提取
 4. 不需要提取题目信息，题目将在后续步骤提取
-5. 对于new_type部分，请同时提供原始文本和还原后的文本（删除人名和题号标记的版本）
+5. 不需要提供还原后的原文，还原版本会根据选项和答案在本地生成
+6. 新题型和翻译不需要提供答案汇总，选择题答案和翻译参考译文会从文档的参考答案中在本地解析
 
 # 文档内容
 {document_text}
@@ -430,13 +723,10 @@ class ContentAnalyzer:
 {{
   "sections": {{
     "new_type": {{
-      "original_text": "新题型原文",
-      "restored_text": "新题型原文（去除人名和题号标记的还原版本）",
-      "answers_summary": "新题型答案汇总，如'41.F 42.C 43.F 44.G 45.B'"
+      "original_text": "新题型原文"
     }},
     "translation": {{
-      "original_text": "翻译部分原文",
-      "answers_summary": "翻译参考答案"
+      "original_text": "翻译部分原文"
     }},
     "writing": {{
       "part_a": {{
@@ -452,7 +742,7 @@ class ContentAnalyzer:
 }}
 ```
 
-请确保返回完整的JSON结构，必须包含各个部分的原文和答案汇总，但不要提取具体题目信息。
+请确保返回完整的JSON结构，必须包含各个部分的原文以及写作的参考答案，但不要提取具体题目信息。
             """
         elif segment == 3:
             # 第三部分：题目1-25
@@ -467,9 +757,8 @@ class ContentAnalyzer:
 # 重要说明
 1. 请确保返回完整的JSON结构
 2. 仅提取题目1-25，不要提取26-52题
-3. 题目信息应包括题号、类型、题干、选项、正确答案和干扰项（干扰项是除正确答案外的选项）
+3. 题目信息应包括题号、类型、题干、选项和正确选项的字母（answer），不需要输出正确答案内容和干扰项
 4. 对于完形填空题（1-20题），不需要提供stem（题干），可以设置为空字符串或"/"
-5. 对于阅读理解题（21-25题及以后），正确答案格式应为"字母]选项内容"，例如"D]hiding them from the locals."
 
 # 文档内容
 {document_text}
@@ -486,8 +775,7 @@ class ContentAnalyzer:
       "section_type": "完形填空",
       "stem": "",  // 完形填空题无需提供stem
       "options": "选项文本，如'A. Without, B. Though, C. Despite, D. Besides'",
-      "correct_answer": "D. Without",
-      "distractors": "干扰项，即除正确答案外的选项，如'A. Though, B. Despite, C. Besides'"
+      "answer": "D"  // 只需正确选项的字母
     }},
     // 阅读理解题（21-25）
     {{
@@ -495,8 +783,7 @@ class ContentAnalyzer:
       "section_type": "阅读理解",
       "stem": "题干文本",
       "options": "A]选项A内容\\n[B]选项B内容\\n[C]选项C内容\\n[D]选项D内容",
-      "correct_answer": "D]选项D的完整内容",  // 带字母和选项内容
-      "distractors": "A]选项A内容\\n[B]选项B内容\\n[C]选项C内容"  // 除正确答案外的所有选项
+      "answer": "D"  // 只需正确选项的字母
     }},
     // ... 其他题目，到25题为止
   ]
@@ -518,8 +805,7 @@ class ContentAnalyzer:
 # 重要说明
 1. 请确保返回完整的JSON结构
 2. 只包含题目26-40，不包含1-25或41-52题
-3. 题目信息应包括题号、类型、题干、选项、正确答案和干扰项（干扰项是除正确答案外的选项）
-4. 对于阅读理解题，正确答案格式应为"字母]选项内容"，例如"B]sharing childcare among community members."，而不仅仅是字母
+3. 题目信息应包括题号、类型、题干、选项和正确选项的字母（answer），不需要输出正确答案内容和干扰项
 
 # 文档内容
 {document_text}
@@ -536,8 +822,7 @@ class ContentAnalyzer:
       "section_type": "阅读理解",
       "stem": "题干文本",
       "options": "[A]选项A内容\\n[B]选项B内容\\n[C]选项C内容\\n[D]选项D内容",
-      "correct_answer": "B]选项B的完整内容",  // 带字母和选项内容
-      "distractors": "[A]选项A内容\\n[C]选项C内容\\n[D]选项D内容"  // 除正确答案外的所有选项
+      "answer": "B"  // 只需正确选项的字母
     }},
     // ... 其他题目，到40题为止
   ]
@@ -559,8 +844,7 @@ class ContentAnalyzer:
 # 重要说明
 1. 请确保返回完整的JSON结构
 2. 只包含题目41-52，不包含1-40题
-3. 题目信息应包括题号、类型、题干、选项、正确答案和干扰项（干扰项是除正确答案外的选项）
-4. 对于新题型题目，正确答案格式应为"字母]选项内容"，例如"F]Ways to get artifacts from other countries must be decent and lawful."，而不仅仅是字母
+3. 题目信息应包括题号、类型、题干、选项和正确选项的字母（answer），不需要输出正确答案内容和干扰项
 
 # 文档内容
 {document_text}
@@ -577,8 +861,7 @@ class ContentAnalyzer:
       "section_type": "新题型",
       "stem": "题干文本",
       "options": "[A]选项A内容\\n[B]选项B内容\\n...",
-      "correct_answer": "F]选项F的完整内容",  // 带字母和选项内容
-      "distractors": "其他选项内容"  // 除正确答案外的所有选项
+      "answer": "F"  // 只需正确选项的字母
     }},
     // ... 其他题目，到52题为止
   ]
@@ -625,20 +908,22 @@ class ContentAnalyzer:
         Args:
             questions: 题目列表
         """
-        # 按题号排序
-        questions.sort(key=lambda q: q.get("number", 0))
+        numbers = [q.get("number", 0) for q in questions]
+        
+        # 按题号排序（合并结果通常已按题号排列，此时无需排序）
+        if any(a > b for a, b in zip(numbers, numbers[1:])):
+            questions.sort(key=lambda q: q.get("number", 0))
         
-        # 验证题号连续性
-        expected_numbers = set(range(1, 53))  # 1-52
-        actual_numbers = set(q.get("number", 0) for q in questions)
+        # 一次计数同时得到缺失和重复的题号
+        counts = Counter(numbers)
         
-        missing_numbers = expected_numbers - actual_numbers
+        missing_numbers = [n for n in get_exam_layout().numbers() if n not in counts]
         if missing_numbers:
-            logger.warning(f"合并后仍有缺失题目: {sorted(list(missing_numbers))}")
+            logger.warning(f"合并后仍有缺失题目: {missing_numbers}")
         
-        duplicate_numbers = [n for n in actual_numbers if [q.get("number") for q in questions].count(n) > 1]
+        duplicate_numbers = [n for n, count in counts.items() if count > 1]
         if duplicate_numbers:
-            logger.warning(f"存在重复题目: {sorted(list(set(duplicate_numbers)))}")
+            logger.warning(f"存在重复题目: {sorted(duplicate_numbers)}")
     
     def _save_debug_info(self, result, document_text, elapsed_time, output_dir):
         """保存调试信息"""
@@ -681,7 +966,7 @@ class ContentAnalyzer:
             # 第一部分：基本信息和sections中的cloze和readings部分
             return f"""
 请分析这份考研英语真题文档，提取基本信息和sections中的cloze和readings部分。
-只需提取metadata、完形填空和阅读理解部分的原文和答案汇总。
+只需提取metadata、完形填空和阅读理解部分的原文，不需要答案汇总。
 返回JSON格式，包含以下结构：
 
 ```json
@@ -692,13 +977,11 @@ class ContentAnalyzer:
   }},
   "sections": {{
     "cloze": {{
-      "original_text": "完形填空原文",
-      "answers_summary": "答案汇总"
+      "original_text": "完形填空原文"
     }},
     "reading": {{
       "text_1": {{
-        "original_text": "阅读1原文",
-        "answers_summary": "答案汇总"
+        "original_text": "阅读1原文"
       }},
       // text_2, text_3, text_4
     }}
@@ -720,13 +1003,10 @@ class ContentAnalyzer:
 {{
   "sections": {{
     "new_type": {{
-      "original_text": "新题型原文",
-      "restored_text": "新题型原文（去除人名和题号标记的还原版本）",
-      "answers_summary": "答案汇总"
+      "original_text": "新题型原文"
     }},
     "translation": {{
-      "original_text": "翻译原文",
-      "answers_summary": "答案汇总"
+      "original_text": "翻译原文"
     }},
     "writing": {{
       // 写作部分内容
@@ -742,11 +1022,10 @@ class ContentAnalyzer:
             # 第三部分：题目1-25
             return f"""
 请分析这份考研英语真题文档，提取题目1-25的信息。
-只需提取题号、题型、题干、选项、正确答案和干扰项，不需要提取原文。
+只需提取题号、题型、题干、选项和正确选项的字母（answer），不需要提取原文。
 
 重要说明：
 1. 对于完形填空题（1-20题），不需要提供stem（题干），可以设置为空字符串或"/"
-2. 对于阅读理解题（21-25题），正确答案格式应为"字母]选项内容"，例如"D]hiding them from the locals."
 
 返回JSON格式，包含以下结构：
 
@@ -758,16 +1037,14 @@ class ContentAnalyzer:
       "section_type": "完形填空",
       "stem": "",  // 完形填空题无需stem
       "options": "选项文本",
-      "correct_answer": "D. Without",
-      "distractors": "干扰项，即除正确答案外的选项"
+      "answer": "D"  // 只需正确选项的字母
     }},
     {{
       "number": 21,
       "section_type": "阅读理解",
       "stem": "题干文本",
       "options": "选项文本",
-      "correct_answer": "D]选项D的完整内容",  // 带字母和完整内容
-      "distractors": "干扰项，即除正确答案外的选项"
+      "answer": "D"  // 只需正确选项的字母
     }},
     // ... 其他题目，到25题为止
   ]
@@ -781,10 +1058,10 @@ class ContentAnalyzer:
             # 第四部分：题目26-40
             return f"""
 请分析这份考研英语真题文档，提取题目26-40的信息。
-只需提取题号、题型、题干、选项、正确答案和干扰项，不需要提取原文。
+只需提取题号、题型、题干、选项和正确选项的字母（answer），不需要提取原文。
 
 重要说明：
-1. 对于阅读理解题，正确答案格式应为"字母]选项内容"，例如"B]sharing childcare among community members."，而不仅仅是字母
+1. answer只需填写正确选项的字母，如"B"
 
 返回JSON格式，仅包含questions数组：
 
@@ -796,8 +1073,7 @@ class ContentAnalyzer:
       "section_type": "阅读理解",
       "stem": "题干文本",
       "options": "选项文本",
-      "correct_answer": "B]选项B的完整内容",  // 带字母和完整内容
-      "distractors": "干扰项，即除正确答案外的选项"
+      "answer": "B"  // 只需正确选项的字母
     }},
     // ... 其他题目，到40题为止
   ]
@@ -811,10 +1087,10 @@ class ContentAnalyzer:
             # 第五部分：题目41-52
             return f"""
 请分析这份考研英语真题文档，提取题目41-52的信息。
-只需提取题号、题型、题干、选项、正确答案和干扰项，不需要提取原文。
+只需提取题号、题型、题干、选项和正确选项的字母（answer），不需要提取原文。
 
 重要说明：
-1. 对于新题型题目，正确答案格式应为"字母]选项内容"，例如"F]Ways to get artifacts from other countries must be decent and lawful."，而不仅仅是字母
+1. answer只需填写正确选项的字母，如"F"
 
 返回JSON格式，仅包含questions数组：
 
@@ -826,8 +1102,7 @@ class ContentAnalyzer:
       "section_type": "新题型",
       "stem": "题干文本",
       "options": "选项文本",
-      "correct_answer": "F]选项F的完整内容",  // 带字母和完整内容
-      "distractors": "干扰项，即除正确答案外的选项"
+      "answer": "F"  // 只需正确选项的字母
     }},
     // ... 其他题目，到52题为止
   ]
@@ -851,13 +1126,11 @@ class ContentAnalyzer:
         """
         basic_questions = []
         
+        layout = get_exam_layout()
+        
         # 根据题目编号和分类创建
         for i in range(1, 26):
-            question_type = ""
-            if 1 <= i <= 20:
-                question_type = "完形填空"
-            elif 21 <= i <= 25:
-                question_type = "阅读Text 1"
+            question_type = layout.label(i)
             
             # 获取一个示例题目的结构
             question_format = {}
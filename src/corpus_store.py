@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+语料库存储模块，将组织后的题目数据保存到SQLite数据库并建立全文索引。
+
+每篇原文按内容哈希只保存一次，题目以(年份, 考试类型, 题号)为主键；
+题干、选项和原文分别建立FTS5全文索引，用于跨年份检索。
+"""
+
+import os
+import re
+import sys
+import csv
+import glob
+import logging
+import sqlite3
+import argparse
+
+from src.passage_store import passage_id
+
+logger = logging.getLogger("考研英语真题处理.corpus_store")
+
+# 默认数据库路径
+DEFAULT_CORPUS_DB = os.path.join("test_results", "corpus.db")
+
+# 数据行中的原文字段 -> questions表中的原文ID列
+PASSAGE_FIELDS = {
+    "原文（卷面）": "passage_id",
+    "原文（还原后）": "restored_passage_id",
+    "原文（句子拆解后）": "split_passage_id"
+}
+
+# 可检索的字段
+SEARCH_FIELDS = ("stem", "options", "passage")
+
+# 检索词中的词元：双引号短语，或不含空白、括号、逗号和引号的连续字符
+_QUERY_TOKEN = re.compile(r'"[^"]*"|[^\s(),"]+')
+
+# FTS5可以直接使用的词元：裸词（字母、数字、下划线和非ASCII字符，可带列名前缀和前缀通配符*）、列名和冒号
+_FTS_BAREWORD = re.compile(r"(?:\w+:)?\w+\*?|\w+:|:")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS passages (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS questions (
+    year TEXT NOT NULL,
+    exam_type TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    question_type TEXT,
+    stem TEXT,
+    options TEXT,
+    answer_letter TEXT,
+    correct_answer TEXT,
+    distractors TEXT,
+    passage_id TEXT REFERENCES passages(id),
+    restored_passage_id TEXT REFERENCES passages(id),
+    split_passage_id TEXT REFERENCES passages(id),
+    PRIMARY KEY (year, exam_type, number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_questions_passage ON questions(passage_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    stem, options, content='questions', content_rowid='rowid', tokenize='porter unicode61'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+    text, content='passages', content_rowid='rowid', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS questions_ai AFTER INSERT ON questions BEGIN
+    INSERT INTO questions_fts(rowid, stem, options) VALUES (new.rowid, new.stem, new.options);
+END;
+CREATE TRIGGER IF NOT EXISTS questions_ad AFTER DELETE ON questions BEGIN
+    INSERT INTO questions_fts(questions_fts, rowid, stem, options) VALUES ('delete', old.rowid, old.stem, old.options);
+END;
+CREATE TRIGGER IF NOT EXISTS questions_au AFTER UPDATE ON questions BEGIN
+    INSERT INTO questions_fts(questions_fts, rowid, stem, options) VALUES ('delete', old.rowid, old.stem, old.options);
+    INSERT INTO questions_fts(rowid, stem, options) VALUES (new.rowid, new.stem, new.options);
+END;
+
+CREATE TRIGGER IF NOT EXISTS passages_ai AFTER INSERT ON passages BEGIN
+    INSERT INTO passages_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS passages_ad AFTER DELETE ON passages BEGIN
+    INSERT INTO passages_fts(passages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+"""
+
+
+def _question_number(value):
+    """将题目编号转换为整数，无法转换时返回None"""
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def fts_query(query):
+    """
+    将用户输入的检索词转换为可安全使用的FTS5查询表达式
+
+    含有连字符等FTS5无法直接识别的字符的词（如self-driving、well-being）加上双引号作为短语检索，
+    未闭合的双引号被忽略；双引号短语、AND/OR/NOT、NEAR(...)、列名过滤和前缀通配符保持不变。
+
+    Args:
+        query (str): 用户输入的检索词
+
+    Returns:
+        str: FTS5查询表达式
+    """
+    if query.count('"') % 2:
+        unmatched = query.rfind('"')
+        query = query[:unmatched] + query[unmatched + 1:]
+
+    def quote(match):
+        token = match.group(0)
+        if token.startswith('"') or _FTS_BAREWORD.fullmatch(token):
+            return token
+        column, term, star = re.fullmatch(r"(\w+:)?(.*?)(\*?)", token).groups()
+        return f'{column or ""}"{term}"{star}'
+
+    return _QUERY_TOKEN.sub(quote, query)
+
+
+class CorpusStore:
+    """
+    基于SQLite的题目语料库，支持按试卷增量更新和全文检索。
+    """
+
+    def __init__(self, db_path=DEFAULT_CORPUS_DB):
+        """
+        初始化语料库
+
+        Args:
+            db_path (str): SQLite数据库路径
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _store_passage(self, text):
+        """保存原文（已存在时跳过），返回原文ID"""
+        pid = passage_id(text)
+        if pid:
+            self.conn.execute("INSERT OR IGNORE INTO passages(id, text) VALUES (?, ?)", (pid, text))
+        return pid
+
+    def upsert_paper(self, rows, passage_store=None):
+        """
+        写入一份或多份试卷的题目数据。
+
+        按(年份, 考试类型)分组，每份试卷在一个事务中更新：已有题目被覆盖，
+        新数据中不存在的旧题目被删除，不再被引用的原文随之清理。
+
+        Args:
+            rows (iterable): DataOrganizer输出的数据行（与CSV列名相同的字典）
+            passage_store (PassageStore, optional): 原文存储，用于还原以引用形式保存的原文
+
+        Returns:
+            int: 写入的题目数
+        """
+        papers = {}
+        for row in rows:
+            if passage_store is not None:
+                row = passage_store.unpack(row)
+            number = _question_number(row.get("题目编号"))
+            if number is None:
+                continue
+            key = (str(row.get("年份", "")), str(row.get("考试类型", "")))
+            papers.setdefault(key, []).append((number, row))
+
+        count = 0
+        with self.conn:
+            for (year, exam_type), items in papers.items():
+                numbers = []
+                for number, row in items:
+                    ids = {column: self._store_passage(row.get(field) or "")
+                           for field, column in PASSAGE_FIELDS.items()}
+                    self.conn.execute(
+                        """
+                        INSERT INTO questions(year, exam_type, number, question_type, stem, options,
+                                              answer_letter, correct_answer, distractors,
+                                              passage_id, restored_passage_id, split_passage_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(year, exam_type, number) DO UPDATE SET
+                            question_type=excluded.question_type, stem=excluded.stem,
+                            options=excluded.options, answer_letter=excluded.answer_letter,
+                            correct_answer=excluded.correct_answer, distractors=excluded.distractors,
+                            passage_id=excluded.passage_id, restored_passage_id=excluded.restored_passage_id,
+                            split_passage_id=excluded.split_passage_id
+                        """,
+                        (year, exam_type, number, row.get("题型", ""), row.get("题干", ""),
+                         row.get("选项", ""), row.get("试卷答案", ""), row.get("正确答案", ""),
+                         row.get("干扰选项", ""), ids["passage_id"], ids["restored_passage_id"],
+                         ids["split_passage_id"])
+                    )
+                    numbers.append(number)
+                    count += 1
+
+                placeholders = ",".join("?" * len(numbers))
+                self.conn.execute(
+                    f"DELETE FROM questions WHERE year=? AND exam_type=? AND number NOT IN ({placeholders})",
+                    (year, exam_type, *numbers)
+                )
+                logger.info(f"语料库已更新: {year}{exam_type}，{len(numbers)} 道题目")
+
+            self._prune_passages()
+        return count
+
+    def _prune_passages(self):
+        """删除不再被任何题目引用的原文"""
+        self.conn.execute(
+            """
+            DELETE FROM passages WHERE id NOT IN (
+                SELECT passage_id FROM questions WHERE passage_id IS NOT NULL
+                UNION SELECT restored_passage_id FROM questions WHERE restored_passage_id IS NOT NULL
+                UNION SELECT split_passage_id FROM questions WHERE split_passage_id IS NOT NULL
+            )
+            """
+        )
+
+    def ingest_csv(self, csv_path, passage_store=None):
+        """
+        将已生成的CSV文件导入语料库
+
+        Args:
+            csv_path (str): CSV文件路径
+            passage_store (PassageStore, optional): 原文存储，CSV中原文为引用时需要提供
+
+        Returns:
+            int: 写入的题目数
+        """
+        with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+            return self.upsert_paper(csv.DictReader(f), passage_store=passage_store)
+
+    def search(self, query, fields=SEARCH_FIELDS, year=None, exam_type=None, limit=20):
+        """
+        全文检索题目
+
+        Args:
+            query (str): FTS5查询表达式，例如 "economy"、"climate NEAR change"、"automat*"
+            fields (tuple): 检索的字段，可选stem（题干）、options（选项）、passage（原文）
+            year (str, optional): 限定年份
+            exam_type (str, optional): 限定考试类型
+            limit (int): 最多返回的结果数
+
+        Returns:
+            list: 结果字典列表，包含年份、考试类型、题目编号、题型、匹配字段和摘要；
+                  原文匹配按篇合并，题目编号为该原文对应的题号范围（如"1-20"）
+        """
+        filters = ""
+        params = []
+        if year:
+            filters += " AND q.year = ?"
+            params.append(str(year))
+        if exam_type:
+            filters += " AND q.exam_type = ?"
+            params.append(exam_type)
+
+        rows = []
+        question_columns = [f for f in fields if f in ("stem", "options")]
+        if question_columns:
+            match = query if len(question_columns) == 2 else f"{question_columns[0]} : ({query})"
+            rows += self.conn.execute(
+                f"""
+                SELECT q.year, q.exam_type, q.number, q.question_type,
+                       '{"/".join(question_columns)}' AS field,
+                       snippet(questions_fts, -1, '[', ']', '…', 12) AS snippet,
+                       bm25(questions_fts) AS score
+                FROM questions_fts JOIN questions q ON q.rowid = questions_fts.rowid
+                WHERE questions_fts MATCH ?{filters}
+                ORDER BY score LIMIT ?
+                """,
+                (match, *params, limit)
+            ).fetchall()
+
+        if "passage" in fields:
+            # 先检索匹配的原文，再按试卷汇总引用该原文的题号
+            passages = self.conn.execute(
+                f"""
+                SELECT p.id, snippet(passages_fts, 0, '[', ']', '…', 12) AS snippet,
+                       bm25(passages_fts) AS score
+                FROM passages_fts JOIN passages p ON p.rowid = passages_fts.rowid
+                WHERE passages_fts MATCH ?
+                  AND p.id IN (SELECT q.passage_id FROM questions q WHERE 1{filters})
+                ORDER BY score LIMIT ?
+                """,
+                (query, *params, limit)
+            ).fetchall()
+            for passage in passages:
+                rows += self.conn.execute(
+                    f"""
+                    SELECT q.year, q.exam_type,
+                           CASE WHEN MIN(q.number) = MAX(q.number) THEN CAST(MIN(q.number) AS TEXT)
+                                ELSE MIN(q.number) || '-' || MAX(q.number) END AS number,
+                           q.question_type, 'passage' AS field, ? AS snippet, ? AS score
+                    FROM questions q
+                    WHERE q.passage_id = ?{filters}
+                    GROUP BY q.year, q.exam_type
+                    """,
+                    (passage["snippet"], passage["score"], passage["id"], *params)
+                ).fetchall()
+
+        rows.sort(key=lambda row: row["score"])
+        return [{
+            "年份": row["year"],
+            "考试类型": row["exam_type"],
+            "题目编号": str(row["number"]),
+            "题型": row["question_type"],
+            "匹配字段": row["field"],
+            "摘要": row["snippet"]
+        } for row in rows[:limit]]
+
+    def stats(self):
+        """
+        返回语料库统计信息
+
+        Returns:
+            dict: 试卷数、题目数和原文数
+        """
+        papers = self.conn.execute("SELECT COUNT(*) FROM (SELECT DISTINCT year, exam_type FROM questions)").fetchone()[0]
+        questions = self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        passages = self.conn.execute("SELECT COUNT(*) FROM passages").fetchone()[0]
+        return {"papers": papers, "questions": questions, "passages": passages}
+
+
+def main():
+    """命令行入口：将已有的CSV结果导入语料库"""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="将考研英语真题CSV结果导入SQLite语料库")
+    parser.add_argument('input_dir', help="CSV结果目录，例如test_results")
+    parser.add_argument('--db', default=DEFAULT_CORPUS_DB, help="语料库数据库路径")
+    parser.add_argument('--pattern', default="*/*.csv", help="CSV文件匹配模式（相对于输入目录）")
+    parser.add_argument('--passage-store', help="原文存储目录，CSV中原文以引用形式保存时需要指定")
+
+    args = parser.parse_args()
+
+    passage_store = None
+    if args.passage_store:
+        from src.passage_store import PassageStore
+        passage_store = PassageStore(args.passage_store)
+
+    csv_paths = sorted(glob.glob(os.path.join(args.input_dir, args.pattern)))
+    if not csv_paths:
+        logger.error(f"未找到CSV文件: {os.path.join(args.input_dir, args.pattern)}")
+        return 1
+
+    with CorpusStore(args.db) as store:
+        for csv_path in csv_paths:
+            store.ingest_csv(csv_path, passage_store=passage_store)
+        logger.info(f"语料库统计: {store.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ CSV生成模块，负责生成最终的CSV文件。
 import os
 import csv
 import logging
-import pandas as pd
+from itertools import islice
 from pathlib import Path
 
 logger = logging.getLogger("考研英语真题处理.csv_generator")
@@ -38,13 +38,59 @@ class CSVGenerator:
             "干扰选项"
         ]
     
-    def generate_csv(self, data, output_file):
+    def iter_rows(self, data):
+        """
+        按列顺序逐行生成CSV数据行，缺失的字段填充为空字符串。
+        
+        Args:
+            data (iterable): 结构化数据（字典）的任意可迭代对象
+        
+        Yields:
+            list: 按self.column_order排列的字段值
+        """
+        column_order = self.column_order
+        for item in data:
+            yield [item.get(column, "") for column in column_order]
+    
+    def write_rows(self, data, output_file, passage_store=None):
+        """
+        以流式方式将数据写入CSV文件，不在内存中保留全部数据。
+        
+        Args:
+            data (iterable): 结构化数据（字典）的任意可迭代对象，可以是生成器
+            output_file (str): 输出CSV文件路径
+            passage_store (PassageStore, optional): 原文存储，提供时原文列写为"@passage:<sha256>"引用
+        
+        Returns:
+            int: 写入的数据行数
+        """
+        if passage_store is not None:
+            data = (passage_store.pack(item) for item in data)
+        
+        # 创建输出目录（如果不存在）
+        output_dir = os.path.dirname(output_file)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        count = 0
+        # 使用带BOM的UTF-8编码，确保Excel正确识别中文
+        with open(output_file, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            # 与之前pandas输出保持一致，使用\n作为行结束符
+            writer = csv.writer(csvfile, lineterminator='\n')
+            writer.writerow(self.column_order)
+            for row in self.iter_rows(data):
+                writer.writerow(row)
+                count += 1
+        return count
+    
+    def generate_csv(self, data, output_file, passage_store=None):
         """
         将结构化数据输出为CSV文件。
         
         Args:
-            data (list): 结构化数据列表
+            data (iterable): 结构化数据列表，也可以是逐条产生数据的生成器
             output_file (str): 输出CSV文件路径
+            passage_store (PassageStore, optional): 原文存储，提供时原文列以引用形式写入
         
         Returns:
             bool: 是否成功生成CSV文件
@@ -52,26 +98,8 @@ class CSVGenerator:
         logger.info(f"开始生成CSV文件: {output_file}")
         
         try:
-            # 创建输出目录（如果不存在）
-            output_dir = os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # 使用pandas生成CSV
-            df = pd.DataFrame(data)
-            
-            # 确保所有列都存在（如果不存在则添加空列）
-            for column in self.column_order:
-                if column not in df.columns:
-                    df[column] = ""
-            
-            # 按照指定顺序排列列
-            df = df[self.column_order]
-            
-            # 保存为CSV
-            df.to_csv(output_file, index=False, encoding='utf-8-sig')  # 使用带BOM的UTF-8编码，确保Excel正确识别中文
-            
-            logger.info(f"成功生成CSV文件，包含 {len(data)} 条记录")
+            count = self.write_rows(data, output_file, passage_store=passage_store)
+            logger.info(f"成功生成CSV文件，包含 {count} 条记录")
             return True
             
         except Exception as e:
@@ -80,92 +108,47 @@ class CSVGenerator:
     
     def generate_csv_manual(self, data, output_file):
         """
-        使用CSV模块手动生成CSV文件（不依赖pandas）。
+        使用CSV模块生成CSV文件（不依赖pandas）。
+        
+        保留此方法以兼容旧代码，现与generate_csv相同。
         
         Args:
-            data (list): 结构化数据列表
+            data (iterable): 结构化数据列表
             output_file (str): 输出CSV文件路径
         
         Returns:
             bool: 是否成功生成CSV文件
         """
-        logger.info(f"开始手动生成CSV文件: {output_file}")
-        
-        try:
-            # 创建输出目录（如果不存在）
-            output_dir = os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # 打开文件，使用utf-8-sig编码
-            with open(output_file, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self.column_order)
-                
-                # 写入表头
-                writer.writeheader()
-                
-                # 写入数据行
-                for item in data:
-                    # 确保所有字段都存在
-                    row_data = {}
-                    for column in self.column_order:
-                        row_data[column] = item.get(column, "")
-                    
-                    writer.writerow(row_data)
-            
-            logger.info(f"成功手动生成CSV文件，包含 {len(data)} 条记录")
-            return True
-            
-        except Exception as e:
-            logger.error(f"手动生成CSV文件失败: {str(e)}")
-            return False
+        return self.generate_csv(data, output_file)
     
     def preview_data(self, data, max_rows=5):
         """
         预览数据，用于调试和验证。
         
         Args:
-            data (list): 数据列表
+            data (iterable): 数据列表或可迭代对象
             max_rows (int, optional): 最大预览行数
         
         Returns:
             str: 格式化的预览文本
         """
-        if not data:
-            return "数据为空"
-        
         # 限制行数
-        preview_data = data[:max_rows]
+        preview_data = list(islice(data, max_rows))
+        if not preview_data:
+            return "数据为空"
         
         # 创建预览内容
-        preview_text = "数据预览（前 {} 行）:\n".format(min(max_rows, len(data)))
+        preview_text = "数据预览（前 {} 行）:\n".format(len(preview_data))
+        preview_text += "字段: " + ", ".join(self.column_order) + "\n"
         
-        # 使用pandas格式化预览
-        try:
-            df = pd.DataFrame(preview_data)
-            
-            # 确保所有列都存在
-            for column in self.column_order:
-                if column not in df.columns:
-                    df[column] = ""
-            
-            # 按照指定顺序排列列
-            df = df[self.column_order]
-            
-            # 将DataFrame转换为字符串格式
-            preview_text += df.to_string()
-            
-        except Exception as e:
-            # 如果pandas预览失败，使用简单格式预览
-            preview_text += "字段: " + ", ".join(self.column_order) + "\n"
-            
-            for i, item in enumerate(preview_data):
-                preview_text += f"行 {i+1}:\n"
-                for column in self.column_order:
-                    value = item.get(column, "")
-                    # 截断过长的值
-                    if isinstance(value, str) and len(value) > 50:
-                        value = value[:47] + "..."
-                    preview_text += f"  {column}: {value}\n"
-        
-        return preview_text 
\ No newline at end of file
+        for i, row in enumerate(self.iter_rows(preview_data)):
+            preview_text += f"行 {i+1}:\n"
+            for column, value in zip(self.column_order, row):
+                if value is None:
+                    value = ""
+                # 截断过长的值
+                if isinstance(value, str) and len(value) > 50:
+                    value = value[:47] + "..."
+                preview_text += f"  {column}: {value}\n"
+        
+        return preview_text
@@ -11,18 +11,52 @@ import json
 import logging
 from pathlib import Path
 
+from src.exam_layout import get_exam_layout
+from src.question_record import QuestionRecord, Passage, to_rows
+from src.option_parser import parse_options, answer_letter, answer_fields
+from src.passage_restorer import restore_section
+from src.answer_key import format_answers
+
 logger = logging.getLogger("考研英语真题处理.data_organizer")
 
+# 字段名称映射（英文字段 -> 中文字段），中文字段保持不变
+FIELD_MAPPING = {
+    # 通用字段
+    "number": "题目编号",
+    "section_type": "题型",
+    "stem": "题干",
+    "options": "选项",
+    "correct_answer": "正确答案",
+    "distractors": "干扰选项",
+    
+    # 可能出现的其他字段
+    "question_type": "题型",
+    "question_number": "题目编号",
+    "question_stem": "题干",
+    "question_options": "选项",
+    "answer": "正确答案",
+    "distractor_options": "干扰选项"
+}
+
+
+def _number_key(item):
+    """排序用：返回题目编号的整数值"""
+    return int(item.get("题目编号", 0))
+
+
 class DataOrganizer:
     """
     数据组织器，负责规范和组织提取的考研英语试题数据。
     """
     
-    def __init__(self):
+    def __init__(self, passage_store=None):
         """
         初始化数据组织器。
+        
+        Args:
+            passage_store (PassageStore, optional): 原文存储，用于还原输入数据中的原文引用
         """
-        pass
+        self.passage_store = passage_store
     
     def organize_data(self, raw_data, year=None, exam_type=None):
         """
@@ -34,15 +68,133 @@ class DataOrganizer:
             exam_type (str, optional): 考试类型，如未提供将从数据中推断
         
         Returns:
-            list: 组织好的数据列表，每个元素是一道题目的完整信息
+            list: 组织好的题目记录（QuestionRecord）列表，每个元素是一道题目的完整信息
         """
         logger.info("开始组织和规范化数据")
         
+        raw_data = self._unpack(raw_data)
+        
         # 检查是否是新的JSON格式
-        if isinstance(raw_data, dict) and "metadata" in raw_data and "sections" in raw_data and "questions" in raw_data:
+        if self._is_new_format(raw_data):
             logger.info("检测到新的JSON格式，使用新的处理方法")
             return self._process_new_format(raw_data, year, exam_type)
         
+        organized_data = self._legacy_records(raw_data, year, exam_type)
+        
+        # 按题目编号排序
+        if organized_data:
+            try:
+                organized_data.sort(key=_number_key)
+            except Exception as e:
+                logger.warning(f"按题目编号排序失败: {str(e)}")
+        
+        logger.info(f"数据组织完成，共 {len(organized_data)} 道题目")
+        return organized_data
+    
+    def postprocess(self, raw_data, splitter_function=None, year=None, exam_type=None):
+        """
+        一次完成提取结果的后处理：组织、补全缺失题目、句子拆分和排序。
+        
+        与依次调用organize_data、ensure_complete_dataset和apply_sentence_splitter的结果相同，
+        但题目按题号放入试卷结构对应的位置，只遍历一次，不再多次排序和复制列表；
+        重复和缺失的题号在同一次遍历中检测。
+        
+        Args:
+            raw_data (dict|list): API返回的原始数据（或已有的数据行列表）
+            splitter_function (callable, optional): 句子拆分器函数，为None时不拆分
+            year (str, optional): 考试年份，如未提供将从数据中推断
+            exam_type (str, optional): 考试类型，如未提供将从数据中推断
+        
+        Returns:
+            list: 按题号排列的完整题目记录列表
+        """
+        logger.info("开始后处理数据（组织、补全、句子拆分）")
+        
+        raw_data = self._unpack(raw_data)
+        
+        if self._is_new_format(raw_data):
+            logger.info("检测到新的JSON格式，使用新的处理方法")
+            records, year, exam_type = self._new_format_records(raw_data, year, exam_type)
+            fill_year, fill_exam_type = year, exam_type
+        else:
+            records = self._legacy_records(raw_data, year, exam_type)
+            # 与ensure_complete_dataset的默认值一致
+            fill_year, fill_exam_type = "2023", "英语（一）"
+        
+        # 按题号分桶（保持同一题号内的原有顺序），不在试卷结构中的题号单独排序
+        layout = get_exam_layout(fill_exam_type)
+        buckets = [None] * (layout.total_questions + 1)
+        others = []
+        for record in records:
+            try:
+                number = int(record.get("题目编号", 0))
+            except (TypeError, ValueError):
+                logger.warning(f"无效的题号: {record.get('题目编号')}")
+                others.append((float("inf"), record))
+                continue
+            if 1 <= number <= layout.total_questions:
+                if buckets[number] is None:
+                    buckets[number] = [record]
+                else:
+                    buckets[number].append(record)
+            else:
+                others.append((number, record))
+        others.sort(key=lambda item: item[0])
+        
+        duplicates = [number for number in layout.numbers() if buckets[number] and len(buckets[number]) > 1]
+        if duplicates:
+            logger.warning(f"存在重复题目: {duplicates}")
+        
+        # 按题号顺序输出，缺失的题号填充占位题目，共享同一原文的题目只拆分一次
+        processed = []
+        placeholders = {}
+        split_passages = set()
+        
+        def emit(record):
+            if splitter_function is not None:
+                self._split_record(record, splitter_function, split_passages)
+            processed.append(record)
+        
+        for number, record in others:
+            if number < 1:
+                emit(record)
+        for number in layout.numbers():
+            bucket = buckets[number]
+            if bucket is None:
+                logger.warning(f"填充缺失题号: {number}")
+                emit(self._placeholder(number, layout, fill_year, fill_exam_type, placeholders))
+            else:
+                for record in bucket:
+                    emit(record)
+        for number, record in others:
+            if number >= 1:
+                emit(record)
+        
+        logger.info(f"后处理完成，共 {len(processed)} 道题目")
+        return processed
+    
+    def _unpack(self, raw_data):
+        """还原以引用形式保存的原文（例如从原文存储压缩过的提取结果重新组织）"""
+        if self.passage_store is not None:
+            return self.passage_store.unpack(raw_data)
+        return raw_data
+    
+    def _is_new_format(self, raw_data):
+        """判断是否为包含metadata、sections和questions的新JSON格式"""
+        return isinstance(raw_data, dict) and "metadata" in raw_data and "sections" in raw_data and "questions" in raw_data
+    
+    def _legacy_records(self, raw_data, year=None, exam_type=None):
+        """
+        将旧格式数据（题目列表或包含题目的字典）转换为题目记录（未排序）。
+        
+        Args:
+            raw_data (dict|list): 原始数据
+            year (str, optional): 考试年份
+            exam_type (str, optional): 考试类型
+        
+        Returns:
+            list: 题目记录列表
+        """
         # 检查raw_data格式并处理
         if isinstance(raw_data, list):
             # 假设raw_data已经是题目数据列表
@@ -58,58 +210,69 @@ class DataOrganizer:
             logger.error(f"不支持的数据格式: {type(raw_data)}")
             return []
         
-        # 处理每个题目数据
+        # 处理每个题目数据：标准化字段名称并转换为题目记录，原文相同的题目共享原文对象
         organized_data = []
+        passages = {}
         for question in questions_data:
             try:
+                record = QuestionRecord.from_dict(question, passages, FIELD_MAPPING)
+                
                 # 补充或覆盖年份和考试类型（如果提供）
                 if year:
-                    question["年份"] = year
+                    record.year = year
                 if exam_type:
-                    question["考试类型"] = exam_type
+                    record.exam_type = exam_type
                 
-                # 标准化字段名称
-                standardized_question = self._standardize_fields(question)
+                # 根据题目编号补充题型信息（缺少题号的题目会在此处报错并被跳过）
+                record.question_type = self._get_question_type(int(record.number), exam_type)
+                self._derive_answer_fields(record)
                 
-                # 添加缺失字段的默认值
-                complete_question = self._add_missing_fields(standardized_question)
-                
-                # 根据题目编号补充题型信息
-                if "题目编号" in complete_question:
-                    question_number = complete_question["题目编号"]
-                    if isinstance(question_number, str):
-                        question_number = int(question_number)
-                    
-                    # 覆盖或添加题型字段
-                    complete_question["题型"] = self._get_question_type(question_number)
-                
-                organized_data.append(complete_question)
+                organized_data.append(record)
                 
             except Exception as e:
                 logger.error(f"处理题目数据时出错: {str(e)}")
                 logger.debug(f"问题数据: {question}")
         
+        return organized_data
+    
+    def _process_new_format(self, raw_data, year=None, exam_type=None):
+        """
+        处理新的JSON格式数据。
+        
+        Args:
+            raw_data (dict): 新格式的API返回数据
+            year (str, optional): 考试年份，如未提供将从数据中推断
+            exam_type (str, optional): 考试类型，如未提供将从数据中推断
+            
+        Returns:
+            list: 组织好的数据列表
+        """
+        organized_data, year, exam_type = self._new_format_records(raw_data, year, exam_type)
+        
         # 按题目编号排序
         if organized_data:
             try:
-                organized_data.sort(key=lambda x: int(x.get("题目编号", 0)))
+                organized_data.sort(key=_number_key)
             except Exception as e:
                 logger.warning(f"按题目编号排序失败: {str(e)}")
         
-        logger.info(f"数据组织完成，共 {len(organized_data)} 道题目")
+        # 确保数据集完整
+        organized_data = self.ensure_complete_dataset(organized_data, year, exam_type)
+        
+        logger.info(f"新格式数据处理完成，共 {len(organized_data)} 道题目")
         return organized_data
     
-    def _process_new_format(self, raw_data, year=None, exam_type=None):
+    def _new_format_records(self, raw_data, year=None, exam_type=None):
         """
-        处理新的JSON格式数据。
+        将新格式数据转换为题目记录（未排序、未补全）。
         
         Args:
             raw_data (dict): 新格式的API返回数据
             year (str, optional): 考试年份，如未提供将从数据中推断
             exam_type (str, optional): 考试类型，如未提供将从数据中推断
-            
+        
         Returns:
-            list: 组织好的数据列表
+            tuple: (题目记录列表, 年份, 考试类型)
         """
         logger.info("开始处理新格式JSON数据")
         
@@ -122,365 +285,244 @@ class DataOrganizer:
         year = year or metadata.get("year", "")
         exam_type = exam_type or metadata.get("exam_type", "")
         
-        # 整理原文信息和答案信息
-        section_texts = {}
-        section_answers = {}
+        # 试卷结构（题号 -> 板块）
+        layout = get_exam_layout(exam_type)
         
-        # 解析各板块的答案汇总，转换为题号->答案的映射
+        # 整理各板块的原文和答案汇总（按题型名称），并解析答案汇总为题号->答案的映射
+        section_texts = {}
         answer_mappings = {}
-        
-        # 完形填空
-        if "cloze" in sections:
-            section_texts["完形填空"] = {
-                "原文（卷面）": sections["cloze"].get("original_text", ""),
-                "原文（还原后）": sections["cloze"].get("restored_text", ""),
-                "答案汇总": sections["cloze"].get("answers_summary", "")
-            }
-            # 解析完形填空答案
-            answers_summary = sections["cloze"].get("answers_summary", "")
-            answer_mappings.update(self._parse_answers_summary(answers_summary))
-        
-        # 阅读理解
-        if "reading" in sections:
-            for i, text_key in enumerate(["text_1", "text_2", "text_3", "text_4"]):
-                if text_key in sections["reading"]:
-                    section_name = f"阅读理解" if i == 0 else f"阅读理解 Text {i+1}"
-                    if i == 0:
-                        # 为第一篇阅读文章设置两个名称：既可以是"阅读理解"也可以是"阅读理解 Text 1"
-                        section_texts["阅读理解"] = {
-                            "原文（卷面）": sections["reading"][text_key].get("original_text", ""),
-                            "原文（还原后）": sections["reading"][text_key].get("original_text", ""),  # 阅读没有还原版本
-                            "答案汇总": sections["reading"][text_key].get("answers_summary", "")
-                        }
-                        section_texts["阅读理解 Text 1"] = section_texts["阅读理解"]
-                        # 解析阅读理解答案
-                        answers_summary = sections["reading"][text_key].get("answers_summary", "")
-                        answer_mappings.update(self._parse_answers_summary(answers_summary))
-                    else:
-                        section_texts[section_name] = {
-                            "原文（卷面）": sections["reading"][text_key].get("original_text", ""),
-                            "原文（还原后）": sections["reading"][text_key].get("original_text", ""),  # 阅读没有还原版本
-                            "答案汇总": sections["reading"][text_key].get("answers_summary", "")
-                        }
-                        # 解析阅读理解答案
-                        answers_summary = sections["reading"][text_key].get("answers_summary", "")
-                        answer_mappings.update(self._parse_answers_summary(answers_summary))
-        
-        # 新题型
-        if "new_type" in sections:
-            section_texts["新题型"] = {
-                "原文（卷面）": sections["new_type"].get("original_text", ""),
-                "原文（还原后）": sections["new_type"].get("restored_text", ""),
-                "答案汇总": sections["new_type"].get("answers_summary", "")
-            }
-            # 解析新题型答案
-            answers_summary = sections["new_type"].get("answers_summary", "")
-            answer_mappings.update(self._parse_answers_summary(answers_summary))
-        
-        # 翻译
-        if "translation" in sections:
-            section_texts["翻译"] = {
-                "原文（卷面）": sections["translation"].get("original_text", ""),
-                "原文（还原后）": sections["translation"].get("original_text", ""),  # 翻译没有还原版本
-                "答案汇总": sections["translation"].get("answers_summary", "N/A")
-            }
-            # 解析翻译答案(如果有)
-            answers_summary = sections["translation"].get("answers_summary", "")
-            if answers_summary and answers_summary != "N/A":
+        # 提取结果中自带的还原后原文（旧版提示词生成），本地无法还原时使用
+        model_restored = {}
+        
+        for section in layout.sections:
+            section_data = sections.get(section.section_key)
+            if section.part is not None and isinstance(section_data, dict):
+                section_data = section_data.get(section.part)
+            if not isinstance(section_data, dict):
+                continue
+            
+            original_text = section_data.get("original_text", "")
+            # 翻译和写作没有选择题答案，答案汇总默认为"N/A"
+            default_summary = "N/A" if section.section_key in ("translation", "writing") else ""
+            answers_summary = section_data.get("answers_summary", default_summary)
+            # 翻译的参考译文在本地从文档的参考答案中解析，模型没有给出时使用
+            if section.section_key == "translation" and answers_summary in ("", "N/A") \
+                    and raw_data.get("translation_reference"):
+                answers_summary = raw_data["translation_reference"]
+            section_texts[section.label] = Passage(
+                original=original_text,
+                # 阅读、翻译和写作没有还原版本；完形填空和新题型在题目处理完成后本地还原
+                restored="" if section.restored else original_text,
+                answers_summary=answers_summary
+            )
+            if section.restored:
+                model_restored[section.label] = section_data.get("restored_text", "")
+            if section.parse_answers and answers_summary and answers_summary != "N/A":
                 answer_mappings.update(self._parse_answers_summary(answers_summary))
         
-        # 写作
-        if "writing" in sections:
-            if "part_a" in sections["writing"]:
-                section_texts["写作A"] = {
-                    "原文（卷面）": sections["writing"]["part_a"].get("original_text", ""),
-                    "原文（还原后）": sections["writing"]["part_a"].get("original_text", ""),  # 写作没有还原版本
-                    "答案汇总": sections["writing"]["part_a"].get("answers_summary", "N/A")
-                }
-            if "part_b" in sections["writing"]:
-                section_texts["写作B"] = {
-                    "原文（卷面）": sections["writing"]["part_b"].get("original_text", ""),
-                    "原文（还原后）": sections["writing"]["part_b"].get("original_text", ""),  # 写作没有还原版本
-                    "答案汇总": sections["writing"]["part_b"].get("answers_summary", "N/A")
-                }
+        # 文档自带的参考答案优先于模型给出的答案，并用来核对模型的答案
+        answer_key = self._load_answer_key(raw_data.get("answer_key"))
+        if answer_key:
+            self._check_answer_key(answer_key, questions, answer_mappings)
+            answer_mappings.update(answer_key)
+        
+        # 第一篇阅读也可以用"阅读理解"指代
+        reading_labels = [section.label for section in layout.sections if section.section_key == "reading"]
+        if reading_labels and reading_labels[0] in section_texts:
+            section_texts["阅读理解"] = section_texts[reading_labels[0]]
         
         # 处理每个题目数据
         organized_data = []
         
-        # 记录已生成的题型对应表（用于处理题型名称差异）
-        section_type_mapping = {}
-        
-        # 如果questions列表为空或只有少量题目，尝试创建全部52题的题目结构
+        # 如果questions列表为空或只有少量题目，尝试创建全部题目的结构
         if len(questions) < 10:  # 假设少于10道题意味着数据不完整
             logger.warning(f"API返回的题目数量不足(仅有{len(questions)}道)，创建完整题目结构")
-            temp_questions = []
-            
-            # 保存原来的questions，以便后续合并
-            original_questions = questions.copy()
             
-            # 创建52道题的基本结构
-            for num in range(1, 53):
-                question_type = self._get_question_type(num)
-                temp_questions.append({
-                    "number": num,
-                    "section_type": question_type,
-                    "stem": f"[题号 {num}]",
-                    "options": "",
-                    "correct_answer": "",
-                    "distractor_options": ""
-                })
+            # 创建全部题目的基本结构
+            temp_questions = [{
+                "number": num,
+                "section_type": layout.label(num),
+                "stem": f"[题号 {num}]",
+                "options": "",
+                "correct_answer": "",
+                "distractor_options": ""
+            } for num in layout.numbers()]
             
             # 将原始questions中的数据合并到临时questions中
-            for orig_q in original_questions:
-                if "number" in orig_q and 1 <= orig_q["number"] <= 52:
+            for orig_q in questions:
+                if "number" in orig_q and 1 <= orig_q["number"] <= layout.total_questions:
                     # 用原始数据覆盖对应题号的临时数据
                     temp_questions[orig_q["number"]-1] = orig_q
             
             # 用合并后的数据替换原始questions
             questions = temp_questions
         
+        empty_section = Passage(answers_summary="")
+        
         for question in questions:
             try:
                 # 获取题号和题型
                 number = question.get("number", 0)
                 section_type = question.get("section_type", "")
                 
-                # 如果之前遇到过相同题号范围的题型，使用之前的映射
-                if number in section_type_mapping:
-                    mapped_section_type = section_type_mapping[number]
-                else:
-                    # 根据题号范围推断题型
-                    mapped_section_type = self._map_section_type(section_type, number)
-                    section_type_mapping[number] = mapped_section_type
+                # 按题号查表得到标准题型，题号不在试卷结构中时根据原始题型名称判断
+                mapped_section_type = self._map_section_type(section_type, number, exam_type)
                 
-                # 获取正确答案并解析为单独的答案格式
+                # 获取答案字母：当前的提取格式只输出answer字母，旧的提取结果带有完整的correct_answer
                 correct_answer = question.get("correct_answer", "")
-                individual_answer = self._parse_individual_answer(number, correct_answer, answer_mappings)
+                individual_answer = self._parse_individual_answer(
+                    number, correct_answer or question.get("answer", ""), answer_mappings)
                 
-                # 构建标准格式的题目数据
-                question_data = {
-                    "年份": year,
-                    "考试类型": exam_type,
-                    "题型": mapped_section_type,
-                    "题目编号": str(number),
-                    "题干": question.get("stem", ""),
-                    "选项": question.get("options", ""),
-                    "正确答案": correct_answer,
-                    "干扰选项": question.get("distractor_options", ""),
-                    "试卷答案": individual_answer  # 每道题的单独答案（如"A"、"B"等）
-                }
-                
-                # 添加原文信息（根据映射后的题型）
-                if mapped_section_type in section_texts:
-                    question_data["原文（卷面）"] = section_texts[mapped_section_type]["原文（卷面）"]
-                    question_data["原文（还原后）"] = section_texts[mapped_section_type]["原文（还原后）"]
-                    # 保存板块的答案汇总（用于调试）
-                    question_data["答案汇总"] = section_texts[mapped_section_type]["答案汇总"]
-                else:
-                    # 如果找不到对应的题型，尝试使用原始题型
-                    if section_type in section_texts:
-                        question_data["原文（卷面）"] = section_texts[section_type]["原文（卷面）"]
-                        question_data["原文（还原后）"] = section_texts[section_type]["原文（还原后）"]
-                        question_data["答案汇总"] = section_texts[section_type]["答案汇总"]
-                    else:
-                        # 最后尝试根据题号范围来匹配
-                        found_section = False
-                        if 1 <= number <= 20 and "完形填空" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["完形填空"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["完形填空"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["完形填空"]["答案汇总"]
-                            found_section = True
-                        elif 21 <= number <= 25 and "阅读理解 Text 1" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["阅读理解 Text 1"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["阅读理解 Text 1"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["阅读理解 Text 1"]["答案汇总"]
-                            found_section = True
-                        elif 26 <= number <= 30 and "阅读理解 Text 2" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["阅读理解 Text 2"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["阅读理解 Text 2"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["阅读理解 Text 2"]["答案汇总"]
-                            found_section = True
-                        elif 31 <= number <= 35 and "阅读理解 Text 3" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["阅读理解 Text 3"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["阅读理解 Text 3"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["阅读理解 Text 3"]["答案汇总"]
-                            found_section = True
-                        elif 36 <= number <= 40 and "阅读理解 Text 4" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["阅读理解 Text 4"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["阅读理解 Text 4"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["阅读理解 Text 4"]["答案汇总"]
-                            found_section = True
-                        elif 41 <= number <= 45 and "新题型" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["新题型"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["新题型"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["新题型"]["答案汇总"]
-                            found_section = True
-                        elif 46 <= number <= 50 and "翻译" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["翻译"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["翻译"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["翻译"]["答案汇总"]
-                            found_section = True
-                        elif number == 51 and "写作A" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["写作A"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["写作A"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["写作A"]["答案汇总"]
-                            found_section = True
-                        elif number == 52 and "写作B" in section_texts:
-                            question_data["原文（卷面）"] = section_texts["写作B"]["原文（卷面）"]
-                            question_data["原文（还原后）"] = section_texts["写作B"]["原文（还原后）"]
-                            question_data["答案汇总"] = section_texts["写作B"]["答案汇总"]
-                            found_section = True
-                        
-                        if not found_section:
-                            # 如果依然找不到，使用默认值
-                            question_data["原文（卷面）"] = ""
-                            question_data["原文（还原后）"] = ""
-                            question_data["答案汇总"] = ""
-                
-                # 添加缺失字段的默认值
-                complete_question = self._add_missing_fields(question_data)
-                
-                organized_data.append(complete_question)
+                # 构建题目记录，原文信息和板块的答案汇总（用于调试）引用板块共享的原文对象：
+                # 优先使用标准题型，其次使用原始题型
+                record = QuestionRecord(
+                    year=year,
+                    exam_type=exam_type,
+                    question_type=mapped_section_type,
+                    number=str(number),
+                    stem=question.get("stem", ""),
+                    options=question.get("options", ""),
+                    correct_answer=correct_answer,
+                    distractors=question.get("distractor_options") or question.get("distractors", ""),
+                    answer=individual_answer,  # 每道题的单独答案（如"A"、"B"等）
+                    passage=section_texts.get(mapped_section_type) or section_texts.get(section_type) or empty_section
+                )
+                self._derive_answer_fields(record)
+                organized_data.append(record)
                 
             except Exception as e:
                 logger.error(f"处理新格式题目数据时出错: {str(e)}")
                 logger.debug(f"问题数据: {question}")
         
-        # 按题目编号排序
-        if organized_data:
-            try:
-                organized_data.sort(key=lambda x: int(x.get("题目编号", 0)))
-            except Exception as e:
-                logger.warning(f"按题目编号排序失败: {str(e)}")
-        
-        # 确保数据集完整(52题)
-        organized_data = self.ensure_complete_dataset(organized_data, year, exam_type)
+        self._summarize_answers(layout, section_texts, organized_data)
+        self._restore_passages(layout, section_texts, model_restored, organized_data)
         
-        logger.info(f"新格式数据处理完成，共 {len(organized_data)} 道题目")
-        return organized_data
+        return organized_data, year, exam_type
     
-    def _standardize_fields(self, question):
+    def _load_answer_key(self, answer_key):
         """
-        标准化字段名称，确保字段名称统一。
+        读取提取结果中的参考答案（JSON中的题号为字符串）
         
         Args:
-            question (dict): 原始题目数据
-            
+            answer_key (dict): 题号 -> 答案字母，没有参考答案时为None
+        
         Returns:
-            dict: 标准化后的题目数据
-        """
-        # 字段名称映射
-        field_mapping = {
-            # 通用字段
-            "number": "题目编号",
-            "section_type": "题型",
-            "stem": "题干",
-            "options": "选项",
-            "correct_answer": "正确答案",
-            "distractors": "干扰选项",
-            
-            # 可能出现的其他字段
-            "question_type": "题型",
-            "question_number": "题目编号",
-            "question_stem": "题干",
-            "question_options": "选项",
-            "answer": "正确答案",
-            "distractor_options": "干扰选项",
-            
-            # 中文字段保持不变
-            "题目编号": "题目编号",
-            "题型": "题型",
-            "题干": "题干",
-            "选项": "选项",
-            "正确答案": "正确答案",
-            "干扰选项": "干扰选项",
-            "年份": "年份",
-            "考试类型": "考试类型",
-            "原文（卷面）": "原文（卷面）",
-            "原文（还原后）": "原文（还原后）",
-            "原文（句子拆解后）": "原文（句子拆解后）",
-            "试卷答案": "试卷答案"
-        }
-        
-        # 创建新的标准化字段字典
-        standardized = {}
-        
-        for key, value in question.items():
-            # 如果字段在映射中，使用映射后的名称
-            if key in field_mapping:
-                standardized[field_mapping[key]] = value
-            else:
-                # 对未知字段，保留原始名称
-                standardized[key] = value
+            dict: 题号(int) -> 答案字母
+        """
+        if not isinstance(answer_key, dict):
+            return {}
         
-        return standardized
+        result = {}
+        for number, letter in answer_key.items():
+            try:
+                result[int(number)] = letter
+            except (TypeError, ValueError):
+                logger.warning(f"参考答案中的题号无效: {number}")
+        return result
     
-    def _add_missing_fields(self, question):
+    def _check_answer_key(self, answer_key, questions, answer_mappings):
         """
-        添加缺失字段的默认值。
+        核对模型给出的答案与文档的参考答案，不一致时记录警告
         
         Args:
-            question (dict): 标准化后的题目数据
-            
-        Returns:
-            dict: 补充完整的题目数据
-        """
-        # 必需字段的默认值
-        default_values = {
-            "题目编号": "",
-            "题型": "",
-            "题干": "",
-            "选项": "",
-            "正确答案": "",
-            "干扰选项": "",
-            "年份": "",
-            "考试类型": "",
-            "原文（卷面）": "",
-            "原文（还原后）": "",
-            "原文（句子拆解后）": "",
-            "试卷答案": ""
-        }
-        
-        # 创建新的完整字段字典
-        complete = question.copy()
-        
-        # 添加默认值
-        for field, default_value in default_values.items():
-            if field not in complete:
-                complete[field] = default_value
-                
-        return complete
+            answer_key (dict): 参考答案，题号(int) -> 答案字母
+            questions (list): 提取结果中的题目列表
+            answer_mappings (dict): 从模型的答案汇总中解析的题号->答案映射
+        """
+        model_answers = {}
+        for question in questions:
+            number = question.get("number")
+            letter = answer_letter(question.get("correct_answer", "")) or answer_letter(question.get("answer", ""))
+            if isinstance(number, int) and letter:
+                model_answers[number] = letter
+        for number, letter in answer_mappings.items():
+            model_answers.setdefault(number, answer_letter(letter) or letter)
+        
+        checked = [number for number in answer_key if number in model_answers]
+        mismatches = [number for number in checked if model_answers[number] != answer_key[number]]
+        for number in mismatches:
+            logger.warning(f"第{number}题模型答案 {model_answers[number]} 与参考答案 {answer_key[number]} 不一致，使用参考答案")
+        if checked:
+            logger.info(f"参考答案核对: {len(checked) - len(mismatches)}/{len(checked)} 道题与模型答案一致")
+    
+    def _summarize_answers(self, layout, section_texts, records):
+        """
+        为没有答案汇总的选择题板块根据每道题的答案生成答案汇总
+        
+        Args:
+            layout (ExamLayout): 试卷结构
+            section_texts (dict): 题型名称 -> 板块原文对象
+            records (list): 题目记录列表
+        """
+        answers = {}
+        for record in records:
+            try:
+                answers[int(record.number)] = record.answer
+            except (TypeError, ValueError):
+                continue
+        
+        for section in layout.sections:
+            passage = section_texts.get(section.label)
+            if section.objective and passage is not None and not passage.answers_summary:
+                passage.answers_summary = format_answers(answers, section.first, section.last)
+    
+    def _derive_answer_fields(self, record):
+        """
+        根据选项和答案字母在本地生成"正确答案"和"干扰选项"，无法解析时保留提取结果中的内容。
+        
+        Args:
+            record (QuestionRecord): 题目记录
+        """
+        letter = answer_letter(record.answer) or answer_letter(record.correct_answer)
+        fields = answer_fields(record.options, letter)
+        if fields is not None:
+            record.correct_answer, record.distractors = fields
     
-    def _get_question_type(self, question_number):
+    def _restore_passages(self, layout, section_texts, model_restored, records):
+        """
+        根据题目的选项和答案在本地生成完形填空和新题型的还原后原文。
+        
+        Args:
+            layout (ExamLayout): 试卷结构
+            section_texts (dict): 题型名称 -> 板块原文对象
+            model_restored (dict): 题型名称 -> 提取结果中自带的还原后原文，本地无法还原时使用
+            records (list): 题目记录列表
+        """
+        options = {}
+        answers = {}
+        for record in records:
+            try:
+                number = int(record.number)
+            except (TypeError, ValueError):
+                continue
+            options[number] = parse_options(record.options)
+            letter = answer_letter(record.answer) or answer_letter(record.correct_answer)
+            if letter:
+                answers[number] = letter
+        
+        for section in layout.sections:
+            passage = section_texts.get(section.label)
+            if not section.restored or passage is None:
+                continue
+            restored = restore_section(section, passage.original, options, answers)
+            if restored is None:
+                restored = model_restored.get(section.label, "")
+                if restored:
+                    logger.info(f"{section.label}无法在本地还原，使用提取结果中的还原后原文")
+            passage.restored = restored
+    
+    def _get_question_type(self, question_number, exam_type=None):
         """
         根据题目编号确定题型。
         
         Args:
             question_number (int): 题目编号
+            exam_type (str, optional): 考试类型
         
         Returns:
             str: 题型描述
         """
-        if 1 <= question_number <= 20:
-            return "完形填空"
-        elif 21 <= question_number <= 25:
-            return "阅读 Text 1"
-        elif 26 <= question_number <= 30:
-            return "阅读 Text 2"
-        elif 31 <= question_number <= 35:
-            return "阅读 Text 3"
-        elif 36 <= question_number <= 40:
-            return "阅读 Text 4"
-        elif 41 <= question_number <= 45:
-            return "新题型"
-        elif 46 <= question_number <= 50:
-            return "翻译"
-        elif question_number == 51:
-            return "写作A"
-        elif question_number == 52:
-            return "写作B"
-        else:
-            return "未知题型"
+        return get_exam_layout(exam_type).label(question_number)
     
     def _convert_to_questions_list(self, data):
         """
@@ -534,9 +576,11 @@ class DataOrganizer:
         """
         logger.info("开始验证数据完整性")
         
+        layout = get_exam_layout(organized_data[0].get("考试类型") if organized_data else None)
+        
         # 检查题目数量
-        if len(organized_data) != 52:
-            return False, f"题目数量不正确: 期望52道题，实际有{len(organized_data)}道题"
+        if len(organized_data) != layout.total_questions:
+            return False, f"题目数量不正确: 期望{layout.total_questions}道题，实际有{len(organized_data)}道题"
         
         # 检查题号是否完整（1-52）
         question_numbers = set()
@@ -547,7 +591,7 @@ class DataOrganizer:
             except ValueError:
                 return False, f"无效的题号: {question.get('题目编号')}"
         
-        expected_numbers = set(range(1, 53))
+        expected_numbers = set(layout.numbers())
         if question_numbers != expected_numbers:
             missing = expected_numbers - question_numbers
             extra = question_numbers - expected_numbers
@@ -579,7 +623,7 @@ class DataOrganizer:
             list: 排序后的数据
         """
         try:
-            return sorted(data, key=lambda x: int(x.get("题目编号", "0")))
+            return sorted(data, key=_number_key)
         except Exception as e:
             logger.error(f"按题号排序失败: {str(e)}")
             return data
@@ -599,36 +643,52 @@ class DataOrganizer:
         # 检查数据中现有的题号
         existing_numbers = {int(item.get("题目编号", "0")) for item in data}
         
-        # 创建完整数据集
-        complete_data = data.copy()
+        # 创建完整数据集（只创建一个新列表，并在其上原地排序）
+        complete_data = list(data)
         
-        # 填充缺失的题目
-        for num in range(1, 53):
+        # 填充缺失的题目，同一题型的占位题目共享占位原文
+        layout = get_exam_layout(exam_type)
+        placeholders = {}
+        for num in layout.numbers():
             if num not in existing_numbers:
                 logger.warning(f"填充缺失题号: {num}")
-                
-                question_type = self._get_question_type(num)
-                
-                # 创建缺失题目的占位数据
-                placeholder = {
-                    "年份": year,
-                    "考试类型": exam_type,
-                    "题型": question_type,
-                    "原文（卷面）": f"[缺失数据] {question_type} 原文",
-                    "试卷答案": "",
-                    "题目编号": str(num),
-                    "题干": f"[缺失数据] 题号 {num}",
-                    "选项": "",
-                    "正确答案": "",
-                    "原文（还原后）": f"[缺失数据] {question_type} 原文",
-                    "原文（句子拆解后）": "",
-                    "干扰选项": ""
-                }
-                
-                complete_data.append(placeholder)
+                complete_data.append(self._placeholder(num, layout, year, exam_type, placeholders))
         
         # 按题号排序
-        return self.sort_by_question_number(complete_data)
+        try:
+            complete_data.sort(key=_number_key)
+        except Exception as e:
+            logger.error(f"按题号排序失败: {str(e)}")
+        return complete_data
+    
+    def _placeholder(self, number, layout, year, exam_type, placeholders):
+        """
+        创建缺失题目的占位记录。
+        
+        Args:
+            number (int): 题号
+            layout (ExamLayout): 试卷结构
+            year (str): 考试年份
+            exam_type (str): 考试类型
+            placeholders (dict): 题型 -> 占位原文，同一题型的占位题目共享
+        
+        Returns:
+            QuestionRecord: 占位记录
+        """
+        question_type = layout.label(number)
+        passage = placeholders.get(question_type)
+        if passage is None:
+            placeholder_text = f"[缺失数据] {question_type} 原文"
+            passage = placeholders[question_type] = Passage(placeholder_text, placeholder_text)
+        
+        return QuestionRecord(
+            year=year,
+            exam_type=exam_type,
+            question_type=question_type,
+            number=str(number),
+            stem=f"[缺失数据] 题号 {number}",
+            passage=passage
+        )
     
     def save_debug_data(self, data, output_file):
         """
@@ -644,7 +704,7 @@ class DataOrganizer:
                 os.makedirs(directory)
                 
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+                json.dump(to_rows(data), f, ensure_ascii=False, indent=2)
                 
             logger.info(f"调试数据已保存至: {output_file}")
         except Exception as e:
@@ -663,54 +723,62 @@ class DataOrganizer:
         """
         logger.info("开始应用句子拆分器")
         
+        # 共享同一原文对象的题目只拆分一次
+        split_passages = set()
         for item in data:
-            try:
-                # 获取原文（还原后）
-                original_text = item.get("原文（还原后）", "")
-                
-                if original_text:
-                    # 使用拆分器处理文本
-                    split_text = splitter_function(original_text)
-                    
-                    # 更新句子拆解后的文本
-                    item["原文（句子拆解后）"] = split_text
-            except Exception as e:
-                logger.error(f"处理题目 #{item.get('题目编号', '未知')} 时发生错误: {str(e)}")
-                item["原文（句子拆解后）"] = item.get("原文（还原后）", "")
+            self._split_record(item, splitter_function, split_passages)
         
         logger.info("句子拆分处理完成")
         return data
     
-    def _map_section_type(self, section_type, question_number):
+    def _split_record(self, item, splitter_function, split_passages):
+        """
+        拆分一道题目的"原文（还原后）"，写入"原文（句子拆解后）"。
+        
+        Args:
+            item (QuestionRecord|dict): 题目数据
+            splitter_function (callable): 句子拆分器函数
+            split_passages (set): 已拆分的原文对象ID，共享原文的题目不重复拆分
+        """
+        try:
+            if isinstance(item, QuestionRecord):
+                passage = item.passage
+                if id(passage) not in split_passages:
+                    split_passages.add(id(passage))
+                    if passage.restored:
+                        try:
+                            passage.split = splitter_function(passage.restored)
+                        except Exception as e:
+                            logger.error(f"处理题目 #{item.number} 时发生错误: {str(e)}")
+                            passage.split = passage.restored
+                return
+            
+            # 获取原文（还原后）
+            original_text = item.get("原文（还原后）", "")
+            
+            if original_text:
+                # 使用拆分器处理文本
+                item["原文（句子拆解后）"] = splitter_function(original_text)
+        except Exception as e:
+            logger.error(f"处理题目 #{item.get('题目编号', '未知')} 时发生错误: {str(e)}")
+            item["原文（句子拆解后）"] = item.get("原文（还原后）", "")
+    
+    def _map_section_type(self, section_type, question_number, exam_type=None):
         """
         根据题号和提供的题型名称，映射到标准题型名称。
         
         Args:
             section_type (str): 原始题型名称
             question_number (int): 题目编号
+            exam_type (str, optional): 考试类型
             
         Returns:
             str: 标准化后的题型名称
         """
-        # 根据题号范围判断题型
-        if 1 <= question_number <= 20:
-            return "完形填空"
-        elif 21 <= question_number <= 25:
-            return "阅读理解 Text 1"
-        elif 26 <= question_number <= 30:
-            return "阅读理解 Text 2"
-        elif 31 <= question_number <= 35:
-            return "阅读理解 Text 3"
-        elif 36 <= question_number <= 40:
-            return "阅读理解 Text 4"
-        elif 41 <= question_number <= 45:
-            return "新题型"
-        elif 46 <= question_number <= 50:
-            return "翻译"
-        elif question_number == 51:
-            return "写作A"
-        elif question_number == 52:
-            return "写作B"
+        # 根据题号查表
+        section = get_exam_layout(exam_type).section(question_number)
+        if section is not None:
+            return section.label
         
         # 如果题号不在标准范围内，尝试根据提供的section_type判断
         section_type_lower = section_type.lower() if section_type else ""
@@ -796,30 +864,15 @@ class DataOrganizer:
         Returns:
             str: 格式化的答案字符串，如"A"或"B"
         """
-        # 优先使用答案汇总中的答案
+        # 优先使用答案汇总中的答案，其次从correct_answer中提取字母部分
+        # （支持"A"、"A. Option"、"[A]Option"、"A]Option"等格式）
         if question_number in answer_mappings:
             answer = answer_mappings[question_number]
-            # 提取答案字母部分（比如从"A. Without"中提取"A"）
             if isinstance(answer, str) and len(answer) > 0:
-                # 如果是形如"A. Option"或"[A]Option"的格式，提取字母部分
-                match = re.match(r'([A-D])[.\s]|^\[([A-D])\]', answer)
-                if match:
-                    letter = match.group(1) or match.group(2)
-                    return letter
-                return answer
-        
-        # 如果答案汇总中没有，尝试从correct_answer中提取
+                return answer_letter(answer) or answer
+        
         if correct_answer:
-            # 提取字母部分
-            match = re.match(r'([A-D])[.\s]|^\[([A-D])\]', correct_answer)
-            if match:
-                letter = match.group(1) or match.group(2)
-                return letter
-            # 如果是完整的答案格式，尝试提取首字母
-            if len(correct_answer) > 0:
-                first_char = correct_answer[0]
-                if first_char in "ABCD":
-                    return first_char
-        
-        # 如果都提取不到，返回原始correct_answer或空字符串
-        return correct_answer or "" 
\ No newline at end of file
+            return answer_letter(correct_answer) or correct_answer
+        
+        # 如果都提取不到，返回空字符串
+        return "" 
\ No newline at end of file
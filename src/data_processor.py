@@ -6,7 +6,6 @@
 """
 
 import os
-import json
 import logging
 import time
 from datetime import datetime
@@ -18,6 +17,7 @@ from src.data_organizer import DataOrganizer
 from src.csv_generator import CSVGenerator
 from src.sentence_splitter import split_sentences
 from src.docx_reader import DocxReader
+from src.passage_store import dump_json
 
 # 配置日志
 logger = logging.getLogger("data_processor")
@@ -27,7 +27,8 @@ class DataProcessor:
     数据处理器，整合从原始文档到最终CSV文件的完整处理流程
     """
     
-    def __init__(self, model_name=None, max_tokens=4096, temperature=0.1):
+    def __init__(self, model_name=None, max_tokens=4096, temperature=0.1, hedge_policy=None, router=None,
+                 parquet_dir=None, corpus_db=None, passage_dir=None, csv_passage_refs=False, session=None):
         """
         初始化数据处理器
         
@@ -35,25 +36,45 @@ class DataProcessor:
             model_name: API模型名称，如果为None则使用环境变量中的默认值
             max_tokens: 最大令牌数
             temperature: 生成温度
+            hedge_policy: 可选的对冲策略（HedgePolicy），用于降低分段请求的长尾延迟
+            router: 可选的模型路由器（ModelRouter），按分段选择模型
+            parquet_dir: 可选的Parquet数据集目录，设置后每份试卷的结果会追加到该数据集
+            corpus_db: 可选的语料库数据库路径，设置后每份试卷处理完成时增量更新语料库
+            passage_dir: 可选的原文存储目录，设置后分析JSON中的原文以内容哈希引用保存
+            csv_passage_refs: 是否在CSV中也使用原文引用（需要passage_dir）
+            session: 可选的共享requests.Session，多个处理器可复用同一连接池
         """
         # 初始化API处理器
-        self.api_handler = OpenRouterHandler(model=model_name)
+        self.api_handler = OpenRouterHandler(model=model_name, session=session)
         
         # 初始化内容分析器
         self.content_analyzer = ContentAnalyzer(api_handler=self.api_handler, 
                                                max_tokens=max_tokens,
-                                               temperature=temperature)
+                                               temperature=temperature,
+                                               hedge_policy=hedge_policy,
+                                               router=router)
+        
+        # 原文存储（可选）
+        self.passage_store = None
+        if passage_dir:
+            from src.passage_store import PassageStore
+            self.passage_store = PassageStore(passage_dir)
+        self.csv_passage_refs = csv_passage_refs
         
         # 初始化数据组织器
-        self.data_organizer = DataOrganizer()
+        self.data_organizer = DataOrganizer(passage_store=self.passage_store)
         
         # 初始化CSV生成器
         self.csv_generator = CSVGenerator()
         
         # 初始化docx读取器
         self.docx_reader = DocxReader()
+        
+        # Parquet数据集和语料库（可选）
+        self.parquet_dir = parquet_dir
+        self.corpus_db = corpus_db
     
-    def process_document(self, document_path, output_dir="test_results", save_debug=False):
+    def process_document(self, document_path, output_dir="test_results", save_debug=False, stage_pool=None):
         """
         处理文档并生成CSV文件
         
@@ -61,6 +82,7 @@ class DataProcessor:
             document_path: 文档路径
             output_dir: 输出目录
             save_debug: 是否保存调试信息
+            stage_pool: 可选的本地处理进程池（StagePool），提供时文档读取和数据组织在工作进程中执行
         
         Returns:
             tuple: (是否成功, CSV文件路径, 处理时间)
@@ -78,7 +100,14 @@ class DataProcessor:
             file_extension = Path(document_path).suffix.lower()
             
             # 读取文档内容
-            if file_extension == '.docx':
+            if stage_pool is not None:
+                document_text = stage_pool.read_document(document_path)
+                
+                if save_debug and file_extension == '.docx':
+                    extracted_text_path = os.path.join(output_dir, "debug", f"{Path(document_path).stem}_extracted.txt")
+                    with open(extracted_text_path, 'w', encoding='utf-8') as f:
+                        f.write(document_text)
+            elif file_extension == '.docx':
                 logger.info("检测到Word文档，使用DocxReader读取内容")
                 document_text = self.docx_reader.read_file(document_path)
                 
@@ -105,34 +134,31 @@ class DataProcessor:
             extract_time = time.time() - extract_start_time
             logger.info(f"数据提取耗时: {extract_time:.2f}秒")
             
+            # 获取文件名（不含扩展名）；并行处理时同一秒可能完成多个文档（如同一试卷的.docx和
+            # _extracted.txt），带时间戳的分析结果文件名中包含源文件名，避免互相覆盖
+            file_name = os.path.splitext(os.path.basename(document_path))[0]
+            
             # 保存提取结果
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            result_path = os.path.join(output_dir, "analysis", f"extraction_result_{timestamp}.json")
-            with open(result_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            result_path = os.path.join(output_dir, "analysis", f"extraction_result_{file_name}_{timestamp}.json")
+            dump_json(result, result_path, self.passage_store)
             logger.info(f"提取结果已保存到: {result_path}")
             
             # 组织数据
             organize_start_time = time.time()
-            organized_data = self.data_organizer.organize_data(result)
-            
-            # 确保数据集完整
-            complete_data = self.data_organizer.ensure_complete_dataset(organized_data)
-            
-            # 应用句子拆分
-            processed_data = self.data_organizer.apply_sentence_splitter(complete_data, split_sentences)
+            if stage_pool is not None:
+                processed_data = stage_pool.organize(result)
+            else:
+                # 组织数据、补全缺失题目、句子拆分和排序一次完成
+                processed_data = self.data_organizer.postprocess(result, split_sentences)
             organize_time = time.time() - organize_start_time
             logger.info(f"数据组织耗时: {organize_time:.2f}秒")
             
             # 保存组织后的数据
-            organized_path = os.path.join(output_dir, "analysis", f"organized_data_{timestamp}.json")
-            with open(organized_path, 'w', encoding='utf-8') as f:
-                json.dump(processed_data, f, ensure_ascii=False, indent=2)
+            organized_path = os.path.join(output_dir, "analysis", f"organized_data_{file_name}_{timestamp}.json")
+            dump_json(processed_data, organized_path, self.passage_store)
             logger.info(f"组织后的数据已保存到: {organized_path}")
             
-            # 获取文件名（不含扩展名）
-            file_name = os.path.splitext(os.path.basename(document_path))[0]
-            
             # 确定CSV文件名
             year = result.get("metadata", {}).get("year", "未知年份")
             exam_type = result.get("metadata", {}).get("exam_type", "未知类型")
@@ -141,7 +167,10 @@ class DataProcessor:
             
             # 生成CSV文件
             csv_start_time = time.time()
-            csv_success = self.csv_generator.generate_csv(processed_data, csv_path)
+            csv_success = self.csv_generator.generate_csv(
+                processed_data, csv_path,
+                passage_store=self.passage_store if self.csv_passage_refs else None
+            )
             csv_time = time.time() - csv_start_time
             logger.info(f"CSV生成耗时: {csv_time:.2f}秒")
             
@@ -151,6 +180,17 @@ class DataProcessor:
                 logger.error("CSV生成失败")
                 return False, None, time.time() - start_time
             
+            # 追加到Parquet数据集（可选）
+            if self.parquet_dir:
+                from src.parquet_exporter import ParquetExporter
+                ParquetExporter().export(processed_data, self.parquet_dir)
+            
+            # 更新语料库（可选）
+            if self.corpus_db:
+                from src.corpus_store import CorpusStore
+                with CorpusStore(self.corpus_db) as store:
+                    store.upsert_paper(processed_data)
+            
             # 计算总处理时间
             total_time = time.time() - start_time
             logger.info(f"文档处理完成，总耗时: {total_time:.2f}秒")
@@ -161,7 +201,8 @@ class DataProcessor:
             logger.error(f"处理文档时出错: {str(e)}", exc_info=True)
             return False, None, time.time() - start_time
     
-    def batch_process(self, input_dir, output_dir="test_results", file_pattern="*.txt;*.docx", save_debug=False):
+    def batch_process(self, input_dir, output_dir="test_results", file_pattern="*.txt;*.docx", save_debug=False,
+                      workers=1):
         """
         批量处理目录下的文档
         
@@ -170,6 +211,8 @@ class DataProcessor:
             output_dir: 输出目录
             file_pattern: 文件匹配模式，多个模式用分号分隔
             save_debug: 是否保存调试信息
+            workers: 并行处理的文档数；大于1时网络请求在线程中并发，
+                     文档读取和数据组织在常驻进程池中执行
         
         Returns:
             list: 处理结果列表，每个元素为(文件名, 是否成功, CSV路径, 处理时间)
@@ -194,8 +237,7 @@ class DataProcessor:
         all_files = sorted(set(all_files))
         logger.info(f"找到 {len(all_files)} 个匹配的文件")
         
-        results = []
-        for file_path in all_files:
+        def process_one(file_path, stage_pool=None):
             file_name = os.path.basename(file_path)
             logger.info(f"处理文件: {file_name}")
             
@@ -209,16 +251,28 @@ class DataProcessor:
             success, csv_path, process_time = self.process_document(
                 document_path=file_path,
                 output_dir=file_output_dir,
-                save_debug=save_debug
+                save_debug=save_debug,
+                stage_pool=stage_pool
             )
             
-            results.append((file_name, success, csv_path, process_time))
-            
             # 如果成功，记录结果
             if success:
                 logger.info(f"文件 {file_name} 处理成功，耗时: {process_time:.2f}秒，CSV: {csv_path}")
             else:
                 logger.error(f"文件 {file_name} 处理失败，耗时: {process_time:.2f}秒")
+            
+            return (file_name, success, csv_path, process_time)
+        
+        if workers > 1 and len(all_files) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            from src.stage_pool import StagePool
+            
+            passage_dir = self.passage_store.root if self.passage_store else None
+            with StagePool(workers=workers, passage_dir=passage_dir) as stage_pool, \
+                    ThreadPoolExecutor(max_workers=workers) as threads:
+                results = list(threads.map(lambda path: process_one(path, stage_pool), all_files))
+        else:
+            results = [process_one(file_path) for file_path in all_files]
         
         # 输出汇总信息
         successful = sum(1 for _, success, _, _ in results if success)
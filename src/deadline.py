@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+网络请求超时和文档处理期限模块。
+
+所有网络请求都带有连接超时和读取超时，停滞的连接不会让批处理的工作线程永久挂起。
+设置了单文档期限时，每个文档开始提取时创建一个Deadline，传递到各分段请求、续写请求和重试中：
+单次请求的读取超时不超过剩余时间，期限到达后尚未完成的分段被取消，返回已提取的部分结果。
+
+超时和期限可通过环境变量CONNECT_TIMEOUT、READ_TIMEOUT、DOC_DEADLINE（秒）或命令行参数
+--read-timeout、--doc-deadline设置；DOC_DEADLINE为空时不限制单文档耗时。
+"""
+
+import os
+import time
+import logging
+
+logger = logging.getLogger("考研英语真题处理.deadline")
+
+# 默认的连接超时和读取超时（秒）；读取超时需覆盖模型生成完整回答的时间
+CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("READ_TIMEOUT", "300"))
+
+# 默认的单文档期限（秒），为None时不限制
+DOC_DEADLINE = float(os.getenv("DOC_DEADLINE")) if os.getenv("DOC_DEADLINE") else None
+
+# 剩余时间少于该值时不再发出新的请求
+MIN_REQUEST_SECONDS = 1.0
+
+
+class DeadlineExceeded(Exception):
+    """文档处理已超过期限，尚未完成的请求被取消"""
+    pass
+
+
+class Deadline:
+    """
+    单个文档的处理期限。
+    """
+
+    def __init__(self, seconds):
+        """
+        初始化处理期限
+
+        Args:
+            seconds (float): 从现在起允许的最长处理时间（秒）
+        """
+        self.seconds = float(seconds)
+        self.expires_at = time.monotonic() + self.seconds
+
+    def remaining(self):
+        """返回剩余时间（秒），已到期时为0"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """是否已没有足够时间发出新的请求"""
+        return self.remaining() < MIN_REQUEST_SECONDS
+
+    def check(self, action):
+        """
+        期限已到时抛出DeadlineExceeded
+
+        Args:
+            action (str): 将要进行的操作，用于错误信息
+
+        Raises:
+            DeadlineExceeded: 期限已到
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"已超过文档处理期限（{self.seconds:g}秒），取消{action}")
+
+
+def request_timeout(deadline=None):
+    """
+    返回一次请求的超时设置，读取超时不超过期限的剩余时间
+
+    Args:
+        deadline (Deadline, optional): 文档处理期限
+
+    Returns:
+        tuple: requests使用的(连接超时, 读取超时)
+
+    Raises:
+        DeadlineExceeded: 期限已到
+    """
+    if deadline is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    deadline.check("请求")
+    remaining = deadline.remaining()
+    return (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+
+
+def document_deadline(seconds=None):
+    """
+    为一个文档创建处理期限
+
+    Args:
+        seconds (float, optional): 期限（秒），默认使用DOC_DEADLINE
+
+    Returns:
+        Deadline: 处理期限，未设置期限时返回None
+    """
+    seconds = DOC_DEADLINE if seconds is None else seconds
+    return Deadline(seconds) if seconds else None
+
+
+def set_default_timeouts(read_timeout=None, doc_deadline=None):
+    """
+    设置默认的读取超时和单文档期限（同时写入环境变量，进程池中的工作进程使用相同设置）
+
+    Args:
+        read_timeout (float, optional): 读取超时（秒）
+        doc_deadline (float, optional): 单文档期限（秒）
+
+    Raises:
+        ValueError: 设置值不是正数时
+    """
+    global READ_TIMEOUT, DOC_DEADLINE
+    for name, value in (("读取超时", read_timeout), ("单文档期限", doc_deadline)):
+        if value is not None and value <= 0:
+            raise ValueError(f"{name}必须大于0: {value}")
+    if read_timeout is not None:
+        READ_TIMEOUT = float(read_timeout)
+        os.environ["READ_TIMEOUT"] = str(read_timeout)
+    if doc_deadline is not None:
+        DOC_DEADLINE = float(doc_deadline)
+        os.environ["DOC_DEADLINE"] = str(doc_deadline)
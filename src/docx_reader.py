@@ -7,10 +7,8 @@
 
 import os
 import re
-import docx
 import logging
 from pathlib import Path
-from docx.opc.exceptions import PackageNotFoundError
 
 logger = logging.getLogger("考研英语真题处理.docx_reader")
 
@@ -35,11 +33,14 @@ class DocxReader:
         }
         
         # 答案识别模式
+        # （单独的"Key"只在独占一行时作为标题，避免匹配正文中的"key"、"monkey"等单词）
         self.answer_patterns = [
             r'(?:参考)?答案[与及]?解析',
+            r'参考答案',
             r'答案[:：]',
             r'Answer\s+Key',
-            r'Keys?(\s+to)?(\s+the)?(\s+questions)?'
+            r'\bKeys?\s+to(\s+the)?\s+questions',
+            r'(?m)^\s*Keys?\s*$'
         ]
     
     def read_file(self, file_path):
@@ -111,6 +112,10 @@ class DocxReader:
         Returns:
             docx.Document or None: 文档对象，失败时返回None
         """
+        # python-docx导入较慢，仅在实际读取docx文件时导入
+        import docx
+        from docx.opc.exceptions import PackageNotFoundError
+        
         try:
             return docx.Document(file_path)
         except PackageNotFoundError:
@@ -455,8 +460,8 @@ class DocxReader:
         """
         # 尝试不同的答案标识
         for pattern in self.answer_patterns:
-            match = re.search(f"{pattern}.*?$", text, re.DOTALL | re.IGNORECASE)
+            match = re.search(pattern, text, re.IGNORECASE)
             if match:
-                return match.group().strip()
+                return text[match.start():].strip()
         
         return None 
\ No newline at end of file
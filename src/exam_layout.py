@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+试卷结构表，题号 -> 板块、题型名称和原文位置的对应关系。
+
+题号与题型的对应关系只在此处定义一次，数据组织、补全占位题目和内容分析
+都通过按题号下标查表获取题型，不再各自维护if/elif判断。
+"""
+
+import logging
+from collections import namedtuple
+from functools import lru_cache
+
+logger = logging.getLogger("考研英语真题处理.exam_layout")
+
+# 无法确定题型时使用的名称
+UNKNOWN_LABEL = "未知题型"
+
+# 一个板块（或一篇原文）对应的题号范围
+#   label: 题型名称（写入"题型"列）
+#   section_key: 提取结果sections中的板块键
+#   part: 板块内的子键（阅读的text_N、写作的part_a/part_b），没有时为None
+#   first, last: 题号范围（含两端）
+#   restored: 是否有还原后的原文（完形填空和新题型需要把答案填回原文）
+#   parse_answers: 是否解析该板块的答案汇总
+#   objective: 是否为选择题（答案为选项字母，可以从参考答案中解析）
+ExamSection = namedtuple("ExamSection", ["label", "section_key", "part", "first", "last", "restored", "parse_answers",
+                                         "objective"])
+
+# 标准试卷结构（英语一、英语二共用，共52题）
+STANDARD_SECTIONS = (
+    ExamSection("完形填空", "cloze", None, 1, 20, True, True, True),
+    ExamSection("阅读理解 Text 1", "reading", "text_1", 21, 25, False, True, True),
+    ExamSection("阅读理解 Text 2", "reading", "text_2", 26, 30, False, True, True),
+    ExamSection("阅读理解 Text 3", "reading", "text_3", 31, 35, False, True, True),
+    ExamSection("阅读理解 Text 4", "reading", "text_4", 36, 40, False, True, True),
+    ExamSection("新题型", "new_type", None, 41, 45, True, True, True),
+    ExamSection("翻译", "translation", None, 46, 50, False, True, False),
+    ExamSection("写作A", "writing", "part_a", 51, 51, False, False, False),
+    ExamSection("写作B", "writing", "part_b", 52, 52, False, False, False),
+)
+
+# 考试类型 -> 试卷结构，未列出的考试类型使用标准结构
+EXAM_SECTIONS = {
+    "英语（一）": STANDARD_SECTIONS,
+    "英语（二）": STANDARD_SECTIONS,
+}
+
+
+class ExamLayout:
+    """
+    预先计算的题号 -> 板块对照表。
+    """
+
+    def __init__(self, sections):
+        """
+        初始化试卷结构
+
+        Args:
+            sections (tuple): ExamSection序列，按题号顺序排列
+        """
+        self.sections = tuple(sections)
+        self.total_questions = max(section.last for section in self.sections)
+
+        # 下标为题号，0号位置不使用
+        self._by_number = [None] * (self.total_questions + 1)
+        for section in self.sections:
+            for number in range(section.first, section.last + 1):
+                self._by_number[number] = section
+        self._by_label = {section.label: section for section in self.sections}
+
+    def numbers(self):
+        """返回全部题号"""
+        return range(1, self.total_questions + 1)
+
+    def section(self, number):
+        """
+        查找题号所在的板块
+
+        Args:
+            number (int|str): 题号
+
+        Returns:
+            ExamSection: 所在板块，题号无效时返回None
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return None
+        if 1 <= number <= self.total_questions:
+            return self._by_number[number]
+        return None
+
+    def label(self, number):
+        """返回题号对应的题型名称，题号无效时返回"未知题型\""""
+        section = self.section(number)
+        return section.label if section else UNKNOWN_LABEL
+
+    def objective_numbers(self):
+        """返回全部选择题的题号"""
+        return [number for section in self.sections if section.objective
+                for number in range(section.first, section.last + 1)]
+
+    def section_by_label(self, label):
+        """按题型名称查找板块，不存在时返回None"""
+        return self._by_label.get(label)
+
+
+@lru_cache(maxsize=None)
+def get_exam_layout(exam_type=None):
+    """
+    获取考试类型对应的试卷结构（每种考试类型只构建一次）
+
+    Args:
+        exam_type (str, optional): 考试类型，如"英语（一）"
+
+    Returns:
+        ExamLayout: 试卷结构
+    """
+    return ExamLayout(EXAM_SECTIONS.get(exam_type, STANDARD_SECTIONS))
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提取计划模块，在批次开始前离线预估每个文档、每个分段的输入/输出token数、花费和耗时（--plan）。
+
+提示词与实际提取时完全相同（同样经过降噪和一次性/分段判断），token数由token_estimator估计，
+输出token数取分段的预期值（SEGMENT_PROFILES）并受max_tokens限制，价格来自模型配置或
+本地缓存的模型目录，耗时按模型调用统计（没有统计时按模型系列的默认速度）估算。
+整个过程不发送任何网络请求。
+"""
+
+import os
+import logging
+import unicodedata
+from pathlib import Path
+
+from src.content_analyzer import ContentAnalyzer
+from src.model_config import (SEGMENT_PROFILES, get_model, get_model_pricing, get_model_max_tokens,
+                              get_model_context_length)
+from src.openrouter_handler import SYSTEM_PROMPT
+from src.token_estimator import get_token_estimator
+
+logger = logging.getLogger("考研英语真题处理.extraction_plan")
+
+
+def read_document(document_path):
+    """
+    读取文档文本（docx使用DocxReader，其余按UTF-8文本读取）
+
+    Args:
+        document_path (str): 文档路径
+
+    Returns:
+        str: 文档文本，读取失败时返回None
+    """
+    if Path(document_path).suffix.lower() == ".docx":
+        from src.docx_reader import DocxReader
+        return DocxReader().read_file(document_path)
+    with open(document_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class ExtractionPlanner:
+    """
+    离线预估文档提取的token数、花费和耗时。
+    """
+
+    def __init__(self, model=None, router=None, max_tokens=4096, estimator=None, noise_filter=None):
+        """
+        初始化提取计划器
+
+        Args:
+            model (str, optional): 模型名称，默认使用get_model()
+            router (ModelRouter, optional): 模型路由器，提供时每个分段按路由结果选择模型
+            max_tokens (int): 每次请求的最大输出token数（与ContentAnalyzer一致）
+            estimator (TokenEstimator, optional): token估计器，默认使用共享实例
+            noise_filter (NoiseFilter, optional): 降噪器，默认按NOISE_FILTER设置
+        """
+        self.model = get_model(model)
+        self.router = router
+        self.max_tokens = max_tokens
+        self.estimator = estimator or get_token_estimator()
+        self.analyzer = ContentAnalyzer(api_handler=None, max_tokens=max_tokens, router=router, noise_filter=noise_filter)
+
+    def plan_segment(self, segment, prompt, budget=None):
+        """
+        预估一次请求
+
+        Args:
+            segment: 分段编号（1-5）或"full"
+            prompt (str): 提示词
+            budget (RouteBudget, optional): 文档的路由预算
+
+        Returns:
+            dict: 包含segment、model、input_tokens、output_tokens、cost（价格未知时为None）、seconds、
+                  truncated（预期输出超过max_tokens）和over_context（超出模型上下文长度）
+        """
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+        input_tokens = self.estimator.estimate_messages(messages, self.model)
+        model = self.router.choose(segment, prompt_tokens=input_tokens, budget=budget) if self.router is not None else self.model
+        if model != self.model:
+            input_tokens = self.estimator.estimate_messages(messages, model)
+
+        max_tokens = min(self.max_tokens, get_model_max_tokens(model))
+        expected_output = SEGMENT_PROFILES.get(segment, SEGMENT_PROFILES["full"])["output_tokens"]
+        output_tokens = min(expected_output, max_tokens)
+
+        pricing = get_model_pricing(model)
+        cost = None
+        if pricing is not None:
+            cost = (input_tokens * pricing.get("prompt", 0.0) + output_tokens * pricing.get("completion", 0.0)) / 1_000_000
+
+        context_length = get_model_context_length(model)
+        return {
+            "segment": segment,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost": cost,
+            "seconds": self.estimator.estimate_seconds(model, output_tokens),
+            "truncated": expected_output > max_tokens,
+            "over_context": bool(context_length) and input_tokens + max_tokens > context_length
+        }
+
+    def plan_text(self, document_text, name=""):
+        """
+        预估一个文档的提取
+
+        Args:
+            document_text (str): 文档文本
+            name (str): 文档名称（用于显示）
+
+        Returns:
+            dict: 包含name、chars、prompt_chars、mode、segments（各请求的预估）以及合计的
+                  input_tokens、output_tokens、cost、seconds
+        """
+        budget = self.router.start_document() if self.router is not None else None
+        prompt_text, mode, prompts = self.analyzer.plan_prompts(document_text, model=None if self.router else self.model)
+        segments = [self.plan_segment(segment, prompt, budget) for segment, prompt in prompts]
+        costs = [item["cost"] for item in segments]
+        return {
+            "name": name,
+            "chars": len(document_text),
+            "prompt_chars": len(prompt_text),
+            "mode": mode,
+            "segments": segments,
+            "input_tokens": sum(item["input_tokens"] for item in segments),
+            "output_tokens": sum(item["output_tokens"] for item in segments),
+            "cost": None if None in costs else sum(costs),
+            # 分段请求依次发送，耗时相加
+            "seconds": sum(item["seconds"] for item in segments)
+        }
+
+    def plan_file(self, document_path):
+        """
+        预估一个文档文件的提取
+
+        Args:
+            document_path (str): docx或txt文件路径
+
+        Returns:
+            dict: 同plan_text，文件无法读取时返回None
+        """
+        try:
+            document_text = read_document(document_path)
+        except Exception as e:
+            logger.error(f"读取文件失败: {document_path}: {str(e)}")
+            return None
+        if not document_text:
+            logger.error(f"文件内容为空: {document_path}")
+            return None
+        return self.plan_text(document_text, name=os.path.basename(document_path))
+
+
+def batch_seconds(plans, workers=1):
+    """
+    估算批次的总耗时：文档按耗时从长到短依次分配给最先空闲的工作线程
+
+    Args:
+        plans (list): plan_text返回的预估列表
+        workers (int): 并行处理的文件数
+
+    Returns:
+        float: 预计总耗时（秒）
+    """
+    lanes = [0.0] * max(1, workers)
+    for seconds in sorted((plan["seconds"] for plan in plans), reverse=True):
+        lanes[lanes.index(min(lanes))] += seconds
+    return max(lanes)
+
+
+def _pad(text, width, right=False):
+    """按显示宽度（全角字符占两列）补齐文本"""
+    text = str(text)
+    display = sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+    padding = " " * max(0, width - display)
+    return padding + text if right else text + padding
+
+
+def format_plan(plans, workers=1):
+    """
+    将预估结果格式化为表格文本
+
+    Args:
+        plans (list): plan_text返回的预估列表
+        workers (int): 并行处理的文件数
+
+    Returns:
+        str: 表格文本
+    """
+    def money(cost):
+        return "未知" if cost is None else f"${cost:.4f}"
+
+    lines = []
+    for plan in plans:
+        mode = "分段提取" if plan["mode"] == "segments" else "一次性提取"
+        lines.append(f"{plan['name']}（{plan['chars']} 字符，降噪后 {plan['prompt_chars']} 字符，{mode}）")
+        lines.append("  " + _pad("分段", 6) + _pad("模型", 42) + _pad("输入tokens", 12, True)
+                     + _pad("输出tokens", 12, True) + _pad("花费", 11, True) + _pad("耗时(秒)", 10, True))
+        for item in plan["segments"]:
+            flags = []
+            if item["truncated"]:
+                flags.append("预期输出超过max_tokens，可能被截断")
+            if item["over_context"]:
+                flags.append("超出模型上下文长度")
+            lines.append(f"  {str(item['segment']):<6}{item['model']:<42}{item['input_tokens']:>12,}"
+                         f"{item['output_tokens']:>12,}" + _pad(money(item["cost"]), 11, True) + f"{item['seconds']:>10.1f}"
+                         + (f"  ! {'；'.join(flags)}" if flags else ""))
+        lines.append("  " + _pad("合计", 48) + f"{plan['input_tokens']:>12,}{plan['output_tokens']:>12,}"
+                     + _pad(money(plan["cost"]), 11, True) + f"{plan['seconds']:>10.1f}")
+        lines.append("")
+
+    costs = [plan["cost"] for plan in plans]
+    total_cost = None if None in costs else sum(costs)
+    lines.append(f"共 {len(plans)} 个文档，{sum(len(plan['segments']) for plan in plans)} 次请求，"
+                 f"输入 {sum(plan['input_tokens'] for plan in plans):,} tokens，"
+                 f"输出 {sum(plan['output_tokens'] for plan in plans):,} tokens，"
+                 f"预计花费 {money(total_cost)}，预计耗时 {batch_seconds(plans, workers):.0f} 秒（并行 {workers} 个文件）")
+    return "\n".join(lines)
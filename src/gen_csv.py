@@ -10,7 +10,6 @@ import sys
 import logging
 import argparse
 from datetime import datetime
-from dotenv import load_dotenv
 
 # 添加当前目录到模块搜索路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,9 +17,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # 导入自定义模块
 from src.data_processor import DataProcessor
 
-# 加载环境变量
-load_dotenv()
-
 # 配置日志
 logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
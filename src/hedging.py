@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+对冲请求模块，用于降低分段提取中的长尾延迟。
+
+当某个分段请求在其历史延迟的指定分位数内仍未返回时，向另一个模型
+发送一份相同的请求，先返回有效结果的一方胜出，落败的一方被取消。
+对冲请求受花费上限约束，避免超出预算。
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import defaultdict, deque
+
+from src.model_config import OPENROUTER_MODELS, get_model_pricing, get_model_stats
+from src.deadline import DeadlineExceeded
+from src.openrouter_handler import RequestCancelled
+from src.token_estimator import estimate_tokens
+
+logger = logging.getLogger("考研英语真题处理.hedging")
+
+# 对冲模型的候选顺序（取自OPENROUTER_MODELS['by_tier']）
+HEDGE_TIER_ORDER = ["balanced", "fastest", "most_capable"]
+
+
+class LatencyTracker:
+    """
+    按模型记录最近若干次成功调用的耗时，用于计算延迟分位数。
+    """
+
+    def __init__(self, max_samples=200):
+        """
+        初始化延迟记录器
+
+        Args:
+            max_samples: 每个模型保留的最大样本数
+        """
+        self.max_samples = max_samples
+        self._samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._lock = threading.Lock()
+
+    def record(self, model, seconds):
+        """
+        记录一次调用耗时
+
+        Args:
+            model: 模型名称
+            seconds: 耗时（秒）
+        """
+        with self._lock:
+            self._samples[model].append(float(seconds))
+
+    def sample_count(self, model):
+        """返回指定模型已记录的样本数"""
+        with self._lock:
+            return len(self._samples.get(model, ()))
+
+    def percentile(self, model, pct):
+        """
+        计算指定模型的延迟分位数
+
+        Args:
+            model: 模型名称
+            pct: 分位数（0-100）
+
+        Returns:
+            float: 分位数对应的耗时（秒），没有样本时返回None
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples:
+            return None
+
+        # 最近秩法，避免样本较少时插值带来的偏差
+        rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+
+class HedgeBudget:
+    """
+    单个文档的对冲预算（已发出的对冲次数和预估花费），多个线程可同时为同一文档预留。
+    """
+
+    def __init__(self, max_hedges, max_cost):
+        """
+        初始化对冲预算
+
+        Args:
+            max_hedges: 允许的最多对冲次数
+            max_cost: 对冲请求的预估花费上限（美元）
+        """
+        self.max_hedges = max_hedges
+        self.max_cost = max_cost
+        self.hedges_sent = 0
+        self.cost = 0.0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, model, cost):
+        """
+        尝试为一次对冲请求预留预算
+
+        Args:
+            model: 对冲模型
+            cost: 预估花费（美元），价格未知时为None
+
+        Returns:
+            bool: 预算充足并已预留时返回True
+        """
+        with self._lock:
+            if self.hedges_sent >= self.max_hedges:
+                logger.info(f"已达到对冲次数上限({self.max_hedges})，不再发出对冲请求")
+                return False
+            if cost is None:
+                # 价格未知时无法保证花费上限，不进行对冲
+                logger.info(f"对冲模型 {model} 价格未知，跳过对冲")
+                return False
+            if self.cost + cost > self.max_cost:
+                logger.info(f"对冲预算不足（已用 ${self.cost:.4f}，本次预估 ${cost:.4f}，"
+                            f"上限 ${self.max_cost:.4f}），不再发出对冲请求")
+                return False
+            self.hedges_sent += 1
+            self.cost += cost
+            return True
+
+
+class HedgePolicy:
+    """
+    对冲策略：决定何时发出对冲请求、使用哪个模型，以及花费上限。
+    """
+
+    def __init__(self, percentile=90, min_samples=5, default_delay=45.0, min_delay=5.0,
+                 hedge_model=None, max_hedges=3, max_hedge_cost=0.05, tracker=None):
+        """
+        初始化对冲策略
+
+        Args:
+            percentile: 触发对冲的历史延迟分位数（0-100）
+            min_samples: 使用分位数前所需的最少样本数，不足时使用default_delay
+            default_delay: 历史样本不足时的对冲等待时间（秒）
+            min_delay: 对冲等待时间下限（秒），避免过早对冲
+            hedge_model: 指定的对冲模型，为None时从OPENROUTER_MODELS['by_tier']中选择
+            max_hedges: 单个文档允许的最多对冲次数
+            max_hedge_cost: 单个文档对冲请求的预估花费上限（美元）
+            tracker: 延迟记录器，为None时使用持久化的共享模型统计（ModelStatsStore）
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.hedge_model = hedge_model
+        self.max_hedges = max_hedges
+        self.max_hedge_cost = max_hedge_cost
+        self.tracker = tracker or get_model_stats()
+
+    def start_document(self):
+        """
+        为一个文档创建对冲预算，每个文档开始处理时调用
+
+        Returns:
+            HedgeBudget: 该文档的对冲预算
+        """
+        return HedgeBudget(self.max_hedges, self.max_hedge_cost)
+
+    def hedge_delay(self, model):
+        """
+        计算指定模型的对冲等待时间
+
+        Args:
+            model: 主请求使用的模型
+
+        Returns:
+            float: 等待多少秒后发出对冲请求
+        """
+        if self.tracker.sample_count(model) < self.min_samples:
+            return self.default_delay
+        delay = self.tracker.percentile(model, self.percentile)
+        return max(self.min_delay, delay)
+
+    def pick_hedge_model(self, primary_model):
+        """
+        选择对冲模型
+
+        Args:
+            primary_model: 主请求使用的模型
+
+        Returns:
+            str: 对冲模型名称，没有可用的不同模型时返回None
+        """
+        if self.hedge_model:
+            return self.hedge_model if self.hedge_model != primary_model else None
+
+        by_tier = OPENROUTER_MODELS["by_tier"]
+        for tier in HEDGE_TIER_ORDER:
+            candidate = by_tier.get(tier)
+            if candidate and candidate != primary_model:
+                return candidate
+        return None
+
+    def estimate_cost(self, model, prompt, max_tokens):
+        """
+        预估一次请求的最大花费（美元）
+
+        Args:
+            model: 模型名称
+            prompt: 提示词
+            max_tokens: 最大生成token数
+
+        Returns:
+            float: 预估花费，未知价格的模型返回None
+        """
+        pricing = get_model_pricing(model)
+        if pricing is None:
+            return None
+        prompt_tokens = estimate_tokens(prompt, model)
+        return (prompt_tokens * pricing.get("prompt", 0.0)
+                + max_tokens * pricing.get("completion", 0.0)) / 1_000_000
+
+    def try_reserve(self, model, prompt, max_tokens, budget):
+        """
+        尝试从文档的对冲预算中为一次对冲请求预留预算
+
+        Args:
+            model: 对冲模型
+            prompt: 提示词
+            max_tokens: 最大生成token数
+            budget: 文档的对冲预算（HedgeBudget）
+
+        Returns:
+            bool: 预算充足并已预留时返回True
+        """
+        return budget.try_reserve(model, self.estimate_cost(model, prompt, max_tokens))
+
+
+class HedgedRequester:
+    """
+    带对冲的请求器，接口与OpenRouterHandler.get_structured_data一致。
+    """
+
+    def __init__(self, api_handler, policy):
+        """
+        初始化对冲请求器
+
+        Args:
+            api_handler: 主请求使用的OpenRouterHandler实例
+            policy: HedgePolicy实例
+        """
+        self.api_handler = api_handler
+        self.policy = policy
+
+    @property
+    def model(self):
+        """主请求使用的模型"""
+        return self.api_handler.model
+
+    def _launch(self, model, prompt, max_tokens, temperature, output_dir, results, deadline=None):
+        """
+        在后台线程中发出一次请求
+
+        Returns:
+            tuple: (requests.Session, threading.Event)，用于取消该请求
+        """
+        import requests
+        
+        session = requests.Session()
+        cancel_event = threading.Event()
+        # 处理器自身已记录调用统计时，不再重复记录
+        record_latency = self.policy.tracker is not getattr(self.api_handler, "stats", None)
+
+        def run():
+            start = time.time()
+            try:
+                response = self.api_handler.get_structured_data(
+                    prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    output_dir=output_dir,
+                    session=session,
+                    cancel_event=cancel_event,
+                    model=model,
+                    deadline=deadline
+                )
+                if record_latency:
+                    self.policy.tracker.record(model, time.time() - start)
+                results.put((model, response, None))
+            except RequestCancelled:
+                logger.debug(f"模型 {model} 的请求已取消")
+            except Exception as e:
+                results.put((model, None, e))
+            finally:
+                session.close()
+
+        # 守护线程：落败的请求不会阻塞进程退出
+        threading.Thread(target=run, daemon=True).start()
+        return session, cancel_event
+
+    @staticmethod
+    def _is_valid(response):
+        """判断响应是否为有效结果（而非解析失败时的空结构）"""
+        if not isinstance(response, dict):
+            return False
+        return bool(response.get("questions") or response.get("sections"))
+
+    def get_structured_data(self, prompt, max_tokens=4096, temperature=0.1, output_dir="test_results", model=None,
+                            deadline=None, budget=None):
+        """
+        发送请求，必要时发出对冲请求，返回先到达的有效结果
+
+        Args:
+            prompt: 提示词
+            max_tokens: 最大生成token数
+            temperature: 生成温度
+            output_dir: 输出目录，用于保存调试信息
+            model: 主请求使用的模型，为None时使用处理器的模型
+            deadline: 可选的文档处理期限（Deadline），到期时取消所有进行中的请求
+            budget: 文档的对冲预算（HedgeBudget），为None时本次请求单独使用一份预算
+
+        Returns:
+            dict: 解析后的结构化数据
+
+        Raises:
+            DeadlineExceeded: 期限到达时仍没有返回结果
+        """
+        budget = budget or self.policy.start_document()
+        results = queue.Queue()
+        primary_model = model or self.api_handler.model
+        inflight = {
+            primary_model: self._launch(primary_model, prompt, max_tokens, temperature, output_dir, results, deadline)
+        }
+
+        delay = self.policy.hedge_delay(primary_model)
+        hedged = False
+        fallback_response = None
+        last_error = None
+
+        while inflight:
+            timeout = None if hedged else delay
+            if deadline is not None:
+                timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+            try:
+                model, response, error = results.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is not None and deadline.expired():
+                    # 期限已到：取消所有进行中的请求
+                    for session, cancel_event in inflight.values():
+                        cancel_event.set()
+                        session.close()
+                    raise DeadlineExceeded(f"已超过文档处理期限（{deadline.seconds:g}秒），取消模型 {primary_model} 的请求")
+                if hedged:
+                    continue
+                # 主请求超过对冲等待时间仍未返回
+                hedged = True
+                hedge_model = self.policy.pick_hedge_model(primary_model)
+                if hedge_model and self.policy.try_reserve(hedge_model, prompt, max_tokens, budget):
+                    logger.info(f"模型 {primary_model} 超过 {delay:.1f} 秒未返回，向 {hedge_model} 发出对冲请求")
+                    inflight[hedge_model] = self._launch(
+                        hedge_model, prompt, max_tokens, temperature, output_dir, results, deadline
+                    )
+                continue
+
+            inflight.pop(model, None)
+            if error is not None:
+                logger.warning(f"模型 {model} 请求失败: {str(error)}")
+                last_error = error
+                continue
+
+            if self._is_valid(response):
+                # 取消仍在进行中的请求
+                for loser, (session, cancel_event) in inflight.items():
+                    logger.info(f"模型 {model} 先返回有效结果，取消 {loser} 的请求")
+                    cancel_event.set()
+                    session.close()
+                return response
+
+            # 无效结果：若另一方仍在进行中则继续等待
+            fallback_response = fallback_response or response
+
+        if fallback_response is not None:
+            return fallback_response
+        raise last_error
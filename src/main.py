@@ -13,7 +13,6 @@ import logging
 import argparse
 import time
 from datetime import datetime
-from dotenv import load_dotenv
 from pathlib import Path
 import re
 
@@ -25,16 +24,18 @@ from src.data_organizer import DataOrganizer
 from src.csv_generator import CSVGenerator
 from src.sentence_splitter import split_sentences
 from src.docx_reader import DocxReader
+from src.passage_store import dump_json
+from src.cli_options import add_runtime_options, apply_runtime_options, check_runtime_models
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("main")
 
-# 加载环境变量
-load_dotenv()
 
-def process_file(input_file, model_name=None, output_dir="test_results", save_debug=False, gen_csv=True):
+def process_file(input_file, model_name=None, output_dir="test_results", save_debug=False, gen_csv=True,
+                 hedge_policy=None, router=None, parquet_dir=None, corpus_db=None, passage_dir=None,
+                 csv_passage_refs=False):
     """
     处理指定的文档文件
     
@@ -44,6 +45,12 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
         output_dir: 输出目录
         save_debug: 是否保存调试信息
         gen_csv: 是否生成CSV文件
+        hedge_policy: 可选的对冲策略（HedgePolicy）
+        router: 可选的模型路由器（ModelRouter），按分段选择模型
+        parquet_dir: 可选的Parquet数据集目录，生成CSV时同时追加到该数据集
+        corpus_db: 可选的语料库数据库路径，生成CSV时同时更新该试卷的题目
+        passage_dir: 可选的原文存储目录，设置后分析JSON中的原文以内容哈希引用保存
+        csv_passage_refs: 是否在CSV中也使用原文引用（需要passage_dir）
     
     Returns:
         dict: 包含处理结果的字典，包括:
@@ -100,7 +107,7 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
         api_handler = OpenRouterHandler(model=model_name)
         
         # 初始化内容分析器
-        content_analyzer = ContentAnalyzer(api_handler=api_handler)
+        content_analyzer = ContentAnalyzer(api_handler=api_handler, hedge_policy=hedge_policy, router=router)
         
         # 提取数据
         extract_start_time = time.time()
@@ -128,14 +135,19 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
             # 没有年份时使用原目录
             output_json = os.path.join(output_dir, "analysis", f"{base_name}_{safe_model_name}_{timestamp}.json")
         
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump({
-                "model": api_handler.model,
-                "input_file": os.path.basename(input_file),
-                "analysis_time_seconds": extract_time,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "result": result
-            }, f, ensure_ascii=False, indent=2)
+        # 原文存储（可选）
+        passage_store = None
+        if passage_dir:
+            from src.passage_store import PassageStore
+            passage_store = PassageStore(passage_dir)
+        
+        dump_json({
+            "model": api_handler.model,
+            "input_file": os.path.basename(input_file),
+            "analysis_time_seconds": extract_time,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "result": result
+        }, output_json, passage_store)
         
         logger.info(f"JSON结果已保存到: {output_json}")
         
@@ -155,17 +167,11 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
                 csv_start_time = time.time()
                 
                 # 初始化数据组织器和CSV生成器
-                data_organizer = DataOrganizer()
+                data_organizer = DataOrganizer(passage_store=passage_store)
                 csv_generator = CSVGenerator()
                 
-                # 组织数据
-                organized_data = data_organizer.organize_data(result)
-                
-                # 确保数据集完整
-                complete_data = data_organizer.ensure_complete_dataset(organized_data)
-                
-                # 应用句子拆分
-                processed_data = data_organizer.apply_sentence_splitter(complete_data, split_sentences)
+                # 组织数据、补全缺失题目、句子拆分和排序一次完成
+                processed_data = data_organizer.postprocess(result, split_sentences)
                 
                 # 保存组织后的数据
                 if year:
@@ -175,8 +181,7 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
                     organized_json = os.path.join(output_dir, "analysis", f"organized_data_{timestamp}.json")
                     csv_dir = output_dir
                 
-                with open(organized_json, 'w', encoding='utf-8') as f:
-                    json.dump(processed_data, f, ensure_ascii=False, indent=2)
+                dump_json(processed_data, organized_json, passage_store)
                 logger.info(f"组织后的数据已保存到: {organized_json}")
                 
                 # 确定CSV文件名
@@ -186,7 +191,10 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
                 csv_path = os.path.join(csv_dir, csv_filename)
                 
                 # 生成CSV文件
-                csv_success = csv_generator.generate_csv(processed_data, csv_path)
+                csv_success = csv_generator.generate_csv(
+                    processed_data, csv_path,
+                    passage_store=passage_store if csv_passage_refs else None
+                )
                 csv_time = time.time() - csv_start_time
                 
                 if csv_success:
@@ -195,6 +203,17 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
                     logger.error(f"CSV文件生成失败，耗时: {csv_time:.2f} 秒")
                     csv_path = None
                 
+                # 追加到Parquet数据集（可选）
+                if parquet_dir:
+                    from src.parquet_exporter import ParquetExporter
+                    ParquetExporter().export(processed_data, parquet_dir)
+                
+                # 更新语料库（可选）
+                if corpus_db:
+                    from src.corpus_store import CorpusStore
+                    with CorpusStore(corpus_db) as store:
+                        store.upsert_paper(processed_data)
+                
             except Exception as e:
                 logger.error(f"生成CSV文件时出错: {str(e)}", exc_info=True)
                 csv_path = None
@@ -219,15 +238,120 @@ def process_file(input_file, model_name=None, output_dir="test_results", save_de
             "analysis_time": time.time() - start_time
         }
 
+def search_main(argv):
+    """
+    search子命令：在语料库中全文检索题干、选项和原文
+    
+    Args:
+        argv: 子命令参数列表
+    
+    Returns:
+        int: 退出码
+    """
+    import sqlite3
+    from src.corpus_store import CorpusStore, DEFAULT_CORPUS_DB, SEARCH_FIELDS, fts_query
+    
+    parser = argparse.ArgumentParser(prog="main.py search", description="在考研英语真题语料库中检索")
+    parser.add_argument('query', help="检索词，支持FTS5语法，如 \"economy\"、\"automat*\"、\"NEAR(climate change)\"；含连字符的词（如self-driving）按短语检索")
+    parser.add_argument('--db', default=DEFAULT_CORPUS_DB, help="语料库数据库路径")
+    parser.add_argument('--field', action='append', choices=SEARCH_FIELDS,
+                        help="检索字段，可多次指定，默认检索题干、选项和原文")
+    parser.add_argument('--year', help="限定年份")
+    parser.add_argument('--exam-type', help="限定考试类型，如 英语（一）")
+    parser.add_argument('--limit', type=int, default=20, help="最多显示的结果数（默认20）")
+    parser.add_argument('--json', action='store_true', help="以JSON格式输出结果")
+    parser.add_argument('--raw', action='store_true', help="检索词直接作为FTS5查询表达式使用，不对含连字符等字符的词加引号")
+    
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.db):
+        logger.error(f"语料库不存在: {args.db}（可使用 python -m src.corpus_store test_results 导入已有CSV）")
+        return 1
+    
+    query = args.query if args.raw else fts_query(args.query)
+    try:
+        with CorpusStore(args.db) as store:
+            results = store.search(query, fields=tuple(args.field or SEARCH_FIELDS),
+                                   year=args.year, exam_type=args.exam_type, limit=args.limit)
+    except sqlite3.OperationalError as e:
+        logger.error(f"检索词无法解析: {args.query}（{str(e)}）")
+        return 1
+    
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for item in results:
+            snippet = " ".join(item["摘要"].split())
+            print(f"{item['年份']}{item['考试类型']} 第{item['题目编号']}题 [{item['题型']}] ({item['匹配字段']}): {snippet}")
+        print(f"共 {len(results)} 条结果")
+    return 0
+
+def serve_main(argv):
+    """
+    serve子命令：启动本地HTTP提取服务（JSON API）
+    
+    Args:
+        argv: 子命令参数列表
+    
+    Returns:
+        int: 退出码
+    """
+    from src.server import serve
+    
+    parser = argparse.ArgumentParser(prog="main.py serve", description="启动本地考研英语真题提取服务")
+    parser.add_argument('--host', default="127.0.0.1", help="监听地址（默认127.0.0.1）")
+    parser.add_argument('--port', type=int, default=8765, help="监听端口（默认8765）")
+    parser.add_argument('--workers', type=int, default=2, help="同时执行的任务数（默认2）")
+    parser.add_argument('--max-queue', type=int, default=32, help="等待中的任务数上限，超过时返回503（默认32）")
+    parser.add_argument('--model', help="默认模型，提交任务时可单独指定")
+    parser.add_argument('--output-dir', default="test_results", help="输出目录，每个任务的结果写入jobs/<任务ID>子目录")
+    parser.add_argument('--job-db', help="任务表路径，默认为输出目录下的jobs.db")
+    
+    add_runtime_options(parser)
+    
+    args = parser.parse_args(argv)
+    
+    # 对冲策略和模型路由（可选），所有任务共享延迟历史，预算按文档单独计算
+    hedge_policy, router = apply_runtime_options(parser, args)
+    
+    if not check_runtime_models(args, hedge_policy, router):
+        return 1
+    
+    serve(
+        host=args.host,
+        port=args.port,
+        output_dir=args.output_dir,
+        model_name=args.model,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        job_db=args.job_db,
+        passage_dir=args.passage_store,
+        csv_passage_refs=args.csv_passage_refs,
+        parquet_dir=args.parquet_dir,
+        corpus_db=args.corpus_db,
+        hedge_policy=hedge_policy,
+        router=router
+    )
+    return 0
+
 def main():
     """主函数"""
+    # 子命令
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        return search_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        return serve_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(description="考研英语真题文档处理工具")
-    parser.add_argument('input_file', help="输入文件路径，支持txt和docx格式")
+    parser.add_argument('input_file', nargs='?', help="输入文件路径，支持txt和docx格式")
     parser.add_argument('--model', help="使用的模型名称，留空则使用环境变量中DEFAULT_MODEL指定的模型")
     parser.add_argument('--output-dir', default="test_results", help="输出目录，会自动根据年份创建子目录")
     parser.add_argument('--debug', action='store_true', help="保存调试信息，包括API响应和中间结果")
     parser.add_argument('--no-csv', action='store_true', help="不生成CSV文件，仅生成JSON结果")
     parser.add_argument('--year', help="指定年份，用于创建输出子目录，默认从文件名中提取")
+    parser.add_argument('--list-models', action='store_true', help="列出已配置的模型后退出")
+    parser.add_argument('--plan', action='store_true', help="只预估每个分段的输入/输出token数、花费和耗时，不调用API（离线）")
+    add_runtime_options(parser)
     
     # 添加帮助文本
     parser.epilog = """
@@ -236,7 +360,9 @@ def main():
   - 对于docx文件，会自动提取文本并处理
   - 对于txt文件，直接读取内容处理
   - 结果会根据年份自动保存在对应的子目录中
-  - 超过3000字符的长文档会自动使用分段处理，提高API调用效率
+  - 按降噪后文本的token估计预测一次性提取的输出：超过模型的输出上限，或该模型一次性提取的历史完整率
+    过低时直接分段提取；一次性提取不完整时复用已完整的分段，只请求缺少的部分
+  - 使用--plan可以在不调用API的情况下查看每个文档的提取方式（full/segments）、各请求的token数和预计花费
   - 使用--debug参数可以保存API响应和中间处理结果，便于分析和调试
   - 默认会同时生成JSON和CSV格式的结果文件，使用--no-csv可以禁用CSV生成
   
@@ -244,10 +370,35 @@ def main():
   python src/main.py input.txt --model google/gemini-2.5-flash-preview --debug
   python src/main.py 2023年考研英语真题.docx --output-dir custom_results
   python src/main.py input.txt --year 2022 --no-csv  # 手动指定年份，不生成CSV文件
+  python src/main.py input.txt --hedge --hedge-budget 0.02  # 启用对冲请求，降低长尾延迟
+  python src/main.py input.txt --route --doc-cost 0.05  # 按分段路由模型，单文档花费目标0.05美元
+  python src/main.py --list-models  # 列出已配置的模型（*标记当前默认模型）
+  python src/main.py input.docx --plan  # 离线预估各分段的token数、花费和耗时，不调用API
+  python src/main.py input.docx --parquet-dir test_results/corpus.parquet  # 同时追加到Parquet数据集
+  python src/main.py input.docx --corpus-db test_results/corpus.db  # 同时写入语料库
+  python src/main.py input.docx --splitter punkt  # 使用NLTK Punkt拆分句子
+  python src/main.py input.txt --strip-noise none  # 不删除解析、范文、参考译文等内容
+  python src/main.py input.docx --doc-deadline 300  # 单文档最多处理5分钟，超时返回已提取的部分
+  python src/main.py search "automatic door" --field passage  # 检索语料库（详见 search --help）
+  python src/main.py serve --port 8765 --workers 2  # 启动本地HTTP提取服务（详见 serve --help）
 """
     
     args = parser.parse_args()
     
+    # 列出已配置的模型
+    if args.list_models:
+        from src.model_config import list_available_models
+        default_model = get_model()
+        for info in list_available_models():
+            marker = "*" if info["name"] == default_model else " "
+            print(f"{marker} {info['name']:<45} {info['type']:<8} max_tokens={info['max_tokens']:<6} {info['description']}")
+        return 0
+    
+    if not args.input_file:
+        parser.error("需要指定输入文件路径")
+    
+    hedge_policy, router = apply_runtime_options(parser, args)
+    
     # 检查文件是否存在
     if not os.path.exists(args.input_file):
         logger.error(f"文件不存在: {args.input_file}")
@@ -258,13 +409,32 @@ def main():
     if args.year:
         output_dir = os.path.join(args.output_dir, args.year)
     
+    # 预估模式：只输出提取计划，不校验模型也不调用API
+    if args.plan:
+        from src.extraction_plan import ExtractionPlanner, format_plan
+        plan = ExtractionPlanner(model=args.model, router=router).plan_file(args.input_file)
+        if plan is None:
+            return 1
+        print(format_plan([plan]))
+        return 0
+    
+    # 在读取文档之前校验模型ID（模型目录缓存有效时不产生网络请求）
+    if not check_runtime_models(args, hedge_policy, router):
+        return 1
+    
     # 处理文件
     result = process_file(
         args.input_file, 
         model_name=args.model, 
         output_dir=output_dir,
         save_debug=args.debug,
-        gen_csv=not args.no_csv
+        gen_csv=not args.no_csv,
+        hedge_policy=hedge_policy,
+        router=router,
+        parquet_dir=args.parquet_dir,
+        corpus_db=args.corpus_db,
+        passage_dir=args.passage_store,
+        csv_passage_refs=args.csv_passage_refs
     )
     
     # 输出处理结果摘要
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OpenRouter模型目录模块，负责缓存/models接口返回的模型列表。
+
+模型目录保存在本地缓存文件中并带有过期时间（TTL），缓存有效时
+读取模型信息（上下文长度、最大输出token数、价格）不需要网络请求。
+缓存缺失且无法联网时，回退到仓库中的available_models.json快照。
+"""
+
+import os
+import json
+import time
+import difflib
+import logging
+import threading
+
+from src.deadline import request_timeout
+
+logger = logging.getLogger("考研英语真题处理.model_catalog")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 模型目录缓存路径和有效期（可通过环境变量覆盖）
+MODEL_CATALOG_PATH = os.getenv("MODEL_CATALOG_PATH", os.path.join(PROJECT_ROOT, ".cache", "openrouter_models.json"))
+MODEL_CATALOG_TTL = int(os.getenv("MODEL_CATALOG_TTL", str(24 * 3600)))
+
+# 仓库自带的模型列表快照，作为离线时的最后回退
+BUNDLED_MODELS_PATH = os.path.join(PROJECT_ROOT, "available_models.json")
+
+OPENROUTER_MODELS_API_URL = "https://openrouter.ai/api/v1/models"
+
+
+class ModelCatalog:
+    """
+    带TTL缓存的OpenRouter模型目录。
+    """
+
+    def __init__(self, cache_path=MODEL_CATALOG_PATH, ttl=MODEL_CATALOG_TTL,
+                 models_api_url=OPENROUTER_MODELS_API_URL, api_key=None):
+        """
+        初始化模型目录
+
+        Args:
+            cache_path (str): 缓存文件路径
+            ttl (int): 缓存有效期（秒）
+            models_api_url (str): OpenRouter模型列表API URL
+            api_key (str, optional): API密钥，/models接口不强制要求
+        """
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.models_api_url = models_api_url
+        self.api_key = api_key
+        self._lock = threading.Lock()
+        self._models = None
+        self._index = None
+        self._fetched_at = None
+        self._fetch_failed = False
+        self.source = None
+
+    def _is_fresh(self, fetched_at):
+        """判断缓存是否在有效期内"""
+        return fetched_at is not None and time.time() - fetched_at < self.ttl
+
+    def _read_cache(self):
+        """
+        读取缓存文件
+
+        Returns:
+            tuple: (模型列表, 获取时间戳)，缓存不存在或损坏时返回(None, None)
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None, None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get("data", []), data.get("fetched_at")
+        except (OSError, ValueError) as e:
+            logger.warning(f"模型目录缓存损坏，已忽略: {str(e)}")
+            return None, None
+
+    def _write_cache(self, models, fetched_at):
+        """将模型列表写入缓存文件（原子替换）"""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"fetched_at": fetched_at, "data": models}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"写入模型目录缓存失败: {str(e)}")
+
+    def _fetch(self):
+        """
+        从OpenRouter获取模型列表
+
+        Returns:
+            list: 模型列表
+        """
+        import requests
+
+        headers = {}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        response = requests.get(self.models_api_url, headers=headers, timeout=request_timeout())
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+    @staticmethod
+    def _read_bundled():
+        """读取仓库自带的模型列表快照"""
+        try:
+            with open(BUNDLED_MODELS_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get("data", []) if isinstance(data, dict) else data
+        except (OSError, ValueError):
+            return None
+
+    def _set_models(self, models, fetched_at, source):
+        """设置当前模型列表并重建索引"""
+        self._models = models
+        self._fetched_at = fetched_at
+        self._index = {m.get("id"): m for m in models if m.get("id")}
+        self.source = source
+
+    def load(self, allow_network=True, force_refresh=False):
+        """
+        加载模型目录
+
+        依次尝试：内存中的有效数据 -> 有效的缓存文件 -> 网络获取 -> 过期的缓存文件 -> 仓库快照。
+
+        Args:
+            allow_network (bool): 缓存失效时是否允许联网获取
+            force_refresh (bool): 是否忽略缓存强制联网获取
+
+        Returns:
+            bool: 是否成功加载到模型目录
+        """
+        with self._lock:
+            # 本进程中联网获取已失败过时，沿用已加载的回退数据，避免重复等待网络超时
+            if not force_refresh and self._models is not None and (
+                    self._is_fresh(self._fetched_at) or not allow_network or self._fetch_failed):
+                return True
+
+            stale = None
+            if not force_refresh:
+                models, fetched_at = self._read_cache()
+                if models is not None:
+                    if self._is_fresh(fetched_at) or not allow_network:
+                        self._set_models(models, fetched_at, "cache")
+                        return True
+                    stale = (models, fetched_at)
+
+            if allow_network:
+                try:
+                    models = self._fetch()
+                    fetched_at = time.time()
+                    self._write_cache(models, fetched_at)
+                    self._fetch_failed = False
+                    self._set_models(models, fetched_at, "network")
+                    logger.info(f"已从OpenRouter获取 {len(models)} 个模型并写入缓存")
+                    return True
+                except Exception as e:
+                    self._fetch_failed = True
+                    logger.warning(f"获取OpenRouter模型列表失败: {str(e)}")
+
+            if stale is not None:
+                logger.warning("使用已过期的模型目录缓存")
+                self._set_models(stale[0], stale[1], "stale_cache")
+                return True
+
+            bundled = self._read_bundled()
+            if bundled is not None:
+                self._set_models(bundled, None, "bundled")
+                return True
+
+            return False
+
+    def models(self):
+        """返回原始模型列表（与/models接口的data字段格式相同）"""
+        return list(self._models or [])
+
+    def __contains__(self, model_id):
+        return self._index is not None and model_id in self._index
+
+    def get(self, model_id):
+        """
+        获取模型的规范化信息
+
+        Args:
+            model_id (str): 模型ID
+
+        Returns:
+            dict: 包含id、name、context_length、max_output_tokens和pricing（美元/百万token）的字典，
+                  未知模型返回None
+        """
+        if not self._index or model_id not in self._index:
+            return None
+        model = self._index[model_id]
+        top_provider = model.get("top_provider") or {}
+        pricing = model.get("pricing") or {}
+
+        def per_million(value):
+            try:
+                return float(value) * 1_000_000
+            except (TypeError, ValueError):
+                return None
+
+        return {
+            "id": model_id,
+            "name": model.get("name", ""),
+            "context_length": top_provider.get("context_length") or model.get("context_length"),
+            "max_output_tokens": top_provider.get("max_completion_tokens"),
+            "pricing": {
+                "prompt": per_million(pricing.get("prompt")),
+                "completion": per_million(pricing.get("completion"))
+            }
+        }
+
+    def suggest(self, model_id, limit=3):
+        """返回与给定ID最接近的已知模型ID"""
+        return difflib.get_close_matches(model_id, list(self._index or []), n=limit, cutoff=0.6)
+
+    def validate(self, model_ids):
+        """
+        校验模型ID是否存在于目录中
+
+        Args:
+            model_ids (list): 模型ID列表
+
+        Returns:
+            dict: 未知模型ID -> 相近的候选ID列表；全部有效时返回空字典
+        """
+        unknown = {}
+        for model_id in model_ids:
+            if model_id and model_id not in self:
+                unknown[model_id] = self.suggest(model_id)
+        return unknown
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_model_catalog():
+    """
+    获取进程内共享的模型目录实例。
+
+    Returns:
+        ModelCatalog: 共享的模型目录
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ModelCatalog(api_key=os.getenv("OPENROUTER_API_KEY"))
+        return _catalog
+
+def validate_models(model_ids, allow_network=True):
+    """
+    启动时校验模型ID，缓存有效时不产生网络请求。
+
+    Args:
+        model_ids (list): 需要校验的模型ID列表
+        allow_network (bool): 缓存失效时是否允许联网刷新
+
+    Returns:
+        list: 错误信息列表，全部有效（或无法获取模型目录）时返回空列表
+    """
+    catalog = get_model_catalog()
+    if not catalog.load(allow_network=allow_network):
+        logger.warning("无法加载模型目录，跳过模型校验")
+        return []
+
+    errors = []
+    for model_id, suggestions in catalog.validate(model_ids).items():
+        message = f"未知的模型ID: {model_id}"
+        if suggestions:
+            message += f"，您是否想使用: {', '.join(suggestions)}"
+        errors.append(message)
+    return errors
+
+def check_models(model_ids, router=None, allow_network=True):
+    """
+    程序启动时（读取文档之前）校验将要使用的模型。
+
+    显式指定的模型ID未知时记录错误；模型路由器的候选模型中未知的ID
+    会被移除并记录警告，不影响启动。
+
+    Args:
+        model_ids (list): 显式指定的模型ID列表（主模型、对冲模型等）
+        router (ModelRouter, optional): 模型路由器
+        allow_network (bool): 缓存失效时是否允许联网刷新
+
+    Returns:
+        bool: 所有显式指定的模型均有效时返回True
+    """
+    errors = validate_models(model_ids, allow_network=allow_network)
+    for message in errors:
+        logger.error(message)
+
+    if router is not None:
+        catalog = get_model_catalog()
+        unknown = [m for m in router.candidates if catalog.source and m not in catalog]
+        known = [m for m in router.candidates if m not in unknown]
+        if unknown and known:
+            logger.warning(f"模型路由候选中的未知模型已移除: {', '.join(unknown)}")
+            router.candidates = known
+
+    return not errors
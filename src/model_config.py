@@ -7,10 +7,30 @@
 """
 
 import os
-from dotenv import load_dotenv
+import json
+import time
+import threading
+from collections import deque
+
+_env_loaded = False
+
+def load_env():
+    """
+    加载.env文件中的环境变量，整个进程只加载一次。
+    
+    Returns:
+        bool: 本次调用是否实际执行了加载
+    """
+    global _env_loaded
+    if _env_loaded:
+        return False
+    from dotenv import load_dotenv
+    load_dotenv()
+    _env_loaded = True
+    return True
 
 # 加载环境变量
-load_dotenv()
+load_env()
 
 # 可用的OpenRouter模型配置
 OPENROUTER_MODELS = {
@@ -28,18 +48,23 @@ OPENROUTER_MODELS = {
     ],
     
     # 所有可用模型及其说明
+    # pricing: 价格（美元/百万token）；quality: 相对质量等级（1-3），供模型路由使用
     "models": {
         # 免费模型
         "mistralai/mistral-7b-instruct:free": {
             "description": "Mistral 7B指令模型免费版",
             "type": "free",
-            "max_tokens": 4096
+            "max_tokens": 4096,
+            "pricing": {"prompt": 0, "completion": 0},
+            "quality": 1
         },
         # Google模型
         "google/gemini-2.5-flash-preview": {
             "description": "Google Gemini 2.5 Flash预览版",
             "type": "paid",
-            "max_tokens": 4096
+            "max_tokens": 4096,
+            "pricing": {"prompt": 0.15, "completion": 0.6},
+            "quality": 2
         },
         # 以下模型在当前账户不可用
         "deepseek/deepseek-r1:free": {
@@ -67,17 +92,23 @@ OPENROUTER_MODELS = {
         "openai/gpt-4o": {
             "description": "OpenAI GPT-4o模型，性能强大",
             "type": "paid",
-            "max_tokens": 8192
+            "max_tokens": 8192,
+            "pricing": {"prompt": 2.5, "completion": 10},
+            "quality": 3
         },
-        "anthropic/claude-3-5-sonnet": {
+        "anthropic/claude-3.5-sonnet": {
             "description": "Anthropic Claude 3.5 Sonnet模型",
             "type": "paid",
-            "max_tokens": 15000
+            "max_tokens": 15000,
+            "pricing": {"prompt": 3, "completion": 15},
+            "quality": 3
         },
         "anthropic/claude-3-haiku": {
             "description": "Anthropic Claude 3 Haiku模型，速度快",
             "type": "paid",
-            "max_tokens": 8192
+            "max_tokens": 8192,
+            "pricing": {"prompt": 0.25, "completion": 1.25},
+            "quality": 2
         }
     },
     
@@ -89,6 +120,27 @@ OPENROUTER_MODELS = {
     }
 }
 
+# 模型调用统计的持久化路径（可通过环境变量MODEL_STATS_PATH覆盖）
+MODEL_STATS_PATH = os.getenv(
+    "MODEL_STATS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "model_stats.json")
+)
+
+# 各分段的路由配置：
+#   difficulty: regular表示结构规整的内容（完形、阅读题目），hard表示需要更强模型的内容（新题型、翻译、写作）
+#   output_tokens: 预期输出token数，用于估算花费
+SEGMENT_PROFILES = {
+    "full": {"description": "一次性完整提取", "difficulty": "hard", "output_tokens": 8000},
+    1: {"description": "基本信息、完形填空和阅读原文", "difficulty": "regular", "output_tokens": 3500},
+    2: {"description": "新题型、翻译和写作原文", "difficulty": "hard", "output_tokens": 2500},
+    3: {"description": "题目1-25", "difficulty": "regular", "output_tokens": 3000},
+    4: {"description": "题目26-40", "difficulty": "regular", "output_tokens": 2500},
+    5: {"description": "题目41-52", "difficulty": "hard", "output_tokens": 2000},
+}
+
+# 各难度要求的最低模型质量等级
+MIN_QUALITY = {"regular": 1, "hard": 2}
+
 def get_model(model_key=None):
     """
     获取指定模型名称，如果未指定则返回默认模型。
@@ -144,6 +196,38 @@ def get_model(model_key=None):
     # 如果没有找到匹配的模型，返回默认模型
     return get_model(None)
 
+def _get_catalog_info(model_name):
+    """
+    从本地缓存的模型目录中读取模型信息，不产生网络请求。
+
+    Args:
+        model_name (str): 模型名称
+
+    Returns:
+        dict: 模型的规范化信息，目录不可用或模型未知时返回None
+    """
+    from src.model_catalog import get_model_catalog
+
+    catalog = get_model_catalog()
+    if not model_name or not catalog.load(allow_network=False):
+        return None
+    return catalog.get(model_name)
+
+def get_model_context_length(model_name):
+    """
+    获取指定模型的上下文长度。
+
+    Args:
+        model_name (str): 模型名称
+
+    Returns:
+        int: 上下文长度（token数），未知时返回None
+    """
+    info = _get_catalog_info(model_name)
+    if info and info.get("context_length"):
+        return int(info["context_length"])
+    return None
+
 def get_model_max_tokens(model_name):
     """
     获取指定模型的最大输出token数。
@@ -158,7 +242,12 @@ def get_model_max_tokens(model_name):
     if model_name in OPENROUTER_MODELS["models"]:
         return OPENROUTER_MODELS["models"][model_name].get("max_tokens", 4096)
     
-    # 对未配置的模型返回默认值
+    # 未配置的模型优先使用模型目录中的最大输出token数
+    info = _get_catalog_info(model_name)
+    if info and info.get("max_output_tokens"):
+        return int(info["max_output_tokens"])
+    
+    # 模型目录中没有记录时返回默认值
     # 根据模型ID推测合理的token限制
     if "gpt-4" in model_name:
         return 8192
@@ -178,6 +267,34 @@ def get_model_max_tokens(model_name):
     # 保守的默认值
     return 4096
 
+def get_model_pricing(model_name):
+    """
+    获取指定模型的价格（美元/百万token）。
+
+    Args:
+        model_name (str): 模型名称
+
+    Returns:
+        dict: 形如{"prompt": 0.15, "completion": 0.6}的价格字典，未知模型返回None
+    """
+    # 优先使用模型目录中的实时价格
+    info = _get_catalog_info(model_name)
+    if info:
+        pricing = info["pricing"]
+        if pricing["prompt"] is not None and pricing["completion"] is not None:
+            return dict(pricing)
+
+    if model_name in OPENROUTER_MODELS["models"]:
+        pricing = OPENROUTER_MODELS["models"][model_name].get("pricing")
+        if pricing:
+            return dict(pricing)
+
+    # 带有:free后缀的模型不计费
+    if model_name and model_name.endswith(":free"):
+        return {"prompt": 0.0, "completion": 0.0}
+
+    return None
+
 def list_available_models():
     """
     列出所有可用模型及其描述。
@@ -218,4 +335,442 @@ def get_model_info(model_name):
         info = OPENROUTER_MODELS["models"][model_name].copy()
         info["name"] = model_name
         return info
-    return None 
\ No newline at end of file
+    return None 
+
+class ModelStatsStore:
+    """
+    模型调用统计，记录各模型的延迟、成功率和token用量，并持久化到JSON文件，
+    使模型路由和对冲策略可以跨运行积累历史数据。
+    """
+
+    # 每个模型保留的延迟样本数
+    MAX_SAMPLES = 200
+
+    def __init__(self, path=MODEL_STATS_PATH):
+        """
+        初始化统计存储
+
+        Args:
+            path (str): 持久化文件路径，为None时只在内存中保存
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._models = {}
+        self._load()
+
+    def _load(self):
+        """从持久化文件加载统计数据"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for model, entry in data.get("models", {}).items():
+                entry["latencies"] = deque(entry.get("latencies", []), maxlen=self.MAX_SAMPLES)
+                self._models[model] = entry
+        except (OSError, ValueError):
+            # 统计文件损坏时从空数据开始，不影响主流程
+            self._models = {}
+
+    def _entry(self, model):
+        """获取（必要时创建）模型的统计条目"""
+        if model not in self._models:
+            self._models[model] = {
+                "calls": 0,
+                "successes": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "latencies": deque(maxlen=self.MAX_SAMPLES)
+            }
+        return self._models[model]
+
+    def record_call(self, model, latency, success, prompt_tokens=None, completion_tokens=None,
+                    estimated_prompt_tokens=None):
+        """
+        记录一次模型调用
+
+        Args:
+            model (str): 模型名称
+            latency (float): 调用耗时（秒）
+            success (bool): 是否成功
+            prompt_tokens (int, optional): 输入token数
+            completion_tokens (int, optional): 输出token数
+            estimated_prompt_tokens (int, optional): 请求前估计的输入token数（未校准），用于校准token估计
+        """
+        with self._lock:
+            entry = self._entry(model)
+            entry["calls"] += 1
+            if success:
+                entry["successes"] += 1
+                entry["latencies"].append(round(float(latency), 3))
+            entry["prompt_tokens"] += prompt_tokens or 0
+            entry["completion_tokens"] += completion_tokens or 0
+            if prompt_tokens and estimated_prompt_tokens:
+                # 只累计同时有实际值和估计值的调用
+                entry["calibration_calls"] = entry.get("calibration_calls", 0) + 1
+                entry["calibration_prompt_tokens"] = entry.get("calibration_prompt_tokens", 0) + prompt_tokens
+                entry["estimated_prompt_tokens"] = entry.get("estimated_prompt_tokens", 0) + estimated_prompt_tokens
+
+    def record_full_extraction(self, model, complete):
+        """
+        记录一次一次性提取的结果，用于预测该模型能否一次返回完整结果
+
+        Args:
+            model (str): 模型名称
+            complete (bool): 是否返回了全部题目
+        """
+        with self._lock:
+            entry = self._entry(model)
+            entry["full_attempts"] = entry.get("full_attempts", 0) + 1
+            if complete:
+                entry["full_complete"] = entry.get("full_complete", 0) + 1
+
+    def full_complete_rate(self, model, min_calls=1):
+        """
+        返回指定模型一次性提取返回完整结果的比例
+
+        Args:
+            model (str): 模型名称
+            min_calls (int): 最少需要的记录次数
+
+        Returns:
+            float: 完整结果的比例，记录不足时返回None
+        """
+        with self._lock:
+            entry = self._models.get(model) or {}
+            attempts = entry.get("full_attempts", 0)
+            complete = entry.get("full_complete", 0)
+        if attempts < min_calls:
+            return None
+        return complete / attempts
+
+    def record_breaker(self, model, state):
+        """
+        记录模型熔断器的状态变化
+
+        Args:
+            model (str): 模型名称
+            state (str): 新状态（closed、open或half_open）
+        """
+        with self._lock:
+            breaker = self._entry(model).setdefault("breaker", {"state": "closed", "transitions": {}})
+            breaker["state"] = state
+            breaker["changed_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            breaker["transitions"][state] = breaker["transitions"].get(state, 0) + 1
+
+    def record(self, model, seconds):
+        """记录一次成功调用的耗时（与hedging.LatencyTracker接口兼容）"""
+        self.record_call(model, seconds, True)
+
+    def sample_count(self, model):
+        """返回指定模型的延迟样本数"""
+        with self._lock:
+            entry = self._models.get(model)
+            return len(entry["latencies"]) if entry else 0
+
+    def percentile(self, model, pct):
+        """
+        计算指定模型的延迟分位数
+
+        Args:
+            model (str): 模型名称
+            pct (float): 分位数（0-100）
+
+        Returns:
+            float: 分位数对应的耗时（秒），没有样本时返回None
+        """
+        with self._lock:
+            entry = self._models.get(model)
+            samples = sorted(entry["latencies"]) if entry else []
+        if not samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+    def mean_latency(self, model):
+        """返回指定模型的平均延迟（秒），没有样本时返回None"""
+        with self._lock:
+            entry = self._models.get(model)
+            samples = list(entry["latencies"]) if entry else []
+        return sum(samples) / len(samples) if samples else None
+
+    def mean_completion_tokens(self, model):
+        """返回指定模型每次成功调用的平均输出token数，没有记录时返回None"""
+        with self._lock:
+            entry = self._models.get(model)
+            successes = entry["successes"] if entry else 0
+            completion_tokens = entry["completion_tokens"] if entry else 0
+        return completion_tokens / successes if successes and completion_tokens else None
+
+    def token_ratio(self, model, min_calls=1):
+        """
+        返回指定模型实际输入token数与估计值之比
+
+        Args:
+            model (str): 模型名称
+            min_calls (int): 最少需要的调用次数
+
+        Returns:
+            float: 实际/估计的比值，样本不足时返回None
+        """
+        with self._lock:
+            entry = self._models.get(model) or {}
+            calls = entry.get("calibration_calls", 0)
+            actual = entry.get("calibration_prompt_tokens", 0)
+            estimated = entry.get("estimated_prompt_tokens", 0)
+        if calls < min_calls or not estimated:
+            return None
+        return actual / estimated
+
+    def success_rate(self, model):
+        """
+        返回指定模型的成功率
+
+        使用拉普拉斯平滑，没有记录的模型返回0.5附近的先验值，
+        避免新模型因一次失败被永久排除。
+        """
+        with self._lock:
+            entry = self._models.get(model)
+            calls = entry["calls"] if entry else 0
+            successes = entry["successes"] if entry else 0
+        return (successes + 1) / (calls + 2)
+
+    def summary(self):
+        """
+        返回所有模型的统计摘要
+
+        Returns:
+            dict: 模型名称 -> {calls, success_rate, mean_latency, p90_latency, breaker}
+        """
+        result = {}
+        for model in list(self._models):
+            result[model] = {
+                "calls": self._models[model]["calls"],
+                "success_rate": round(self.success_rate(model), 3),
+                "mean_latency": self.mean_latency(model),
+                "p90_latency": self.percentile(model, 90),
+                "breaker": self._models[model].get("breaker", {}).get("state", "closed")
+            }
+        return result
+
+    def save(self):
+        """将统计数据写入持久化文件（原子替换）"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {"models": {}}
+            for model, entry in self._models.items():
+                data["models"][model] = dict(entry, latencies=list(entry["latencies"]))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # 临时文件名区分进程和线程，避免并发保存时互相覆盖
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+_model_stats = None
+_model_stats_lock = threading.Lock()
+
+def get_model_stats():
+    """
+    获取进程内共享的模型统计存储。
+
+    Returns:
+        ModelStatsStore: 共享的统计存储实例
+    """
+    global _model_stats
+    with _model_stats_lock:
+        if _model_stats is None:
+            _model_stats = ModelStatsStore()
+        return _model_stats
+
+
+class RouteBudget:
+    """
+    单个文档的路由预算：剩余的花费、延迟目标和预计的请求次数。
+    """
+
+    def __init__(self, cost=None, latency=None, segments=5):
+        """
+        初始化路由预算
+
+        Args:
+            cost (float, optional): 单文档花费目标（美元），为None时不限制
+            latency (float, optional): 单文档延迟目标（秒），为None时不限制
+            segments (int): 预计的请求次数，用于平均分配预算
+        """
+        self.cost_remaining = cost
+        self.latency_remaining = latency
+        self.segments_remaining = max(1, segments)
+        # 可重入锁：choose()在持有锁时调用rank()读取预算份额
+        self.lock = threading.RLock()
+
+    def shares(self):
+        """
+        返回下一次请求可用的预算份额
+
+        Returns:
+            tuple: (花费份额, 延迟份额)，未设置目标的一项为None
+        """
+        with self.lock:
+            cost_share = None if self.cost_remaining is None else self.cost_remaining / self.segments_remaining
+            latency_share = None if self.latency_remaining is None else self.latency_remaining / self.segments_remaining
+        return cost_share, latency_share
+
+    def spend(self, cost, latency):
+        """
+        扣除一次请求的预估花费和延迟
+
+        Args:
+            cost (float): 预估花费（美元）
+            latency (float): 预估延迟（秒）
+        """
+        with self.lock:
+            if self.cost_remaining is not None:
+                self.cost_remaining = max(0.0, self.cost_remaining - cost)
+            if self.latency_remaining is not None:
+                self.latency_remaining = max(0.0, self.latency_remaining - latency)
+            self.segments_remaining = max(1, self.segments_remaining - 1)
+
+
+class ModelRouter:
+    """
+    基于历史延迟、成功率和价格为每个分段选择模型的路由器。
+
+    结构规整的分段（完形填空、阅读题目）优先使用快速、便宜的模型，
+    新题型、翻译等分段只在质量等级足够的模型中选择；
+    在设定了单文档花费/延迟目标时，每个分段平均分配剩余预算。
+    """
+
+    # 没有历史数据时假定的单次调用延迟（秒）
+    DEFAULT_LATENCY = 30.0
+
+    def __init__(self, candidates=None, stats=None, cost_budget=None, latency_budget=None, cost_weight=200.0):
+        """
+        初始化模型路由器
+
+        Args:
+            candidates (list, optional): 候选模型列表，默认使用by_tier中的模型和已配置价格的模型
+            stats (ModelStatsStore, optional): 统计存储，默认使用共享实例
+            cost_budget (float, optional): 默认的单文档花费目标（美元）
+            latency_budget (float, optional): 默认的单文档延迟目标（秒）
+            cost_weight (float): 花费折算为秒的权重（每美元折算的秒数）
+        """
+        self.candidates = candidates or self._default_candidates()
+        self.stats = stats or get_model_stats()
+        self.cost_budget = cost_budget
+        self.latency_budget = latency_budget
+        self.cost_weight = cost_weight
+
+    @staticmethod
+    def _default_candidates():
+        """默认候选模型：by_tier中的模型，以及配置了价格的模型"""
+        candidates = []
+        for model in OPENROUTER_MODELS["by_tier"].values():
+            if model not in candidates:
+                candidates.append(model)
+        for model, info in OPENROUTER_MODELS["models"].items():
+            if "pricing" in info and model not in candidates:
+                candidates.append(model)
+        return candidates
+
+    @staticmethod
+    def model_quality(model_name):
+        """返回模型的质量等级，未配置的模型视为中等（2）"""
+        info = OPENROUTER_MODELS["models"].get(model_name, {})
+        return info.get("quality", 2)
+
+    def start_document(self, cost_budget=None, latency_budget=None, segments=5):
+        """
+        开始为一个新文档路由，创建该文档的预算
+
+        Args:
+            cost_budget (float, optional): 单文档花费目标（美元），默认使用初始化时的设置
+            latency_budget (float, optional): 单文档延迟目标（秒），默认使用初始化时的设置
+            segments (int): 预计的请求次数，用于平均分配预算
+
+        Returns:
+            RouteBudget: 该文档的路由预算
+        """
+        return RouteBudget(
+            cost_budget if cost_budget is not None else self.cost_budget,
+            latency_budget if latency_budget is not None else self.latency_budget,
+            segments
+        )
+
+    def estimate(self, model_name, segment, prompt_tokens):
+        """
+        估算在指定分段上使用某个模型的花费和延迟
+
+        Args:
+            model_name (str): 模型名称
+            segment: 分段编号（1-5）或"full"
+            prompt_tokens (int): 输入token数
+
+        Returns:
+            tuple: (预估花费（美元，价格未知时为None）, 预估延迟（秒）)
+        """
+        profile = SEGMENT_PROFILES.get(segment, SEGMENT_PROFILES["full"])
+        pricing = get_model_pricing(model_name)
+        cost = None
+        if pricing is not None:
+            cost = (prompt_tokens * pricing.get("prompt", 0.0)
+                    + profile["output_tokens"] * pricing.get("completion", 0.0)) / 1_000_000
+        latency = self.stats.mean_latency(model_name) or self.DEFAULT_LATENCY
+        return cost, latency
+
+    def rank(self, segment, prompt_tokens=0, budget=None):
+        """
+        按当前预算为指定分段的候选模型排序（不扣除预算）
+
+        Args:
+            segment: 分段编号（1-5）或"full"
+            prompt_tokens (int): 输入token数
+            budget (RouteBudget, optional): 文档的路由预算，默认为尚未使用的新预算
+
+        Returns:
+            list: (模型名称, 预估花费, 预估延迟)列表，最优的模型在前
+        """
+        from src.circuit_breaker import get_breaker
+
+        profile = SEGMENT_PROFILES.get(segment, SEGMENT_PROFILES["full"])
+        min_quality = MIN_QUALITY.get(profile["difficulty"], 1)
+        qualified = [m for m in self.candidates if self.model_quality(m) >= min_quality] or list(self.candidates)
+        # 跳过已熔断的模型（全部熔断时仍从中选择）
+        qualified = [m for m in qualified if get_breaker(m).available()] or qualified
+
+        # 当前分段可用的预算份额
+        cost_share, latency_share = (budget or self.start_document()).shares()
+
+        scored = []
+        for model_name in qualified:
+            cost, latency = self.estimate(model_name, segment, prompt_tokens)
+            cost_value = cost if cost is not None else 0.0
+            # 期望开销：失败需要重试，按成功率放大
+            score = (latency + self.cost_weight * cost_value) / self.stats.success_rate(model_name)
+            within_budget = ((cost_share is None or (cost is not None and cost <= cost_share))
+                             and (latency_share is None or latency <= latency_share))
+            scored.append((not within_budget, score, model_name, cost_value, latency))
+
+        scored.sort()
+        return [(model_name, cost, latency) for _, _, model_name, cost, latency in scored]
+
+    def choose(self, segment, prompt_tokens=0, budget=None):
+        """
+        为指定分段选择模型，并从文档的路由预算中扣除预估的花费和延迟
+
+        Args:
+            segment: 分段编号（1-5）或"full"
+            prompt_tokens (int): 输入token数
+            budget (RouteBudget, optional): 文档的路由预算，为None时本次选择单独使用一份预算
+
+        Returns:
+            str: 选中的模型名称
+        """
+        budget = budget or self.start_document()
+        # 同一文档的分段并发选择时，排序和扣除预算作为一个整体
+        with budget.lock:
+            chosen, cost, latency = self.rank(segment, prompt_tokens, budget)[0]
+            budget.spend(cost, latency)
+        return chosen
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文档降噪模块，在构建提示词之前删除与提取无关的内容，减少每次请求的输入token。
+
+可删除的内容类别：
+    notes: 考生注意事项、考生编号/姓名等卷首卷尾信息
+    page_lines: 页眉页脚行，如"英语(一)试题.11. (共14页)"
+    explanations: 答案解析、考点、思路、全文翻译等中文解析段落
+    sample_essays: 写作的参考范文
+    translation_refs: 翻译题的参考译文（已在本地从参考答案中解析，见answer_key）
+
+试卷正文、选项和参考答案（答案表格）始终保留。类别可通过环境变量NOISE_FILTER或
+命令行参数--strip-noise设置：all（默认）、none，或逗号分隔的类别名称。
+"""
+
+import os
+import re
+import logging
+
+from src.exam_layout import get_exam_layout
+from src.token_estimator import estimate_tokens
+
+logger = logging.getLogger("考研英语真题处理.noise_filter")
+
+# 全部降噪类别
+NOISE_CATEGORIES = ("notes", "page_lines", "explanations", "sample_essays", "translation_refs")
+
+# 默认的降噪设置
+NOISE_FILTER = os.getenv("NOISE_FILTER", "all")
+
+# 考生注意事项：从标题开始到第一个Section/Part/Directions标题之前
+_NOTES_START = re.compile(r"^\s*[☆★]?\s*考生(?:须知|注意事项)")
+# 单独成行的卷首卷尾信息
+_NOTE_LINE = re.compile(r"^\s*(?:[(（]以下信息考生必须认真填写[)）]|考生(?:编号|姓名)[:：]?)\s*$")
+
+# 页眉页脚行（整行较短，且包含"共N页"或"第N页"）
+_PAGE_LINE = re.compile(r"[(（]\s*共\s*\d+\s*页\s*[)）]|^\s*第\s*\d+\s*页(?:\s*[,，/]?\s*共\s*\d+\s*页)?\s*$")
+_PAGE_LINE_MAX_LENGTH = 40
+
+# 解析段落的开头，可以带题号，如"【解析】"、"21.【答案解析】"、"考点："、"【全文翻译】"
+_EXPLANATION_START = re.compile(
+    r"^\s*(?:\d{1,2}\s*[.．、]\s*)?[【\[]?\s*(?:答案)?(?:解析|详解|精析|精解|考点|思路|解题思路|点评|"
+    r"命题意图|命题思路|试题分析|文章大意|全文翻译|参考译文|范文译文|译文|长难句|重点词汇|词汇注释)\s*[】\]]?\s*[:：]?")
+# 参考范文的开头，如"【参考范文】"、"范文："、"Sample Essay"
+_ESSAY_START = re.compile(
+    r"^\s*[【\[]?\s*(?:参考范文|范文参考|参考作文|范文\s*[一二三1-3]?|Sample(?:\s+Essay)?|Model\s+Essay)\s*[】\]]?\s*[:：]?\s*$",
+    re.IGNORECASE)
+
+# 板块和篇章标题
+_HEADING = re.compile(
+    r"^\s*(?:Section\b|Part\s+[A-C]\b|Text\s*\d|Directions\b|[一二三四五六七八九十]+\s*[、.．]|"
+    r"(?:英语知识运用|完形填空|阅读理解|新题型|翻译|写作)\s*$)", re.IGNORECASE)
+
+# 解析和范文段落的结束位置：板块标题、题号或参考答案
+_BLOCK_END = re.compile(
+    r"^\s*(?:\d{1,2}\s*[.．、]|[(（]\s*\d{1,2}\s*[)）]|.*参考答案|[【\[]?\s*答案\s*[】\]]?\s*[:：]?\s*[A-G]\b)")
+
+# 正文中的汉字
+_CJK = re.compile(r"[一-鿿]")
+# 汉字占比达到该值的行视为中文行（解析正文、参考译文）
+_CJK_RATIO = 0.3
+
+
+def _is_chinese(line):
+    """判断一行是否以中文为主"""
+    stripped = "".join(line.split())
+    return bool(stripped) and len(_CJK.findall(stripped)) / len(stripped) >= _CJK_RATIO
+
+
+def parse_categories(spec):
+    """
+    解析降噪设置
+
+    Args:
+        spec (str|list): "all"、"none"或逗号分隔的类别名称，也可以是类别列表
+
+    Returns:
+        tuple: 启用的类别
+
+    Raises:
+        ValueError: 包含未知的类别名称时
+    """
+    if spec is None or spec == "all":
+        return NOISE_CATEGORIES
+    if spec in ("", "none"):
+        return ()
+    names = [name.strip() for name in spec.split(",")] if isinstance(spec, str) else list(spec)
+    unknown = [name for name in names if name and name not in NOISE_CATEGORIES]
+    if unknown:
+        raise ValueError(f"未知的降噪类别: {', '.join(unknown)}，可选: all, none, {', '.join(NOISE_CATEGORIES)}")
+    return tuple(category for category in NOISE_CATEGORIES if category in names)
+
+
+class NoiseFilter:
+    """
+    按行删除文档中的解析、范文、参考译文等内容。
+    """
+
+    def __init__(self, categories=None, exam_type=None):
+        """
+        初始化降噪器
+
+        Args:
+            categories (str|list, optional): 启用的类别，格式见parse_categories，默认使用NOISE_FILTER
+            exam_type (str, optional): 考试类型，用于确定翻译题的题号范围
+        """
+        self.categories = parse_categories(NOISE_FILTER if categories is None else categories)
+        translation = [section for section in get_exam_layout(exam_type).sections
+                       if section.section_key == "translation"]
+        self.translation_numbers = set()
+        for section in translation:
+            self.translation_numbers.update(range(section.first, section.last + 1))
+
+    @property
+    def enabled(self):
+        """是否启用了任何降噪类别"""
+        return bool(self.categories)
+
+    def _classify(self, lines):
+        """
+        为每一行确定所属的降噪类别
+
+        Returns:
+            list: 与lines等长的类别列表，保留的行为None
+        """
+        labels = [None] * len(lines)
+        block = None  # 当前所在的解析/范文/注意事项段落类别
+
+        for index, line in enumerate(lines):
+            if block == "notes" and (_HEADING.match(line) or not _is_chinese(line)):
+                # 注意事项只包含中文说明，遇到标题或英文正文时结束
+                block = None
+            elif block in ("explanations", "sample_essays") and (_HEADING.match(line) or _BLOCK_END.match(line)) \
+                    and not _EXPLANATION_START.match(line):
+                block = None
+
+            if _NOTES_START.match(line):
+                block = "notes"
+            elif _EXPLANATION_START.match(line):
+                block = "explanations"
+            elif _ESSAY_START.match(line):
+                block = "sample_essays"
+
+            if block == "notes" or _NOTE_LINE.match(line):
+                labels[index] = "notes"
+            elif block == "explanations":
+                # 解析正文为中文，英文行（试卷正文）即使在段落中也保留
+                if _EXPLANATION_START.match(line) or _is_chinese(line):
+                    labels[index] = "explanations"
+                else:
+                    block = None
+            elif block == "sample_essays":
+                labels[index] = "sample_essays"
+            elif len(line.strip()) <= _PAGE_LINE_MAX_LENGTH and _PAGE_LINE.search(line):
+                labels[index] = "page_lines"
+            else:
+                match = re.match(r"^\s*(\d{1,2})\s*[.．、]\s*(.+)$", line)
+                if match and int(match.group(1)) in self.translation_numbers and _is_chinese(match.group(2)):
+                    labels[index] = "translation_refs"
+        return labels
+
+    def filter(self, text):
+        """
+        删除文本中启用类别的内容
+
+        Args:
+            text (str): 文档文本
+
+        Returns:
+            tuple: (降噪后的文本, 各类别删除的字符数字典)
+        """
+        if not text or not self.categories:
+            return text, {}
+
+        lines = text.split("\n")
+        kept = []
+        removed = {}
+        for line, label in zip(lines, self._classify(lines)):
+            if label in self.categories:
+                removed[label] = removed.get(label, 0) + len(line) + 1
+            else:
+                kept.append(line)
+
+        if not removed:
+            return text, {}
+        return "\n".join(kept), removed
+
+    def reduce(self, text):
+        """
+        删除文本中启用类别的内容，并记录删除的字符数和估计的token数
+
+        Args:
+            text (str): 文档文本
+
+        Returns:
+            str: 降噪后的文本
+        """
+        filtered, removed = self.filter(text)
+        if removed:
+            removed_chars = len(text) - len(filtered)
+            removed_tokens = estimate_tokens(text) - estimate_tokens(filtered)
+            details = "，".join(f"{category} {count}" for category, count in removed.items())
+            logger.info(f"降噪删除 {removed_chars}/{len(text)} 个字符（约 {removed_tokens} tokens）: {details}")
+        return filtered
+
+
+def set_default_categories(spec):
+    """
+    设置默认的降噪类别（同时写入环境变量，进程池中的工作进程使用相同设置）
+
+    Args:
+        spec (str): "all"、"none"或逗号分隔的类别名称
+
+    Raises:
+        ValueError: 包含未知的类别名称时
+    """
+    global NOISE_FILTER
+    parse_categories(spec)
+    NOISE_FILTER = spec
+    os.environ["NOISE_FILTER"] = spec
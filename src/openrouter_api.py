@@ -9,8 +9,10 @@ import os
 import json
 import logging
 import time
-import requests
 from .model_config import get_model, get_model_max_tokens
+from .answer_key import attach_answer_key
+from .circuit_breaker import get_breaker, is_model_failure, select_model
+from .deadline import DeadlineExceeded, request_timeout
 
 logger = logging.getLogger("考研英语真题处理.openrouter_api")
 
@@ -69,7 +71,8 @@ class OpenRouterAPI:
         if self.site_name:
             self.headers["X-Title"] = self.site_name
     
-    def _make_api_request(self, messages, max_tokens=None, temperature=0.0, max_retries=3, retry_delay=5, routes_params=None, **extra_params):
+    def _make_api_request(self, messages, max_tokens=None, temperature=0.0, max_retries=3, retry_delay=5, routes_params=None,
+                          deadline=None, **extra_params):
         """
         发送API请求到OpenRouter。
         
@@ -80,10 +83,14 @@ class OpenRouterAPI:
             max_retries (int): 最大重试次数
             retry_delay (int): 重试间隔（秒）
             routes_params (dict, optional): 路由参数，用于处理数据隐私策略
+            deadline (Deadline, optional): 处理期限，每次请求的读取超时不超过剩余时间，到期后不再重试
             **extra_params: 额外的API参数，如top_p、frequency_penalty等
             
         Returns:
             dict: API响应结果
+        
+        Raises:
+            DeadlineExceeded: 期限在请求或重试之前到达
         """
         # 如果未指定max_tokens，使用模型的最大值
         if max_tokens is None or max_tokens > self.max_tokens:
@@ -107,44 +114,81 @@ class OpenRouterAPI:
             for key, value in routes_params.items():
                 payload[key] = value
         
+        # requests导入较慢，仅在实际发送请求时导入
+        import requests
+        
         for attempt in range(max_retries):
+            # 模型已熔断时改用备用模型
+            model = select_model(self.model)
+            payload["model"] = model
+            breaker = get_breaker(model)
             try:
                 logger.info(f"发送API请求 (尝试 {attempt+1}/{max_retries})...")
                 
                 response = requests.post(
                     self.api_endpoint,
                     headers=self.headers,
-                    json=payload
+                    json=payload,
+                    timeout=request_timeout(deadline)
                 )
                 
                 if response.status_code == 200:
                     # 成功响应
+                    breaker.record_success()
                     return response.json()
                 else:
-                    # 错误响应
+                    # 错误响应；429和5xx说明模型不可用，计入熔断
+                    if response.status_code == 429 or response.status_code >= 500:
+                        breaker.record_failure(f"状态码 {response.status_code}")
+                    else:
+                        breaker.release()
                     error_data = response.json()
                     logger.error(f"API请求失败，状态码: {response.status_code}")
                     logger.error(f"错误详情: {json.dumps(error_data, indent=2)}")
                     
+                    if deadline is not None and deadline.remaining() < retry_delay:
+                        logger.error("已接近处理期限，不再重试")
+                        return {"error": error_data}
                     if attempt < max_retries - 1:
-                        logger.info(f"将在{retry_delay}秒后重试")
-                        time.sleep(retry_delay)
+                        self._wait_before_retry(model, retry_delay)
                     else:
                         logger.error("达到最大重试次数")
                         return {"error": error_data}
             
+            except DeadlineExceeded:
+                breaker.release()
+                raise
             except Exception as e:
                 logger.error(f"API调用错误: {str(e)}")
+                if is_model_failure(e):
+                    breaker.record_failure(e)
+                else:
+                    breaker.release()
                 
+                if deadline is not None and deadline.remaining() < retry_delay:
+                    raise DeadlineExceeded(f"重试前已接近处理期限（{deadline.seconds:g}秒），不再重试") from e
                 if attempt < max_retries - 1:
-                    logger.info(f"将在{retry_delay}秒后重试")
-                    time.sleep(retry_delay)
+                    self._wait_before_retry(model, retry_delay)
                 else:
                     logger.error("达到最大重试次数")
                     raise
         
         return {"error": "所有重试均失败"}
     
+    def _wait_before_retry(self, model, retry_delay):
+        """
+        重试前等待；模型刚刚熔断时立即改用备用模型重试，不再等待
+        
+        Args:
+            model (str): 本次失败的模型
+            retry_delay (int): 重试间隔（秒）
+        """
+        if not get_breaker(model).available():
+            logger.info(f"模型 {model} 已熔断，立即使用备用模型重试")
+            return
+        logger.info(f"将在{retry_delay}秒后重试")
+        time.sleep(retry_delay)
+    
     def _extract_json(self, text):
         """
         从响应文本中提取JSON部分。
@@ -183,7 +227,8 @@ class OpenRouterAPI:
         # 如果没有找到明确的JSON标记，返回原始文本
         return text
     
-    def analyze_document(self, document_text, max_retries=3, retry_delay=5, temperature=0.0, routes_params=None, **extra_params):
+    def analyze_document(self, document_text, max_retries=3, retry_delay=5, temperature=0.0, routes_params=None, deadline=None,
+                         **extra_params):
         """
         使用OpenRouter分析文档内容。
         
@@ -193,6 +238,7 @@ class OpenRouterAPI:
             retry_delay (int, optional): 重试延迟时间（秒）
             temperature (float, optional): 温度参数，控制生成的随机性
             routes_params (dict, optional): 路由参数，用于处理数据隐私策略
+            deadline (Deadline, optional): 处理期限，到期后返回包含error的结果
             **extra_params: 额外的API参数
         
         Returns:
@@ -218,6 +264,7 @@ class OpenRouterAPI:
                 max_retries=max_retries,
                 retry_delay=retry_delay,
                 routes_params=default_routes,
+                deadline=deadline,
                 **extra_params
             )
             
@@ -240,7 +287,8 @@ class OpenRouterAPI:
             logger.exception(f"分析文档时出错: {str(e)}")
             return {"error": str(e)}
     
-    def extract_structured_data(self, document_text, max_retries=3, retry_delay=5, temperature=0.0, max_tokens=4000, routes_params=None, **extra_params):
+    def extract_structured_data(self, document_text, max_retries=3, retry_delay=5, temperature=0.0, max_tokens=4000, routes_params=None,
+                                deadline=None, **extra_params):
         """
         使用更详细的提示词从文档中提取结构化数据。
         
@@ -251,6 +299,7 @@ class OpenRouterAPI:
             temperature (float, optional): 温度参数，控制生成的随机性
             max_tokens (int, optional): 最大生成的token数，默认为4000
             routes_params (dict, optional): 路由参数，用于处理数据隐私策略
+            deadline (Deadline, optional): 处理期限，到期后返回包含error的结果
             **extra_params: 额外的API参数
         
         Returns:
@@ -264,16 +313,16 @@ class OpenRouterAPI:
 请分析这份考研英语真题文档，并提取以下信息：
 1. 基本信息（年份、考试类型）
 2. 各部分题型的原文
-3. 各题目的编号、题干、选项、答案及干扰选项
-4. 完形填空和特定新题型的还原后原文
+3. 各题目的编号、题干、选项及正确选项的字母
 
 # 重要说明
 - 必须返回所有52道题目的完整数据！每份考研卷都有固定的52道题，即使原文中有些题目不明显，也请确保返回完整的52道题目。
 - "原文"是指该题对应题型板块的试卷上的完整原文内容，不是单个题目的句子。
 - 每个题型板块的原文只需在sections部分提取一次，questions部分不应包含重复的原文。
-- 完形填空题尤其重要：必须在sections.cloze中提供一份完整的原文（包含所有[1], [2]等标记），questions部分的完形填空题不要包含重复的original_text或restored_text。
+- 完形填空题尤其重要：必须在sections.cloze中提供一份完整的原文（包含所有[1], [2]等标记），questions部分的完形填空题不要包含重复的original_text。
 - 对于阅读理解、完形填空等所有题型，原文只在sections部分出现一次，所有相同题型的题目共享同一个原文。
-- "试卷答案"字段应该包含标准答案汇总，如"1.A 2.B 3.C"；而questions部分的"correct_answer"字段则应包含完整的选项内容，如"A. Without"。
+- 不需要提供还原后的原文（已将答案填入的版本），还原版本会根据选项和答案在本地生成。
+- 完形填空、阅读和新题型不需要提供答案汇总，选择题答案会从文档的参考答案中在本地解析；questions部分的"answer"字段只填写正确选项的字母，如"A"，正确答案和干扰选项会根据选项在本地生成。
 
 # 题目编号和题型映射
 - 题号1-20：完形填空 (Cloze)
@@ -297,32 +346,24 @@ class OpenRouterAPI:
   },
   "sections": {
     "cloze": {
-      "original_text": "完形填空原文（卷面版本，包含[1], [2]等标记，包含整篇文章）",
-      "restored_text": "完形填空原文（还原后版本，已将答案填入）",
-      "answers_summary": "完形填空答案汇总，如'1.D 2.C 3.B...'"
+      "original_text": "完形填空原文（卷面版本，包含[1], [2]等标记，包含整篇文章）"
     },
     "reading": {
       "text_1": {
-        "original_text": "阅读Text 1原文（整篇文章）",
-        "answers_summary": "阅读Text 1答案汇总，如'21.D 22.D 23.A...'"
+        "original_text": "阅读Text 1原文（整篇文章）"
       },
       "text_2": {
-        "original_text": "阅读Text 2原文（整篇文章）",
-        "answers_summary": "阅读Text 2答案汇总"
+        "original_text": "阅读Text 2原文（整篇文章）"
       },
       "text_3": {
-        "original_text": "阅读Text 3原文（整篇文章）",
-        "answers_summary": "阅读Text 3答案汇总"
+        "original_text": "阅读Text 3原文（整篇文章）"
       },
       "text_4": {
-        "original_text": "阅读Text 4原文（整篇文章）",
-        "answers_summary": "阅读Text 4答案汇总"
+        "original_text": "阅读Text 4原文（整篇文章）"
       }
     },
     "new_type": {
-      "original_text": "新题型原文（完整文章）",
-      "restored_text": "新题型还原后原文（如果有的话，否则与原文相同）",
-      "answers_summary": "新题型答案汇总"
+      "original_text": "新题型原文（完整文章）"
     },
     "translation": {
       "original_text": "翻译题原文（完整段落）",
@@ -345,48 +386,42 @@ class OpenRouterAPI:
       "section_type": "完形填空",
       "stem": "题干（完形填空通常为空或'/'）",
       "options": "A. Without, B. Though, C. Despite, D. Besides",
-      "correct_answer": "A. Without",
-      "distractor_options": "B. Though, C. Despite, D. Besides"
+      "answer": "A"
     },
     {
       "number": 21,
       "section_type": "阅读理解 Text 1",
       "stem": "According to the passage, the study of music can be beneficial because it",
       "options": "A. helps students perform better in standardized tests, B. enriches students' emotional development, C. increases students' interest in mathematics, D. interferes with students' cognitive development",
-      "correct_answer": "B. enriches students' emotional development",
-      "distractor_options": "A. helps students perform better in standardized tests, C. increases students' interest in mathematics, D. interferes with students' cognitive development"
+      "answer": "B"
     },
     {
       "number": 26,
       "section_type": "阅读理解 Text 2",
       "stem": "The author mentions all of the following as possible reasons for the decline of bees EXCEPT",
       "options": "A. climate change, B. use of agricultural chemicals, C. viral infections, D. poor nutrition",
-      "correct_answer": "C. viral infections",
-      "distractor_options": "A. climate change, B. use of agricultural chemicals, D. poor nutrition"
+      "answer": "C"
     },
     {
       "number": 43,
       "section_type": "新题型",
       "stem": "According to the fourth paragraph, which of the following can be inferred about cultural exchanges?",
       "options": "A. They are universally beneficial to all parties involved, B. They can lead to both positive and negative outcomes, C. They primarily benefit economically developed nations, D. They have little impact on developing countries",
-      "correct_answer": "B. They can lead to both positive and negative outcomes",
-      "distractor_options": "A. They are universally beneficial to all parties involved, C. They primarily benefit economically developed nations, D. They have little impact on developing countries"
+      "answer": "B"
     },
     {
       "number": 47,
       "section_type": "翻译",
       "stem": "请将下列中文段落翻译成英文：随着中国经济的发展，越来越多的人认识到环境保护的重要性...",
       "options": null,
-      "correct_answer": null,
-      "distractor_options": null
+      "answer": null
     },
     {
       "number": 51,
       "section_type": "写作A",
       "stem": "Directions: Write an email of about 100 words in response to the following situation. You are organizing a student club meeting and need to change the venue...",
       "options": null,
-      "correct_answer": null,
-      "distractor_options": null
+      "answer": null
     }
     // 注意：实际返回结果必须包含所有52个题目（题号1-52），以上仅为每种题型的示例
   ]
@@ -398,8 +433,7 @@ class OpenRouterAPI:
 2. questions部分不要包含重复的原文，只包含题目的具体信息（题号、题干、选项等）
 3. 对于完形填空题，原文只在sections.cloze中出现一次，不要在每道题的数据中重复包含原文
 4. questions数组必须包含所有52道题目的完整数据（题号1-52），上述示例只展示了部分题型，实际返回必须包含全部题目
-5. 正确答案(correct_answer)必须包含选项字母及其完整文本，如"A. Without"，而不仅仅是字母"A"
-6. 干扰选项(distractor_options)也必须包含完整的选项内容，如"B. Though, C. Despite, D. Besides"，而不仅仅是"B, C, D"
+5. answer只填写正确选项的字母（如"A"），不要输出正确答案内容和干扰选项，它们会根据options在本地生成
 
 请提取完整的题型原文，确保"原文（卷面）"字段包含整篇文章或段落，而不仅仅是单个题目对应的句子。请务必返回所有52道题的完整数据，对于文档中不明确的题目，可以标记为[缺失数据]但必须保持题号的完整性。
 
@@ -427,6 +461,7 @@ class OpenRouterAPI:
                 max_retries=max_retries,
                 retry_delay=retry_delay,
                 routes_params=default_routes,
+                deadline=deadline,
                 **extra_params
             )
             
@@ -440,7 +475,8 @@ class OpenRouterAPI:
             # 尝试从文本中提取JSON
             try:
                 json_str = self._extract_json(content)
-                return json.loads(json_str)
+                # 选择题答案从文档的参考答案中在本地解析
+                return attach_answer_key(json.loads(json_str), document_text)
             except json.JSONDecodeError as e:
                 logger.error(f"JSON解析失败: {str(e)}")
                 return {"error": "JSON解析失败", "raw_response": content}
@@ -449,24 +485,30 @@ class OpenRouterAPI:
             logger.exception(f"提取结构化数据时出错: {str(e)}")
             return {"error": str(e)}
             
-    def get_available_models(self):
+    def get_available_models(self, force_refresh=False):
         """
         获取OpenRouter可用模型列表。
         
+        模型列表带TTL缓存，缓存有效时不产生网络请求。
+        
+        Args:
+            force_refresh (bool): 是否忽略缓存强制重新获取
+            
         Returns:
             dict: 包含可用模型的响应
         """
+        from .model_catalog import get_model_catalog, ModelCatalog
+        
+        if self.models_api_endpoint == OPENROUTER_MODELS_API_URL:
+            catalog = get_model_catalog()
+        else:
+            # 自定义的模型列表地址使用独立的目录实例，避免污染共享缓存
+            catalog = ModelCatalog(cache_path=None, models_api_url=self.models_api_endpoint, api_key=self.api_key)
+        
         try:
-            response = requests.get(
-                self.models_api_endpoint,
-                headers={"Authorization": f"Bearer {self.api_key}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"获取模型列表失败，状态码: {response.status_code}")
-                return {"error": response.json()}
+            if catalog.load(force_refresh=force_refresh):
+                return {"data": catalog.models()}
+            return {"error": "无法获取模型列表"}
                 
         except Exception as e:
             logger.exception(f"获取模型列表时出错: {str(e)}")
@@ -11,27 +11,39 @@ import json
 import time
 import logging
 import re
-import requests
-from dotenv import load_dotenv
-from src.model_config import get_model, get_model_max_tokens
+from src.model_config import get_model, get_model_max_tokens, get_model_stats
+from src.token_estimator import get_token_estimator
+from src.circuit_breaker import get_breaker, is_model_failure, select_model
+from src.deadline import DeadlineExceeded, request_timeout
+from src.response_cache import get_response_cache, get_single_flight, request_key
+from src.partial_json import parse_partial_json, last_question_number, merge_continuation
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("openrouter_handler")
 
-# 加载环境变量
-load_dotenv()
+# 提取请求的系统提示词
+SYSTEM_PROMPT = "你是一个专业的考研英语真题内容提取助手，擅长将考研英语真题文档解析为结构化的JSON数据。"
+
+class RequestCancelled(Exception):
+    """请求已被调用方取消（例如对冲请求中落败的一方）"""
+    pass
 
 class OpenRouterHandler:
     """OpenRouter API处理器，负责发送请求和获取响应"""
     
-    def __init__(self, model=None, api_key=None):
+    # 输出因长度限制被截断时，最多发送的续写请求次数
+    MAX_CONTINUATIONS = 2
+    
+    def __init__(self, model=None, api_key=None, stats=None, session=None):
         """
         初始化OpenRouter API处理器
         
         Args:
             model: 模型名称，如果为None则使用环境变量或默认模型
             api_key: API密钥，如果为None则使用环境变量
+            stats: 模型调用统计（ModelStatsStore），为None时使用进程内共享实例
+            session: 可选的共享requests.Session，长期运行的进程可复用连接
         """
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
@@ -41,6 +53,10 @@ class OpenRouterHandler:
         self.model = model or get_model()
         logger.info(f"使用模型: {self.model}")
         
+        # 调用统计
+        self.stats = stats or get_model_stats()
+        self.session = session
+        
         # API请求URL和头信息
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
         self.headers = {
@@ -51,7 +67,8 @@ class OpenRouterHandler:
             "X-Title": "CET-Extractor"
         }
     
-    def get_structured_data(self, prompt, max_tokens=4096, temperature=0.1, output_dir="test_results"):
+    def get_structured_data(self, prompt, max_tokens=4096, temperature=0.1, output_dir="test_results",
+                            session=None, cancel_event=None, model=None, deadline=None):
         """
         获取结构化数据
         
@@ -60,17 +77,30 @@ class OpenRouterHandler:
             max_tokens: 最大生成token数
             temperature: 生成温度，越低越确定性
             output_dir: 输出目录，用于保存调试信息
+            session: 可选的requests.Session，调用方可通过关闭会话释放连接
+            cancel_event: 可选的threading.Event，被设置后请求结果将被丢弃
+            model: 本次请求使用的模型，为None时使用初始化时指定的模型
+            deadline: 可选的文档处理期限（Deadline），读取超时不超过剩余时间
         
         Returns:
             dict: 解析后的结构化数据
+        
+        Raises:
+            RequestCancelled: cancel_event在请求发出前或响应返回后被设置
+            DeadlineExceeded: 期限在请求发出前或等待响应时到达
         """
-        logger.info(f"发送API请求获取结构化数据，模型: {self.model}，最大tokens: {max_tokens}")
+        # requests导入较慢，仅在实际发送请求时导入
+        import requests
+        
+        # 模型已熔断时改用备用模型
+        model = select_model(model or self.model)
+        logger.info(f"发送API请求获取结构化数据，模型: {model}，最大tokens: {max_tokens}")
         
         # 构建请求数据
         data = {
-            "model": self.model,
+            "model": model,
             "messages": [
-                {"role": "system", "content": "你是一个专业的考研英语真题内容提取助手，擅长将考研英语真题文档解析为结构化的JSON数据。"},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             "max_tokens": max_tokens,
@@ -79,23 +109,22 @@ class OpenRouterHandler:
         }
         
         # 发送请求
+        http = session if session is not None else (self.session or requests)
         try:
-            response = requests.post(self.api_url, headers=self.headers, json=data)
-            response.raise_for_status()
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelled(f"请求已取消，模型: {model}")
             
-            # 解析响应
-            response_data = response.json()
+            content, finish_reason = self._send(http, data, model, cancel_event, deadline)
             
-            if "choices" in response_data and len(response_data["choices"]) > 0:
-                # 提取回答内容
-                content = response_data["choices"][0]["message"]["content"]
-                
+            if content is not None:
                 # 为调试目的保存原始内容到指定目录
-                debug_dir = os.path.join(output_dir, "debug")
-                os.makedirs(debug_dir, exist_ok=True)
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                with open(os.path.join(debug_dir, f"raw_response_{timestamp}.txt"), "w", encoding="utf-8") as f:
-                    f.write(content)
+                self._save_raw_response(content, output_dir)
+                
+                # 输出达到max_tokens被截断：恢复完整的前缀，只请求剩余的内容
+                if finish_reason == "length":
+                    result = self._recover_truncated(prompt, content, data, http, cancel_event, output_dir, deadline)
+                    if result is not None:
+                        return result
                 
                 # 解析JSON
                 try:
@@ -107,8 +136,9 @@ class OpenRouterHandler:
                     result["raw_response"] = content
                     
                     # 添加模型信息
-                    result["model"] = self.model
+                    result["model"] = model
                     
+                    self._cache_response(data, content, finish_reason)
                     return result
                 except json.JSONDecodeError:
                     # 尝试从内容中提取JSON部分
@@ -123,9 +153,10 @@ class OpenRouterHandler:
                             result["raw_response"] = content
                             
                             # 添加模型信息
-                            result["model"] = self.model
+                            result["model"] = model
                             
                             logger.info("从内容中提取JSON部分成功")
+                            self._cache_response(data, content, finish_reason)
                             return result
                         except json.JSONDecodeError:
                             logger.warning("提取的JSON部分仍然无法解析，尝试修复格式")
@@ -137,15 +168,16 @@ class OpenRouterHandler:
                                 result["raw_response"] = content
                                 
                                 # 添加模型信息
-                                result["model"] = self.model
+                                result["model"] = model
                                 
                                 logger.info("成功修复并解析JSON")
+                                self._cache_response(data, content, finish_reason)
                                 return result
                             else:
                                 # 最后尝试构建一个简单的JSON格式
                                 logger.warning("无法修复JSON，创建空结构")
                                 result = {
-                                    "model": self.model,
+                                    "model": model,
                                     "raw_response": content,
                                     "metadata": {
                                         "year": "2024",
@@ -159,7 +191,7 @@ class OpenRouterHandler:
                         # 如果无法提取JSON，创建一个基本结构
                         logger.warning("无法从响应中提取JSON，创建基本结构")
                         result = {
-                            "model": self.model,
+                            "model": model,
                             "raw_response": content,
                             "metadata": {
                                 "year": "2024",
@@ -177,6 +209,239 @@ class OpenRouterHandler:
             logger.error(f"API请求失败: {str(e)}")
             raise
     
+    def _send(self, http, data, model, cancel_event=None, deadline=None):
+        """
+        发送一次请求：启用持久化缓存时优先读取缓存；相同的请求正在进行时共享其结果。
+        响应在解析成功后才由调用方写入缓存（见_cache_response）
+        
+        Args:
+            http: requests模块或Session
+            data: 请求数据
+            model: 模型名称
+            cancel_event: 可选的threading.Event，被设置后丢弃结果
+            deadline: 可选的文档处理期限（Deadline）
+        
+        Returns:
+            tuple: (回答内容, finish_reason)，响应中没有选择项时回答内容为None
+        
+        Raises:
+            RequestCancelled: cancel_event在响应返回后被设置
+            DeadlineExceeded: 期限在请求发出前或等待响应时到达
+        """
+        key = request_key(data)
+        cache = get_response_cache()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"使用缓存的响应，模型: {model}（{key[:12]}）")
+                get_breaker(model).release()
+                return cached
+        
+        while True:
+            try:
+                (content, finish_reason), _ = get_single_flight().do(
+                    key, lambda: self._post(http, data, model, cancel_event, deadline), deadline)
+                break
+            except (RequestCancelled, DeadlineExceeded):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+                if deadline is not None and deadline.expired():
+                    raise
+                # 共享的请求被其发起方取消（落败的对冲请求）或超过了发起方文档的期限，
+                # 本次调用仍然有效，重新发送或等待新的请求
+                logger.info(f"共享的请求已被其发起方取消，重新发送，模型: {model}")
+        
+        # 落败的对冲请求不再解析和保存响应
+        if cancel_event is not None and cancel_event.is_set():
+            raise RequestCancelled(f"请求已取消，模型: {model}")
+        return content, finish_reason
+    
+    def _cache_response(self, data, content, finish_reason):
+        """
+        回答内容已成功解析后写入持久化响应缓存（未启用缓存时不做任何事）
+        
+        Args:
+            data: 请求数据
+            content: 回答内容
+            finish_reason: 结束原因
+        """
+        cache = get_response_cache()
+        if cache is not None:
+            cache.put(request_key(data), data["model"], content, finish_reason)
+    
+    def _post(self, http, data, model, cancel_event=None, deadline=None):
+        """
+        发送一次请求并记录调用统计和熔断状态
+        
+        Args:
+            http: requests模块或Session
+            data: 请求数据
+            model: 模型名称
+            cancel_event: 可选的threading.Event，请求失败时已被设置则视为取消
+            deadline: 可选的文档处理期限（Deadline）
+        
+        Returns:
+            tuple: (回答内容, finish_reason)，响应中没有选择项时回答内容为None
+        
+        Raises:
+            RequestCancelled: 会话被调用方关闭导致请求失败
+            DeadlineExceeded: 期限在请求发出前或等待响应时到达
+        """
+        import requests
+        
+        breaker = get_breaker(model)
+        try:
+            timeout = request_timeout(deadline)
+        except DeadlineExceeded:
+            breaker.release()
+            raise
+        request_start = time.time()
+        try:
+            response = http.post(self.api_url, headers=self.headers, json=data, timeout=timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if cancel_event is not None and cancel_event.is_set():
+                # 会话被对冲的胜出方关闭，不计入统计和熔断
+                breaker.release()
+                raise RequestCancelled(f"请求已取消，模型: {model}") from e
+            self.stats.record_call(model, time.time() - request_start, False)
+            if isinstance(e, requests.exceptions.Timeout) and deadline is not None and deadline.expired():
+                # 读取超时被期限截短，不能说明模型不可用
+                breaker.release()
+                raise DeadlineExceeded(f"等待模型 {model} 响应时超过文档处理期限（{deadline.seconds:g}秒）") from e
+            if is_model_failure(e):
+                breaker.record_failure(e)
+            else:
+                breaker.release()
+            raise
+        
+        # 解析响应
+        response_data = response.json()
+        
+        # 记录调用统计（延迟、token用量），供模型路由和对冲策略使用；
+        # 同时记录未校准的估计值，用于校准离线token估计
+        usage = response_data.get("usage") or {}
+        self.stats.record_call(
+            model,
+            time.time() - request_start,
+            bool(response_data.get("choices")),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            estimated_prompt_tokens=get_token_estimator().estimate_messages(
+                data["messages"], model, calibrated=False)
+        )
+        
+        if "choices" in response_data and len(response_data["choices"]) > 0:
+            breaker.record_success()
+            choice = response_data["choices"][0]
+            return choice["message"]["content"], choice.get("finish_reason")
+        breaker.record_failure()
+        return None, None
+    
+    def _save_raw_response(self, content, output_dir):
+        """将原始回答内容保存到输出目录的debug子目录"""
+        debug_dir = os.path.join(output_dir, "debug")
+        os.makedirs(debug_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        with open(os.path.join(debug_dir, f"raw_response_{timestamp}.txt"), "w", encoding="utf-8") as f:
+            f.write(content)
+    
+    def _continuation_prompt(self, prompt, partial):
+        """
+        创建续写提示词：原提示词加上已完成内容的说明，要求只输出剩余部分
+        
+        Args:
+            prompt: 原提示词
+            partial: 已恢复的结果
+        
+        Returns:
+            str: 续写提示词
+        """
+        done = []
+        if partial.get("metadata"):
+            done.append("metadata")
+        sections = partial.get("sections") or {}
+        if sections:
+            # 板块中只输出了部分子项（如reading的text_1、text_2）时列出已完成的子项
+            names = []
+            for key, value in sections.items():
+                parts = [part for part, item in value.items() if isinstance(item, dict)] if isinstance(value, dict) else []
+                names.append(f"{key}（{'、'.join(parts)}）" if parts else key)
+            done.append("sections中的" + "、".join(names))
+        last_number = last_question_number(partial)
+        if last_number:
+            done.append(f"题目{last_number}及之前的题目")
+        
+        return f"""{prompt}
+
+# 续写说明
+上一次回答因长度限制被截断，以下内容已经完整输出：{"；".join(done) or "无"}。
+请不要重复这些内容，只输出剩余的部分，JSON结构与上面的输出格式相同：
+1. sections中只输出尚未完整输出的部分（已输出的板块不要再输出）
+2. questions中只输出题号大于{last_number}的题目
+"""
+    
+    def _recover_truncated(self, prompt, content, data, http, cancel_event=None, output_dir="test_results",
+                           deadline=None):
+        """
+        从被截断的输出中恢复完整的前缀，并发送续写请求获取剩余内容
+        
+        Args:
+            prompt: 原提示词
+            content: 被截断的回答内容
+            data: 原请求数据
+            http: requests模块或Session
+            cancel_event: 可选的threading.Event
+            output_dir: 输出目录，用于保存调试信息
+            deadline: 可选的文档处理期限（Deadline），到期后不再续写，返回已恢复的部分
+        
+        Returns:
+            dict: 合并后的结果，无法从截断的输出中恢复任何内容时返回None
+        """
+        model = data["model"]
+        result = parse_partial_json(content)
+        if not result:
+            logger.warning("输出因长度限制被截断，且无法恢复完整的前缀")
+            return None
+        logger.warning(f"输出因长度限制被截断，已恢复至题目{last_question_number(result)}，发送续写请求")
+        self._cache_response(data, content, "length")
+        
+        raw_responses = [content]
+        for attempt in range(1, self.MAX_CONTINUATIONS + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelled(f"请求已取消，模型: {model}")
+            if deadline is not None and deadline.expired():
+                logger.warning("已超过文档处理期限，不再续写，返回已恢复的部分")
+                break
+            
+            continuation_data = dict(data, messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self._continuation_prompt(prompt, result)}
+            ])
+            try:
+                continuation, finish_reason = self._send(http, continuation_data, model, cancel_event, deadline)
+            except DeadlineExceeded as e:
+                logger.warning(f"{str(e)}，返回已恢复的部分")
+                break
+            if continuation is None:
+                break
+            self._save_raw_response(continuation, output_dir)
+            raw_responses.append(continuation)
+            
+            parsed = parse_partial_json(continuation)
+            if parsed:
+                self._cache_response(continuation_data, continuation, finish_reason)
+            merge_continuation(result, parsed)
+            logger.info(f"第{attempt}次续写完成，已提取至题目{last_question_number(result)}")
+            if finish_reason != "length":
+                break
+        else:
+            logger.warning(f"续写{self.MAX_CONTINUATIONS}次后输出仍被截断，返回已恢复的部分")
+        
+        result["raw_response"] = "\n".join(raw_responses)
+        result["model"] = model
+        return result
+    
     def _extract_json_from_text(self, text):
         """
         从文本中提取JSON部分
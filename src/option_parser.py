@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+选项解析模块，将题目的选项文本解析为 字母 -> 选项内容 的映射，并根据答案字母
+在本地生成"正确答案"和"干扰选项"（模型只需输出选项和答案字母）。
+
+支持提取结果中常见的选项写法："A. Through, B. Despite"、"A.revealing | B.demanding"、
+"[A]keeping them...\n[B]..."以及模型有时输出的"A]..."，选项之间可以用逗号、竖线、
+分号或换行分隔。
+"""
+
+import re
+
+# 选项字母（新题型最多到G）
+OPTION_LETTERS = "ABCDEFG"
+
+# 每个字母的选项标记：位于开头或分隔符之后，如"A."、"[A]"、"A]"、"A、"
+_OPTION_MARKERS = {
+    letter: re.compile(r"(?:^|(?<=[\s,，;；|]))\[?" + letter + r"\s*[\].．、)）]\s*")
+    for letter in OPTION_LETTERS
+}
+
+# 选项之间的分隔符
+_SEPARATORS = " \t\r\n,，;；|"
+
+# 答案中的选项字母，如"D"、"D.Without"、"[D]"、"D]hiding..."
+_ANSWER_LETTER = re.compile(r"^\s*\[?([A-G])(?:\s*[\].．、)）]|\s|$)")
+
+
+def option_items(options_text):
+    """
+    将选项文本拆分为选项列表
+
+    选项标记按A、B、C...的顺序依次查找，选项内容中出现的"B."等文字不会被误认为标记。
+
+    Args:
+        options_text (str): 选项文本
+
+    Returns:
+        list: (字母, 标记, 选项内容)元组列表，如("A", "[A]", "keeping them from rusting.")，
+        无法解析时返回空列表
+    """
+    if not options_text or not isinstance(options_text, str):
+        return []
+
+    markers = []
+    position = 0
+    for letter in OPTION_LETTERS:
+        match = _OPTION_MARKERS[letter].search(options_text, position)
+        if match is None:
+            break
+        markers.append(match)
+        position = match.end()
+
+    items = []
+    for index, match in enumerate(markers):
+        content_end = markers[index + 1].start() if index + 1 < len(markers) else len(options_text)
+        content = options_text[match.end():content_end].strip(_SEPARATORS)
+        items.append((OPTION_LETTERS[index], match.group(0), content))
+    return items
+
+
+def parse_options(options_text):
+    """
+    将选项文本解析为 字母 -> 选项内容 的映射
+
+    Args:
+        options_text (str): 选项文本
+
+    Returns:
+        dict: 字母到选项内容的映射（按字母顺序），无法解析时返回空字典
+    """
+    return {letter: content for letter, _, content in option_items(options_text)}
+
+
+def answer_fields(options_text, letter):
+    """
+    根据选项文本和答案字母生成"正确答案"和"干扰选项"
+
+    正确答案使用"D]选项内容"（方括号选项）或"D.选项内容"（与选项的写法一致）格式，
+    干扰选项保留各选项的原始标记，按选项文本原来的分隔方式（换行、竖线或逗号）连接。
+    选项内容中排版留下的连续空白合并为一个空格。
+
+    Args:
+        options_text (str): 选项文本
+        letter (str): 答案字母
+
+    Returns:
+        tuple: (正确答案, 干扰选项)，选项无法解析或答案字母不在选项中时返回None
+    """
+    items = option_items(options_text)
+    if not letter or letter not in {item[0] for item in items}:
+        return None
+
+    if "\n" in options_text.strip():
+        separator = "\n"
+    elif "|" in options_text:
+        separator = " | "
+    else:
+        separator = ", "
+
+    correct_answer = ""
+    distractors = []
+    for item_letter, marker, content in items:
+        content = " ".join(content.split())
+        if item_letter == letter:
+            if "[" in marker or "]" in marker:
+                correct_answer = f"{letter}]{content}"
+            else:
+                correct_answer = f"{marker}{content}"
+        else:
+            distractors.append(f"{marker}{content}")
+    return correct_answer, separator.join(distractors)
+
+
+def answer_letter(answer):
+    """
+    从答案中提取选项字母
+
+    Args:
+        answer (str): 答案，如"D"、"D.Without"、"[D]"、"D]hiding them from the locals."
+
+    Returns:
+        str: 选项字母，无法识别时返回空字符串
+    """
+    if not answer or not isinstance(answer, str):
+        return ""
+    match = _ANSWER_LETTER.match(answer)
+    return match.group(1) if match else ""
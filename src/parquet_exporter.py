@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Parquet导出模块，将组织后的题目数据写入按年份/考试类型分区的Parquet数据集。
+
+与CSVGenerator使用相同的列顺序。重复度很高的原文列使用字典编码，
+每篇原文在每个数据文件中只保存一次；读取单列时无需解析整份CSV。
+依赖pyarrow（可选依赖，仅在使用本模块时需要）。
+"""
+
+import os
+import sys
+import csv
+import glob
+import logging
+import argparse
+
+from src.csv_generator import CSVGenerator
+
+logger = logging.getLogger("考研英语真题处理.parquet_exporter")
+
+# 分区列（目录结构: <dataset>/年份=2024/考试类型=英语一/part-*.parquet）
+PARTITION_COLUMNS = ["年份", "考试类型"]
+
+# 使用字典编码的列：同一篇原文会在多道题目中重复出现
+DICTIONARY_COLUMNS = [
+    "题型",
+    "原文（卷面）",
+    "试卷答案",
+    "原文（还原后）",
+    "原文（句子拆解后）"
+]
+
+
+def _require_pyarrow():
+    """导入pyarrow，未安装时给出明确的提示"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.dataset
+    except ImportError as e:
+        raise ImportError("Parquet导出需要安装pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+class ParquetExporter:
+    """
+    Parquet导出器，用于将结构化数据写入分区的Parquet数据集。
+    """
+
+    def __init__(self, column_order=None):
+        """
+        初始化Parquet导出器。
+
+        Args:
+            column_order (list, optional): 列顺序，默认与CSVGenerator一致
+        """
+        self.column_order = column_order or CSVGenerator().column_order
+
+    def _schema(self):
+        """构建数据集的表结构，所有列均按文本保存，与CSV保持一致"""
+        pa = _require_pyarrow()
+        fields = []
+        for column in self.column_order:
+            if column in DICTIONARY_COLUMNS:
+                fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(column, pa.string()))
+        return pa.schema(fields)
+
+    def to_table(self, data):
+        """
+        将数据行转换为Arrow表。
+
+        Args:
+            data (iterable): 结构化数据（字典）的可迭代对象
+
+        Returns:
+            pyarrow.Table: 按column_order排列的表
+        """
+        pa = _require_pyarrow()
+        columns = {column: [] for column in self.column_order}
+        for item in data:
+            for column in self.column_order:
+                value = item.get(column, "")
+                columns[column].append("" if value is None else str(value))
+
+        schema = self._schema()
+        arrays = []
+        for field in schema:
+            array = pa.array(columns[field.name], type=pa.string())
+            if pa.types.is_dictionary(field.type):
+                array = array.dictionary_encode()
+            arrays.append(array)
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def export(self, data, dataset_dir, append=True):
+        """
+        将数据写入Parquet数据集。
+
+        追加模式下，只替换本次写入涉及的年份/考试类型分区，其余分区保持不变；
+        因此重复处理同一份试卷不会产生重复数据。
+
+        Args:
+            data (iterable): 结构化数据（字典）的可迭代对象
+            dataset_dir (str): 数据集目录
+            append (bool): 是否追加到已有数据集，为False时清空数据集后重新写入
+
+        Returns:
+            bool: 是否成功写入
+        """
+        logger.info(f"开始导出Parquet数据集: {dataset_dir}")
+
+        try:
+            _require_pyarrow()
+            import pyarrow.parquet as pq
+
+            table = self.to_table(data)
+            if table.num_rows == 0:
+                logger.warning("没有可导出的数据")
+                return False
+
+            if not append and os.path.isdir(dataset_dir):
+                import shutil
+                shutil.rmtree(dataset_dir)
+
+            pq.write_to_dataset(
+                table,
+                root_path=dataset_dir,
+                partition_cols=PARTITION_COLUMNS,
+                existing_data_behavior="delete_matching",
+                use_dictionary=DICTIONARY_COLUMNS,
+                compression="zstd"
+            )
+
+            logger.info(f"成功导出Parquet数据集，包含 {table.num_rows} 条记录")
+            return True
+
+        except Exception as e:
+            logger.error(f"导出Parquet数据集失败: {str(e)}")
+            return False
+
+    def export_csv_files(self, csv_paths, dataset_dir, append=True):
+        """
+        将已生成的CSV文件导入Parquet数据集，用于迁移历史结果。
+
+        Args:
+            csv_paths (list): CSV文件路径列表
+            dataset_dir (str): 数据集目录
+            append (bool): 是否追加到已有数据集
+
+        Returns:
+            int: 成功导入的CSV文件数
+        """
+        exported = 0
+        for i, csv_path in enumerate(csv_paths):
+            with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.DictReader(f))
+            # 只在第一个文件时按需清空数据集
+            if self.export(rows, dataset_dir, append=append or i > 0):
+                exported += 1
+        return exported
+
+
+def read_column(dataset_dir, column, filters=None):
+    """
+    从数据集中读取单列。
+
+    Args:
+        dataset_dir (str): 数据集目录
+        column (str): 列名（包括分区列年份、考试类型）
+        filters (optional): pyarrow过滤表达式，如 pyarrow.dataset.field("年份") == "2024"
+
+    Returns:
+        pyarrow.ChunkedArray: 列数据
+    """
+    pa = _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    # 分区列按文本解析，与CSV中的年份、考试类型保持一致
+    partitioning = ds.partitioning(
+        pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]), flavor="hive"
+    )
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning=partitioning)
+    return dataset.to_table(columns=[column], filter=filters).column(column)
+
+
+def main():
+    """命令行入口：将已有的CSV结果导入Parquet数据集"""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="将考研英语真题CSV结果导出为Parquet数据集")
+    parser.add_argument('input_dir', help="CSV结果目录，例如test_results")
+    parser.add_argument('--output', '-o', default="test_results/corpus.parquet", help="Parquet数据集目录")
+    parser.add_argument('--pattern', default="*/*.csv", help="CSV文件匹配模式（相对于输入目录）")
+    parser.add_argument('--overwrite', action='store_true', help="清空已有数据集后重新导出")
+
+    args = parser.parse_args()
+
+    csv_paths = sorted(glob.glob(os.path.join(args.input_dir, args.pattern)))
+    if not csv_paths:
+        logger.error(f"未找到CSV文件: {os.path.join(args.input_dir, args.pattern)}")
+        return 1
+
+    exporter = ParquetExporter()
+    exported = exporter.export_csv_files(csv_paths, args.output, append=not args.overwrite)
+    logger.info(f"已导出 {exported}/{len(csv_paths)} 个CSV文件到 {args.output}")
+    return 0 if exported else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+截断JSON解析模块，从因长度限制被截断的模型输出中恢复完整的前缀。
+
+逐字符扫描JSON文本，记录每个对象或数组结束的位置作为可截断点，在最后一个可截断点处截断，
+并补全尚未闭合的括号。数组中的对象（如questions中的题目）视为不可分割的整体：
+写到一半的题目会被整体丢弃，而不会以缺少选项或答案的形式保留下来。
+"""
+
+import json
+import logging
+
+logger = logging.getLogger("考研英语真题处理.partial_json")
+
+_CLOSING = {"{": "}", "[": "]"}
+
+
+def _complete_prefix(text):
+    """
+    找到文本中最后一个可截断点
+
+    Args:
+        text (str): 从第一个"{"开始的JSON文本
+
+    Returns:
+        tuple: (截断位置, 截断处需要补全的右括号)，没有可截断点时返回None
+    """
+    # 栈中的每一项为(左括号, 是否为数组元素)
+    stack = []
+    in_string = False
+    escaped = False
+    cut = None
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSING:
+            stack.append((char, bool(stack) and stack[-1][0] == "["))
+        elif char in "}]":
+            if not stack or _CLOSING[stack[-1][0]] != char:
+                # 括号不匹配，之后的内容无法可靠解析
+                break
+            stack.pop()
+            if not stack:
+                return index + 1, ""
+            # 仍在某个数组元素内部时，该元素不完整，不能在这里截断
+            if not any(is_element for _, is_element in stack):
+                cut = (index + 1, "".join(_CLOSING[opening] for opening, _ in reversed(stack)))
+    return cut
+
+
+def parse_partial_json(text):
+    """
+    解析可能被截断的JSON对象，返回其中完整的部分
+
+    Args:
+        text (str): 模型输出的文本（可以带有```json代码块标记或前后说明文字）
+
+    Returns:
+        dict: 恢复出的对象，没有可恢复的内容时返回None
+    """
+    if not text:
+        return None
+    start = text.find("{")
+    if start == -1:
+        return None
+    text = text[start:]
+
+    prefix = _complete_prefix(text)
+    if prefix is None:
+        return None
+    end, closing = prefix
+    # 截断点之后可能残留逗号，补全括号前去掉
+    repaired = text[:end].rstrip().rstrip(",") + closing
+    try:
+        result = json.loads(repaired)
+    except json.JSONDecodeError as e:
+        logger.debug(f"截断JSON修复后仍无法解析: {str(e)}")
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def last_question_number(result):
+    """
+    返回结果中最后一道完整题目的题号
+
+    Args:
+        result (dict): 提取结果
+
+    Returns:
+        int: 最大的题号，没有题目时返回0
+    """
+    numbers = [q.get("number") for q in (result or {}).get("questions") or [] if isinstance(q, dict)]
+    numbers = [number for number in numbers if isinstance(number, int)]
+    return max(numbers) if numbers else 0
+
+
+def merge_continuation(result, continuation):
+    """
+    将续写请求的结果合并到已恢复的结果中
+
+    sections按板块逐层合并（已有的内容不被覆盖），questions只追加题号更大的题目。
+
+    Args:
+        result (dict): 已恢复的结果（就地修改）
+        continuation (dict): 续写请求的结果
+
+    Returns:
+        dict: 合并后的结果
+    """
+    if not isinstance(continuation, dict):
+        return result
+
+    def merge(target, source):
+        for key, value in source.items():
+            if isinstance(target.get(key), dict) and isinstance(value, dict):
+                merge(target[key], value)
+            elif not target.get(key):
+                target[key] = value
+
+    if not result.get("metadata") and isinstance(continuation.get("metadata"), dict):
+        result["metadata"] = continuation["metadata"]
+    if isinstance(continuation.get("sections"), dict):
+        merge(result.setdefault("sections", {}), continuation["sections"])
+
+    last_number = last_question_number(result)
+    new_questions = [q for q in continuation.get("questions") or []
+                     if isinstance(q, dict) and isinstance(q.get("number"), int) and q["number"] > last_number]
+    if new_questions:
+        result.setdefault("questions", []).extend(new_questions)
+    return result
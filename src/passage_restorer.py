@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+原文还原模块，在本地根据选项和答案生成"原文（还原后）"。
+
+完形填空把原文中的[1]、[2]等空格标记替换为正确选项；新题型有空格标记时同样填入
+正确选项，没有空格时（如2024年的观点匹配题）删除题号/人名标记行和题号范围。
+两者都会删除卷面的页眉页脚（如"英语(一)试题.11. (共14页)"）。
+"""
+
+import re
+import logging
+
+logger = logging.getLogger("考研英语真题处理.passage_restorer")
+
+# 空格标记：[1]、[ 1 ]、__1__
+_BLANK = re.compile(r"\[\s*(\d{1,2})\s*\]|_{2,}\s*(\d{1,2})\s*_{2,}")
+
+# 页眉页脚行，如"英语(一)试题.11. (共14页)"
+_PAGE_LINE = re.compile(r"^[^\n]*[(（]\s*共\s*\d+\s*页\s*[)）][ \t]*(?:\n|$)", re.MULTILINE)
+
+# 题号范围，如" (41-45)"
+_NUMBER_RANGE = re.compile(r"[ \t]*[(（]\s*(\d{1,2})\s*[-–—~－]\s*(\d{1,2})\s*[)）]")
+
+# 行首的题号标记及其后的内容，如"(41) Hannah"、"41. "、"[41]"
+_LINE_MARKER = re.compile(r"^[ \t]*(?:[(（\[][ \t]*(\d{1,2})[ \t]*[)）\]]|(\d{1,2})[.．])[ \t]*([^\n]*)(?:\n|$)", re.MULTILINE)
+
+# 题号标记后的短标签（人名或标题）最多包含的单词数
+_LABEL_MAX_WORDS = 4
+
+
+def _fill_blanks(text, fills, first, last):
+    """
+    将范围内的空格标记替换为填入内容
+
+    Returns:
+        tuple: (替换后的文本, 找到的题号集合, 缺少填入内容的题号列表)
+    """
+    found = set()
+    missing = []
+
+    def replace(match):
+        number = int(match.group(1) or match.group(2))
+        if not first <= number <= last:
+            return match.group(0)
+        found.add(number)
+        if number not in fills:
+            missing.append(number)
+            return match.group(0)
+        return fills[number]
+
+    return _BLANK.sub(replace, text), found, missing
+
+
+def _answer_fills(options, answers, first, last):
+    """根据选项和答案字母得到 题号 -> 正确选项内容（合并选项中排版留下的连续空白）"""
+    fills = {}
+    for number in range(first, last + 1):
+        letter = answers.get(number)
+        text = options.get(number, {}).get(letter) if letter else None
+        if text:
+            fills[number] = " ".join(text.split())
+    return fills
+
+
+def remove_page_lines(text):
+    """删除卷面的页眉页脚行和首尾空白"""
+    return _PAGE_LINE.sub("", text).strip()
+
+
+def restore_cloze(original_text, options, answers, first=1, last=20):
+    """
+    还原完形填空原文：把空格标记替换为正确选项
+
+    Args:
+        original_text (str): 原文（卷面），包含[1]、[2]等空格标记
+        options (dict): 题号 -> {字母: 选项内容}
+        answers (dict): 题号 -> 答案字母
+        first (int): 第一题题号
+        last (int): 最后一题题号
+
+    Returns:
+        str: 还原后的原文，没有找到空格标记或有空格无法填入时返回None
+    """
+    if not original_text:
+        return None
+
+    fills = _answer_fills(options, answers, first, last)
+    restored, found, missing = _fill_blanks(original_text, fills, first, last)
+    if not found:
+        logger.warning(f"完形填空原文中没有找到空格标记（{first}-{last}），无法在本地还原")
+        return None
+    if missing:
+        logger.warning(f"完形填空缺少答案或选项，无法在本地还原: {sorted(set(missing))}")
+        return None
+    return remove_page_lines(restored)
+
+
+def restore_new_type(original_text, options, answers, first=41, last=45):
+    """
+    还原新题型原文
+
+    原文中有空格标记时填入正确选项；否则删除题号范围和行首的题号标记，
+    标记后只是人名或标题（不超过4个单词）时整行删除。
+
+    Args:
+        original_text (str): 原文（卷面）
+        options (dict): 题号 -> {字母: 选项内容}
+        answers (dict): 题号 -> 答案字母
+        first (int): 第一题题号
+        last (int): 最后一题题号
+
+    Returns:
+        str: 还原后的原文，有空格无法填入时返回None
+    """
+    if not original_text:
+        return None
+
+    fills = _answer_fills(options, answers, first, last)
+    restored, found, missing = _fill_blanks(original_text, fills, first, last)
+    if missing:
+        logger.warning(f"新题型缺少答案或选项，无法在本地还原: {sorted(set(missing))}")
+        return None
+
+    if not found:
+        # 观点匹配、小标题等没有空格的题型：删除题号标记
+        def remove_range(match):
+            in_range = first <= int(match.group(1)) <= last and first <= int(match.group(2)) <= last
+            return "" if in_range else match.group(0)
+
+        def remove_marker(match):
+            if not first <= int(match.group(1) or match.group(2)) <= last:
+                return match.group(0)
+            content = match.group(3).strip()
+            if not content or (len(content.split()) <= _LABEL_MAX_WORDS and not content.endswith((".", "?", "!"))):
+                return ""
+            return match.group(3) + match.group(0)[len(match.group(0).rstrip("\n")):]
+
+        restored = _NUMBER_RANGE.sub(remove_range, restored)
+        restored = _LINE_MARKER.sub(remove_marker, restored)
+
+    return remove_page_lines(restored)
+
+
+def restore_section(section, original_text, options, answers):
+    """
+    按板块类型还原原文
+
+    Args:
+        section (ExamSection): 试卷结构中的板块
+        original_text (str): 原文（卷面）
+        options (dict): 题号 -> {字母: 选项内容}
+        answers (dict): 题号 -> 答案字母
+
+    Returns:
+        str: 还原后的原文，无法在本地还原时返回None
+    """
+    if section.section_key == "cloze":
+        return restore_cloze(original_text, options, answers, section.first, section.last)
+    if section.section_key == "new_type":
+        return restore_new_type(original_text, options, answers, section.first, section.last)
+    return None
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+原文存储模块，按内容哈希保存压缩后的原文。
+
+同一篇原文会出现在每一行数据、每个organized_data_*.json、每个
+extraction_result_*.json以及每次重跑（每个模型）的结果中。启用原文存储后，
+这些产物中的原文被替换为"@passage:<sha256>"形式的引用，原文本身只保存一次。
+"""
+
+import os
+import sys
+import json
+import zlib
+import glob
+import hashlib
+import logging
+import argparse
+import threading
+
+from src.question_record import QuestionRecord, to_rows
+
+logger = logging.getLogger("考研英语真题处理.passage_store")
+
+# 引用前缀
+REF_PREFIX = "@passage:"
+
+# 需要替换为引用的字段：提取结果中的各部分原文，以及组织后数据中的原文列
+PASSAGE_KEYS = (
+    "original_text",
+    "restored_text",
+    "原文（卷面）",
+    "原文（还原后）",
+    "原文（句子拆解后）"
+)
+
+# 短于此长度的文本不替换，引用本身约75个字符
+MIN_PASSAGE_LENGTH = 200
+
+
+def passage_id(text):
+    """
+    计算原文的内容哈希ID。
+
+    Args:
+        text (str): 原文
+
+    Returns:
+        str: sha256十六进制摘要，空文本返回None
+    """
+    if not text:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_ref(value):
+    """判断值是否为原文引用"""
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+class PassageStore:
+    """
+    内容寻址的原文存储（哈希 -> zlib压缩文本）。
+    """
+
+    def __init__(self, root):
+        """
+        初始化原文存储
+
+        Args:
+            root (str): 存储目录
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._cache = {}
+
+    def _path(self, pid):
+        """返回原文ID对应的文件路径（按前两位分目录）"""
+        return os.path.join(self.root, pid[:2], f"{pid}.z")
+
+    def put(self, text):
+        """
+        保存原文（已存在时跳过）
+
+        Args:
+            text (str): 原文
+
+        Returns:
+            str: 原文ID
+        """
+        pid = passage_id(text)
+        if pid is None:
+            return None
+        path = self._path(pid)
+        if pid not in self._cache and not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 临时文件名区分进程和线程：多个工作线程可能同时保存同一篇原文
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(text.encode("utf-8"), 9))
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                # 内容相同，其他线程或进程已写入时视为成功
+                if not os.path.exists(path):
+                    raise
+                os.remove(tmp_path)
+        self._cache[pid] = text
+        return pid
+
+    def get(self, pid):
+        """
+        读取原文
+
+        Args:
+            pid (str): 原文ID
+
+        Returns:
+            str: 原文
+
+        Raises:
+            KeyError: 原文不存在
+        """
+        if pid in self._cache:
+            return self._cache[pid]
+        path = self._path(pid)
+        if not os.path.exists(path):
+            raise KeyError(f"原文不存在: {pid}")
+        with open(path, 'rb') as f:
+            text = zlib.decompress(f.read()).decode("utf-8")
+        self._cache[pid] = text
+        return text
+
+    def ref(self, text):
+        """保存原文并返回引用字符串"""
+        return REF_PREFIX + self.put(text)
+
+    def resolve(self, value):
+        """将引用还原为原文，非引用的值原样返回"""
+        if is_ref(value):
+            return self.get(value[len(REF_PREFIX):])
+        return value
+
+    def pack(self, data):
+        """
+        将数据中的原文替换为引用（返回新对象，不修改输入）
+
+        Args:
+            data: 提取结果（字典）或组织后的数据行（列表）
+
+        Returns:
+            与输入结构相同、原文字段为引用的数据
+        """
+        if isinstance(data, QuestionRecord):
+            data = data.to_dict()
+        if isinstance(data, dict):
+            packed = {}
+            for key, value in data.items():
+                if (key in PASSAGE_KEYS and isinstance(value, str)
+                        and len(value) >= MIN_PASSAGE_LENGTH and not is_ref(value)):
+                    packed[key] = self.ref(value)
+                else:
+                    packed[key] = self.pack(value)
+            return packed
+        if isinstance(data, list):
+            return [self.pack(item) for item in data]
+        return data
+
+    def unpack(self, data):
+        """
+        将数据中的引用还原为原文（返回新对象，不修改输入）
+
+        Args:
+            data: 含有原文引用的数据
+
+        Returns:
+            与输入结构相同、引用已还原的数据
+        """
+        if isinstance(data, dict):
+            return {key: self.unpack(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self.unpack(item) for item in data]
+        return self.resolve(data)
+
+    def dump_json(self, data, output_file):
+        """
+        将数据中的原文替换为引用后保存为JSON文件
+
+        Args:
+            data: 要保存的数据
+            output_file (str): 输出文件路径
+        """
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.pack(data), f, ensure_ascii=False, indent=2)
+
+
+def contains_refs(data):
+    """判断数据中是否含有原文引用"""
+    if isinstance(data, dict):
+        return any(contains_refs(value) for value in data.values())
+    if isinstance(data, list):
+        return any(contains_refs(item) for item in data)
+    return is_ref(data)
+
+
+def dump_json(data, output_file, passage_store=None):
+    """
+    保存JSON结果文件，提供原文存储时原文以引用形式保存
+
+    Args:
+        data: 要保存的数据
+        output_file (str): 输出文件路径
+        passage_store (PassageStore, optional): 原文存储
+    """
+    if passage_store is not None:
+        passage_store.dump_json(data, output_file)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(to_rows(data), f, ensure_ascii=False, indent=2)
+
+
+def main():
+    """命令行入口：将已有的JSON结果转换为引用形式（pack）或还原（unpack）"""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="原文存储：压缩/还原JSON结果中的原文")
+    parser.add_argument('action', choices=["pack", "unpack"], help="pack: 原文替换为引用；unpack: 引用还原为原文")
+    parser.add_argument('paths', nargs='+', help="JSON文件或目录（目录下递归查找*.json）")
+    parser.add_argument('--store', default=os.path.join("test_results", "passages"), help="原文存储目录")
+
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.json"), recursive=True)))
+        else:
+            files.append(path)
+
+    store = PassageStore(args.store)
+    before = after = 0
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        before += os.path.getsize(path)
+        data = store.pack(data) if args.action == "pack" else store.unpack(data)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        after += os.path.getsize(path)
+
+    logger.info(f"已处理 {len(files)} 个文件: {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+题目记录模块，定义数据组织到导出过程中使用的紧凑数据结构。
+
+QuestionRecord使用__slots__保存单道题目的字段，同一篇原文的全部题目共享
+同一个Passage对象（原文、还原后原文、句子拆解结果、答案汇总），句子拆分
+也按原文只执行一次。记录支持get/[]等字典式访问，只在输出JSON时转换为字典。
+"""
+
+# 数据行的标准字段（CSV列顺序）
+ROW_FIELDS = (
+    "年份",
+    "考试类型",
+    "题型",
+    "原文（卷面）",
+    "试卷答案",
+    "题目编号",
+    "题干",
+    "选项",
+    "正确答案",
+    "原文（还原后）",
+    "原文（句子拆解后）",
+    "干扰选项"
+)
+
+# 保存在题目记录上的字段 -> 属性名
+RECORD_ATTRS = {
+    "年份": "year",
+    "考试类型": "exam_type",
+    "题型": "question_type",
+    "题目编号": "number",
+    "题干": "stem",
+    "选项": "options",
+    "正确答案": "correct_answer",
+    "干扰选项": "distractors",
+    "试卷答案": "answer"
+}
+
+# 保存在共享原文对象上的字段 -> 属性名
+PASSAGE_ATTRS = {
+    "原文（卷面）": "original",
+    "原文（还原后）": "restored",
+    "原文（句子拆解后）": "split",
+    "答案汇总": "answers_summary"
+}
+
+
+class Passage:
+    """
+    一篇原文及其派生文本，由同一板块的全部题目共享。
+    """
+
+    __slots__ = ("original", "restored", "split", "answers_summary")
+
+    def __init__(self, original="", restored="", split="", answers_summary=None):
+        """
+        初始化原文对象
+
+        Args:
+            original (str): 原文（卷面）
+            restored (str): 原文（还原后）
+            split (str): 原文（句子拆解后）
+            answers_summary (str, optional): 板块的答案汇总，没有时为None（输出中不包含该字段）
+        """
+        self.original = original
+        self.restored = restored
+        self.split = split
+        self.answers_summary = answers_summary
+
+    def copy(self):
+        """返回原文对象的副本"""
+        return Passage(self.original, self.restored, self.split, self.answers_summary)
+
+    def __eq__(self, other):
+        if not isinstance(other, Passage):
+            return NotImplemented
+        return (self.original, self.restored, self.split, self.answers_summary) == \
+            (other.original, other.restored, other.split, other.answers_summary)
+
+
+class QuestionRecord:
+    """
+    单道题目的记录，支持字典式访问（get、[]、in、keys、items）。
+    """
+
+    __slots__ = ("year", "exam_type", "question_type", "number", "stem", "options",
+                 "correct_answer", "distractors", "answer", "passage", "extra")
+
+    def __init__(self, year="", exam_type="", question_type="", number="", stem="", options="",
+                 correct_answer="", distractors="", answer="", passage=None, extra=None):
+        """
+        初始化题目记录
+
+        Args:
+            year (str): 年份
+            exam_type (str): 考试类型
+            question_type (str): 题型
+            number (str|int): 题目编号
+            stem (str): 题干
+            options (str): 选项
+            correct_answer (str): 正确答案
+            distractors (str): 干扰选项
+            answer (str): 试卷答案
+            passage (Passage, optional): 共享的原文对象
+            extra (dict, optional): 标准字段以外的其他字段
+        """
+        self.year = year
+        self.exam_type = exam_type
+        self.question_type = question_type
+        self.number = number
+        self.stem = stem
+        self.options = options
+        self.correct_answer = correct_answer
+        self.distractors = distractors
+        self.answer = answer
+        self.passage = passage if passage is not None else Passage()
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data, passages=None, key_map=None):
+        """
+        从数据行字典创建记录
+
+        Args:
+            data (dict): 数据行
+            passages (dict, optional): 原文对象缓存，原文相同的记录共享同一个Passage
+            key_map (dict, optional): 字段名映射（如"stem" -> "题干"），未列出的字段名保持不变
+
+        Returns:
+            QuestionRecord: 题目记录
+        """
+        record = cls()
+        passage_fields = {}
+        extra = None
+        for key, value in data.items():
+            if key_map is not None:
+                key = key_map.get(key, key)
+            attr = RECORD_ATTRS.get(key)
+            if attr is not None:
+                setattr(record, attr, value)
+            elif key in PASSAGE_ATTRS:
+                passage_fields[key] = value
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        record.extra = extra
+
+        passage_key = (passage_fields.get("原文（卷面）", ""), passage_fields.get("原文（还原后）", ""),
+                       passage_fields.get("原文（句子拆解后）", ""), passage_fields.get("答案汇总"))
+        passage = passages.get(passage_key) if passages is not None else None
+        if passage is None:
+            passage = Passage(*passage_key)
+            if passages is not None:
+                passages[passage_key] = passage
+        record.passage = passage
+        return record
+
+    def get(self, key, default=None):
+        attr = RECORD_ATTRS.get(key)
+        if attr is not None:
+            return getattr(self, attr)
+        attr = PASSAGE_ATTRS.get(key)
+        if attr is not None:
+            value = getattr(self.passage, attr)
+            return default if value is None else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        attr = RECORD_ATTRS.get(key)
+        if attr is not None:
+            setattr(self, attr, value)
+            return
+        attr = PASSAGE_ATTRS.get(key)
+        if attr is not None:
+            # 原文对象被多道题共享，修改单道题的原文字段时先复制
+            self.passage = self.passage.copy()
+            setattr(self.passage, attr, value)
+            return
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __contains__(self, key):
+        if key in RECORD_ATTRS:
+            return True
+        if key in PASSAGE_ATTRS:
+            return key != "答案汇总" or self.passage.answers_summary is not None
+        return self.extra is not None and key in self.extra
+
+    def keys(self):
+        keys = list(ROW_FIELDS)
+        if self.passage.answers_summary is not None:
+            keys.append("答案汇总")
+        if self.extra:
+            keys.extend(key for key in self.extra if key not in keys)
+        return keys
+
+    def items(self):
+        return [(key, self.get(key)) for key in self.keys()]
+
+    def to_dict(self):
+        """转换为数据行字典（输出边界使用）"""
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, QuestionRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"QuestionRecord(题目编号={self.number!r}, 题型={self.question_type!r})"
+
+
+_MISSING = object()
+
+
+def to_rows(data):
+    """
+    将记录（或记录列表）转换为字典，其他数据原样返回
+
+    Args:
+        data: QuestionRecord、记录列表或其他数据
+
+    Returns:
+        与输入结构相同、记录已转换为字典的数据
+    """
+    if isinstance(data, QuestionRecord):
+        return data.to_dict()
+    if isinstance(data, list):
+        return [to_rows(item) for item in data]
+    return data
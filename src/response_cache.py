@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模型响应缓存模块：进程内的single-flight去重和可选的持久化响应缓存。
+
+批处理中同一份试卷常以不同文件出现（如.docx和_extracted.txt，或不同的文件名），
+并发的工作线程会同时发出完全相同的请求。请求按(模型, 消息, 参数)计算键：
+    single-flight: 相同的请求正在进行时，后来的调用等待并共享同一次网络请求的结果
+    持久化缓存: 设置缓存目录后，成功解析的响应按键保存，之后相同的请求直接读取，不再调用API；
+               无法解析的响应不保存，之后的运行会重新请求
+
+缓存目录可通过环境变量RESPONSE_CACHE_DIR或命令行参数--response-cache设置，默认不启用持久化缓存。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from src.deadline import DeadlineExceeded
+
+logger = logging.getLogger("考研英语真题处理.response_cache")
+
+# 默认的持久化缓存目录，为None时不启用
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR") or None
+
+# 可以缓存的结束原因（被截断的响应也缓存，续写请求有各自的键）
+CACHEABLE_FINISH_REASONS = ("stop", "length")
+
+
+def request_key(data):
+    """
+    计算请求的键
+
+    Args:
+        data (dict): 请求数据（model、messages、max_tokens、temperature等）
+
+    Returns:
+        str: sha256十六进制摘要
+    """
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """一次进行中的请求"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    合并相同键的并发调用：同一时间每个键只执行一次，其余调用等待并共享结果或异常。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, func, deadline=None):
+        """
+        执行调用，相同键的调用正在进行时等待其结果
+
+        Args:
+            key (str): 请求的键
+            func (callable): 无参数的调用
+            deadline (Deadline, optional): 等待其他调用时的期限
+
+        Returns:
+            tuple: (调用结果, 是否共享了其他调用的结果)
+
+        Raises:
+            Exception: 调用抛出的异常（等待的调用收到同一个异常；发起方被取消或超过其期限时，
+                由等待方根据自己的取消状态和期限决定是否重新调用）
+            DeadlineExceeded: 等待其他调用时期限到达
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+
+        if not leader:
+            logger.info(f"相同的请求正在进行，等待共享结果（{key[:12]}）")
+            timeout = deadline.remaining() if deadline is not None else None
+            if not flight.done.wait(timeout):
+                raise DeadlineExceeded(f"等待相同请求的结果时超过文档处理期限（{deadline.seconds:g}秒）")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+            return flight.result, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+            if flight.followers:
+                logger.info(f"{flight.followers} 个相同的请求共享了本次结果（{key[:12]}）")
+
+
+class ResponseCache:
+    """
+    持久化的响应缓存（请求键 -> 回答内容）。
+    """
+
+    def __init__(self, root):
+        """
+        初始化响应缓存
+
+        Args:
+            root (str): 缓存目录
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        """返回键对应的文件路径（按前两位分目录）"""
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """
+        读取缓存的响应
+
+        Args:
+            key (str): 请求的键
+
+        Returns:
+            tuple: (回答内容, finish_reason)，没有缓存时返回None
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取响应缓存失败: {path}: {str(e)}")
+            return None
+        return entry["content"], entry.get("finish_reason")
+
+    def put(self, key, model, content, finish_reason):
+        """
+        保存响应（只保存完整返回或因长度截断的非空回答，调用方应在回答成功解析后再保存）
+
+        Args:
+            key (str): 请求的键
+            model (str): 模型名称
+            content (str): 回答内容
+            finish_reason (str): 结束原因
+        """
+        if not content or finish_reason not in CACHEABLE_FINISH_REASONS:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 临时文件名区分进程和线程，避免并发写入时互相覆盖
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "model": model,
+                    "content": content,
+                    "finish_reason": finish_reason,
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入响应缓存失败: {path}: {str(e)}")
+
+
+_single_flight = SingleFlight()
+
+def get_single_flight():
+    """
+    获取进程内共享的single-flight实例
+
+    Returns:
+        SingleFlight: 共享实例
+    """
+    return _single_flight
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_response_cache(root=None):
+    """
+    获取持久化响应缓存
+
+    Args:
+        root (str, optional): 缓存目录，默认使用RESPONSE_CACHE_DIR
+
+    Returns:
+        ResponseCache: 缓存实例，未设置缓存目录时返回None
+    """
+    root = root or RESPONSE_CACHE_DIR
+    if not root:
+        return None
+    with _caches_lock:
+        if root not in _caches:
+            _caches[root] = ResponseCache(root)
+        return _caches[root]
+
+
+def set_default_cache_dir(root):
+    """
+    设置默认的持久化缓存目录（同时写入环境变量，进程池中的工作进程使用相同设置）
+
+    Args:
+        root (str): 缓存目录
+    """
+    global RESPONSE_CACHE_DIR
+    RESPONSE_CACHE_DIR = root
+    os.environ["RESPONSE_CACHE_DIR"] = root
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地HTTP提取服务，提供提交文档、查询任务状态和获取结果的JSON API。
+
+服务在一个常驻进程中运行：Punkt模型、python-docx等依赖在启动时加载一次，
+所有任务共享同一个HTTP连接池、模型目录和调用统计。任务由有界的线程池执行，
+任务表保存在SQLite中，服务重启后未完成的任务会重新排队。
+
+接口：
+    POST /jobs               提交文档，JSON: {"file_name": "2023年考研英语一.docx",
+                             "content_base64": "..."} 或 {"file_name": "...txt", "text": "..."}，
+                             可选"model"
+    GET  /jobs               最近的任务列表
+    GET  /jobs/<id>          任务状态
+    GET  /jobs/<id>/rows     组织后的数据行（JSON）
+    GET  /jobs/<id>/csv      CSV文件
+    GET  /health             服务状态
+"""
+
+import os
+import csv
+import json
+import time
+import uuid
+import base64
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+logger = logging.getLogger("考研英语真题处理.server")
+
+# 默认任务表路径
+DEFAULT_JOB_DB = os.path.join("test_results", "jobs.db")
+
+# 支持的文档格式
+SUPPORTED_EXTENSIONS = (".docx", ".txt")
+
+# 请求体大小上限（字节）
+MAX_BODY_SIZE = 32 * 1024 * 1024
+
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    model TEXT,
+    csv_path TEXT,
+    error TEXT,
+    process_time REAL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_submitted ON jobs(submitted_at);
+"""
+
+JOB_COLUMNS = ("id", "status", "file_name", "input_path", "model", "csv_path", "error",
+               "process_time", "submitted_at", "started_at", "finished_at")
+
+
+class QueueFullError(Exception):
+    """等待中的任务数已达上限"""
+    pass
+
+
+class JobStore:
+    """
+    SQLite任务表，多个线程共享一个连接（由锁保护）。
+    """
+
+    def __init__(self, db_path=DEFAULT_JOB_DB):
+        """
+        初始化任务表
+
+        Args:
+            db_path (str): 数据库文件路径
+        """
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(JOB_SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(self, job_id, file_name, input_path, model=None):
+        """新建排队中的任务，返回任务信息"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, status, file_name, input_path, model, submitted_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, file_name, input_path, model, time.time())
+            )
+        return self.get(job_id)
+
+    def update(self, job_id, **fields):
+        """更新任务字段"""
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        """返回任务信息字典，不存在时返回None"""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+    def list(self, limit=50):
+        """返回最近提交的任务"""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY submitted_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(zip(JOB_COLUMNS, row)) for row in rows]
+
+    def unfinished(self):
+        """返回排队中或执行中（上次服务退出时被中断）的任务ID，按提交顺序"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY submitted_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+
+class ExtractionService:
+    """
+    常驻的提取服务：接收文档、排队执行并记录任务状态。
+    """
+
+    def __init__(self, output_dir="test_results", model_name=None, workers=2, max_queue=32,
+                 job_db=None, passage_dir=None, parquet_dir=None, corpus_db=None, hedge_policy=None,
+                 router=None, csv_passage_refs=False):
+        """
+        初始化提取服务
+
+        Args:
+            output_dir (str): 输出基础目录，每个任务的结果写入jobs/<任务ID>子目录，上传的文档保存在uploads子目录
+            model_name (str, optional): 默认模型，任务可单独指定
+            workers (int): 同时执行的任务数
+            max_queue (int): 等待中的任务数上限，超过时拒绝新任务
+            job_db (str, optional): 任务表路径，默认为输出目录下的jobs.db
+            passage_dir (str, optional): 原文存储目录
+            parquet_dir (str, optional): Parquet数据集目录
+            corpus_db (str, optional): 语料库数据库路径
+            hedge_policy: 可选的对冲策略（HedgePolicy），所有任务共享延迟历史
+            router: 可选的模型路由器（ModelRouter）
+            csv_passage_refs (bool): 是否在CSV中也使用原文引用（需要passage_dir）
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.output_dir = output_dir
+        self.upload_dir = os.path.join(output_dir, "uploads")
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.passage_dir = passage_dir
+        self.csv_passage_refs = csv_passage_refs
+        self.parquet_dir = parquet_dir
+        self.corpus_db = corpus_db
+        self.hedge_policy = hedge_policy
+        self.router = router
+
+        self.jobs = JobStore(job_db or os.path.join(output_dir, "jobs.db"))
+
+        # 所有任务共享的HTTP连接池
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers * 4)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._queued = 0
+        self._queue_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self.started_at = time.time()
+
+        self._warm_up()
+
+        # 重新排队上次服务退出时未完成的任务
+        for job_id in self.jobs.unfinished():
+            self.jobs.update(job_id, status="queued", started_at=None)
+            self._enqueue(job_id)
+
+    def _warm_up(self):
+        """预加载处理文档所需的依赖"""
+        import docx  # noqa: F401
+        from src.sentence_splitter import get_default_splitter
+        get_default_splitter().split_text("Warm up. The splitter is loaded.")
+        logger.info("依赖预加载完成")
+
+    def _enqueue(self, job_id):
+        """将任务提交到线程池"""
+        with self._queue_lock:
+            self._queued += 1
+        self.executor.submit(self._run, job_id)
+
+    def submit(self, file_name, content, model=None):
+        """
+        保存上传的文档并创建任务
+
+        Args:
+            file_name (str): 文档文件名（用于识别格式和年份）
+            content (bytes): 文档内容
+            model (str, optional): 本任务使用的模型
+
+        Returns:
+            dict: 任务信息
+
+        Raises:
+            ValueError: 文件格式不支持
+            QueueFullError: 等待中的任务过多
+        """
+        file_name = os.path.basename(file_name or "")
+        if not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"不支持的文件格式: {file_name or '（未指定文件名）'}，仅支持docx和txt")
+
+        with self._queue_lock:
+            if self._queued >= self.max_queue:
+                raise QueueFullError(f"等待中的任务已达上限（{self.max_queue}），请稍后重试")
+
+        job_id = uuid.uuid4().hex
+        input_path = os.path.join(self.upload_dir, f"{job_id}_{file_name}")
+        with open(input_path, 'wb') as f:
+            f.write(content)
+
+        job = self.jobs.create(job_id, file_name, input_path, model or self.model_name)
+        self._enqueue(job_id)
+        logger.info(f"任务 {job_id} 已排队: {file_name}")
+        return job
+
+    def job_dir(self, job_id):
+        """
+        返回任务的输出目录（每个任务单独一个目录，同一试卷或同一年份的任务不会互相覆盖）
+
+        Args:
+            job_id (str): 任务ID
+
+        Returns:
+            str: 输出目录路径
+        """
+        return os.path.join(self.output_dir, "jobs", job_id)
+
+    def _run(self, job_id):
+        """执行任务（在线程池中运行）"""
+        from src.data_processor import DataProcessor
+
+        with self._queue_lock:
+            self._queued -= 1
+
+        job = self.jobs.get(job_id)
+        self.jobs.update(job_id, status="running", started_at=time.time())
+
+        try:
+            processor = DataProcessor(
+                model_name=job["model"],
+                hedge_policy=self.hedge_policy,
+                router=self.router,
+                parquet_dir=self.parquet_dir,
+                corpus_db=self.corpus_db,
+                passage_dir=self.passage_dir,
+                csv_passage_refs=self.csv_passage_refs,
+                session=self.session
+            )
+            success, csv_path, process_time = processor.process_document(
+                job["input_path"],
+                output_dir=self.job_dir(job_id)
+            )
+            self.jobs.update(
+                job_id,
+                status="succeeded" if success else "failed",
+                csv_path=csv_path,
+                error=None if success else "处理失败，详见服务日志",
+                process_time=process_time,
+                finished_at=time.time()
+            )
+            logger.info(f"任务 {job_id} {'完成' if success else '失败'}，耗时: {process_time:.2f}秒")
+        except Exception as e:
+            logger.error(f"任务 {job_id} 出错: {str(e)}", exc_info=True)
+            self.jobs.update(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def rows(self, job_id):
+        """
+        读取任务生成的数据行
+
+        Args:
+            job_id (str): 任务ID
+
+        Returns:
+            list: 数据行字典列表，任务未完成或没有结果时返回None
+        """
+        job = self.jobs.get(job_id)
+        if not job or not job["csv_path"] or not os.path.exists(job["csv_path"]):
+            return None
+        with open(job["csv_path"], 'r', encoding='utf-8-sig', newline='') as f:
+            return list(csv.DictReader(f))
+
+    def status(self):
+        """返回服务状态"""
+        with self._queue_lock:
+            queued = self._queued
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "uptime_seconds": round(time.time() - self.started_at, 1)
+        }
+
+    def shutdown(self):
+        """等待执行中的任务完成并释放资源"""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        self.jobs.close()
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API请求处理器，服务实例通过server.service访问。
+    """
+
+    server_version = "CET-Extractor"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _job_path(self):
+        """解析/jobs/<id>[/<资源>]，返回(任务ID, 资源名)"""
+        parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+        if not parts or parts[0] != "jobs":
+            return None, None
+        job_id = parts[1] if len(parts) > 1 else None
+        resource = parts[2] if len(parts) > 2 else None
+        return job_id, resource
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path.split("?", 1)[0] == "/health":
+            return self._send_json(200, service.status())
+
+        job_id, resource = self._job_path()
+        if job_id is None:
+            if self.path.split("?", 1)[0].rstrip("/") == "/jobs":
+                return self._send_json(200, {"jobs": service.jobs.list()})
+            return self._send_error(404, "接口不存在")
+
+        job = service.jobs.get(job_id)
+        if job is None:
+            return self._send_error(404, f"任务不存在: {job_id}")
+
+        if resource is None:
+            return self._send_json(200, job)
+
+        if resource not in ("rows", "csv"):
+            return self._send_error(404, "接口不存在")
+        if job["status"] != "succeeded":
+            return self._send_error(409, f"任务尚未完成，当前状态: {job['status']}")
+
+        if resource == "rows":
+            rows = service.rows(job_id)
+            if rows is None:
+                return self._send_error(404, "结果文件不存在")
+            return self._send_json(200, {"id": job_id, "rows": rows})
+
+        if not job["csv_path"] or not os.path.exists(job["csv_path"]):
+            return self._send_error(404, "结果文件不存在")
+        with open(job["csv_path"], 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(os.path.basename(job['csv_path']))}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        service = self.server.service
+        job_id, resource = self._job_path()
+        if self.path.split("?", 1)[0].rstrip("/") != "/jobs" or job_id is not None:
+            return self._send_error(404, "接口不存在")
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_SIZE:
+            return self._send_error(413 if length > MAX_BODY_SIZE else 400, "请求体为空或过大")
+
+        try:
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+            if "content_base64" in payload:
+                content = base64.b64decode(payload["content_base64"], validate=True)
+            elif "text" in payload:
+                content = payload["text"].encode("utf-8")
+            else:
+                return self._send_error(400, "缺少content_base64或text字段")
+            job = service.submit(payload.get("file_name"), content, payload.get("model"))
+        except QueueFullError as e:
+            return self._send_error(503, str(e))
+        except (ValueError, TypeError, AttributeError) as e:
+            return self._send_error(400, f"请求格式错误: {str(e)}")
+
+        self._send_json(202, job)
+
+
+def serve(host="127.0.0.1", port=8765, **service_options):
+    """
+    启动提取服务，直到收到KeyboardInterrupt
+
+    Args:
+        host (str): 监听地址
+        port (int): 监听端口
+        **service_options: 传给ExtractionService的参数
+    """
+    service = ExtractionService(**service_options)
+    httpd = ThreadingHTTPServer((host, port), ExtractionRequestHandler)
+    httpd.service = service
+    logger.info(f"提取服务已启动: http://{host}:{port}（工作线程: {service.workers}）")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("收到中断信号，等待执行中的任务完成...")
+    finally:
+        httpd.server_close()
+        service.shutdown()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地处理阶段进程池，用于批量模式。
+
+docx解析、正则预处理、数据组织和NLTK句子拆分都是纯Python的CPU密集型
+工作，受GIL限制无法靠线程并行。本模块把这些阶段交给常驻的工作进程执行，
+网络请求仍然在线程中进行。工作进程启动时预先加载Punkt模型、docx模块
+和正则表达式，之后的任务不再重复加载。
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger("考研英语真题处理.stage_pool")
+
+# 工作进程内的常驻对象（由_init_worker创建）
+_docx_reader = None
+_data_organizer = None
+_passage_store = None
+
+
+def _init_worker(passage_dir=None):
+    """
+    工作进程初始化：预加载较重的依赖和常驻对象
+
+    Args:
+        passage_dir (str, optional): 原文存储目录
+    """
+    global _docx_reader, _data_organizer, _passage_store
+
+    from src.docx_reader import DocxReader
+    from src.data_organizer import DataOrganizer
+    from src.sentence_splitter import get_default_splitter
+
+    # 预加载python-docx和句子拆分器（punkt引擎时加载Punkt模型）
+    import docx  # noqa: F401
+    get_default_splitter().split_text("Warm up. The splitter is loaded.")
+
+    if passage_dir:
+        from src.passage_store import PassageStore
+        _passage_store = PassageStore(passage_dir)
+
+    _docx_reader = DocxReader()
+    _data_organizer = DataOrganizer(passage_store=_passage_store)
+
+
+def read_document(document_path):
+    """
+    读取文档内容（在工作进程中执行）
+
+    Args:
+        document_path (str): docx或txt文件路径
+
+    Returns:
+        str: 文档文本
+    """
+    if document_path.lower().endswith(".docx"):
+        return _docx_reader.read_file(document_path)
+    with open(document_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def organize_result(result):
+    """
+    组织提取结果并拆分句子（在工作进程中执行）
+
+    Args:
+        result (dict): ContentAnalyzer.extract_data的返回结果
+
+    Returns:
+        list: 处理完成的数据行
+    """
+    from src.sentence_splitter import split_sentences
+
+    return _data_organizer.postprocess(result, split_sentences)
+
+
+class StagePool:
+    """
+    本地处理阶段的常驻进程池。
+    """
+
+    def __init__(self, workers=None, passage_dir=None):
+        """
+        初始化进程池
+
+        Args:
+            workers (int, optional): 工作进程数，默认为CPU核数
+            passage_dir (str, optional): 原文存储目录，工作进程用其还原原文引用
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(passage_dir,)
+        )
+        logger.info(f"本地处理进程池已启动，工作进程数: {self.workers}")
+
+    def read_document(self, document_path):
+        """在工作进程中读取文档，返回文档文本"""
+        return self.executor.submit(read_document, document_path).result()
+
+    def organize(self, result):
+        """在工作进程中组织数据并拆分句子，返回处理完成的数据行"""
+        return self.executor.submit(organize_result, result).result()
+
+    def shutdown(self):
+        """关闭进程池"""
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
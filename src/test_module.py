@@ -18,6 +18,7 @@ from pathlib import Path
 from docx_reader import DocxReader
 from openrouter_api import OpenRouterAPI
 from data_organizer import DataOrganizer
+from question_record import to_rows
 from csv_generator import CSVGenerator
 from sentence_splitter import SentenceSplitter, split_sentences
 from content_analyzer import ContentAnalyzer
@@ -198,7 +199,7 @@ def test_data_organizer(data, output_dir="./test_results"):
         # 保存组织后的数据到JSON文件
         output_path = os.path.join(output_dir, "data_organizer_result.json")
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(organized_data, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(organized_data), f, ensure_ascii=False, indent=2)
         
         print(f"组织后的数据已保存到 {output_path}")
         
@@ -212,7 +213,7 @@ def test_data_organizer(data, output_dir="./test_results"):
         # 保存完整数据到JSON文件
         output_path = os.path.join(output_dir, "data_organizer_complete_result.json")
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(complete_data, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(complete_data), f, ensure_ascii=False, indent=2)
         
         print(f"完整数据已保存到 {output_path}")
         
@@ -360,7 +361,7 @@ def test_full_pipeline(file_path, api_key, output_dir="./test_results"):
         
         # 保存组织后的数据
         with open(os.path.join(output_dir, "pipeline_organized_data.json"), "w", encoding="utf-8") as f:
-            json.dump(organized_data, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(organized_data), f, ensure_ascii=False, indent=2)
         
         # 确保数据完整
         print("5. 确保数据完整...")
@@ -368,7 +369,7 @@ def test_full_pipeline(file_path, api_key, output_dir="./test_results"):
         
         # 保存完整数据
         with open(os.path.join(output_dir, "pipeline_complete_data.json"), "w", encoding="utf-8") as f:
-            json.dump(complete_data, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(complete_data), f, ensure_ascii=False, indent=2)
         
         # 应用句子拆分
         print("6. 应用句子拆分...")
@@ -376,7 +377,7 @@ def test_full_pipeline(file_path, api_key, output_dir="./test_results"):
         
         # 保存拆分后的数据
         with open(os.path.join(output_dir, "pipeline_split_data.json"), "w", encoding="utf-8") as f:
-            json.dump(data_with_split, f, ensure_ascii=False, indent=2)
+            json.dump(to_rows(data_with_split), f, ensure_ascii=False, indent=2)
         
         # 生成CSV
         print("7. 生成CSV...")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+离线token估计模块，按模型系列估算文本的token数，不需要网络和分词器依赖。
+
+每个模型系列使用各自的分词参数（英文字符/token、每个汉字的token数、每条消息的固定开销）。
+模型调用统计中记录了接口返回的实际输入token数和请求时的估计值，样本足够时按两者之比
+校准该模型的估计结果。
+"""
+
+import re
+import logging
+
+from src.model_config import get_model_stats
+
+logger = logging.getLogger("考研英语真题处理.token_estimator")
+
+# 各模型系列的分词参数（按模型ID的前缀匹配）：
+#   chars_per_token: 英文、数字和标点平均每个token的字符数（连续空白按一个字符计）
+#   cjk_tokens: 每个汉字（及全角标点）平均的token数
+#   message_overhead: 每条消息的固定开销（角色标记等）
+#   first_token_seconds, output_tokens_per_second: 没有调用统计时估算延迟使用
+TOKEN_PROFILES = {
+    "openai": {"chars_per_token": 4.0, "cjk_tokens": 0.9, "message_overhead": 4,
+               "first_token_seconds": 1.5, "output_tokens_per_second": 60},
+    "anthropic": {"chars_per_token": 3.5, "cjk_tokens": 1.3, "message_overhead": 5,
+                  "first_token_seconds": 2.0, "output_tokens_per_second": 50},
+    "google": {"chars_per_token": 4.0, "cjk_tokens": 0.8, "message_overhead": 4,
+               "first_token_seconds": 1.5, "output_tokens_per_second": 120},
+    "mistralai": {"chars_per_token": 3.4, "cjk_tokens": 1.6, "message_overhead": 4,
+                  "first_token_seconds": 1.0, "output_tokens_per_second": 80},
+    "meta-llama": {"chars_per_token": 3.8, "cjk_tokens": 1.1, "message_overhead": 4,
+                   "first_token_seconds": 1.0, "output_tokens_per_second": 80},
+    "deepseek": {"chars_per_token": 3.8, "cjk_tokens": 0.7, "message_overhead": 4,
+                 "first_token_seconds": 2.0, "output_tokens_per_second": 30},
+    "default": {"chars_per_token": 3.7, "cjk_tokens": 1.2, "message_overhead": 4,
+                "first_token_seconds": 2.0, "output_tokens_per_second": 50},
+}
+
+# 汉字、全角标点和日文假名
+_CJK = re.compile(r"[　-ヿ㐀-䶿一-鿿＀-￯]")
+# 连续空白（分词器通常把一段空白合并为一个token）
+_WHITESPACE_RUN = re.compile(r"\s{2,}")
+
+# 开始校准所需的最少样本数，以及校准系数的范围
+MIN_CALIBRATION_CALLS = 3
+CALIBRATION_RANGE = (0.5, 2.0)
+
+
+def model_family(model_name):
+    """
+    返回模型所属的系列
+
+    Args:
+        model_name (str): 模型ID，如"google/gemini-2.5-flash-preview"
+
+    Returns:
+        str: TOKEN_PROFILES中的系列名称，未知时为"default"
+    """
+    prefix = (model_name or "").split("/", 1)[0].lower()
+    return prefix if prefix in TOKEN_PROFILES else "default"
+
+
+class TokenEstimator:
+    """
+    按模型系列估算token数，并根据模型调用统计校准。
+    """
+
+    def __init__(self, stats=None):
+        """
+        初始化token估计器
+
+        Args:
+            stats (ModelStatsStore, optional): 模型调用统计，默认使用共享实例；为False时不做校准
+        """
+        self.stats = get_model_stats() if stats is None else stats
+
+    @staticmethod
+    def profile(model_name):
+        """返回模型系列的分词参数"""
+        return TOKEN_PROFILES[model_family(model_name)]
+
+    def raw_estimate(self, text, model_name=None):
+        """
+        不经校准的token估计
+
+        Args:
+            text (str): 文本
+            model_name (str, optional): 模型ID
+
+        Returns:
+            int: 估计的token数
+        """
+        if not text:
+            return 0
+        profile = self.profile(model_name)
+        cjk = len(_CJK.findall(text))
+        other = len(_WHITESPACE_RUN.sub(" ", _CJK.sub("", text)))
+        return int(round(cjk * profile["cjk_tokens"] + other / profile["chars_per_token"]))
+
+    def calibration(self, model_name):
+        """
+        根据调用统计返回模型的校准系数（实际token数 / 估计token数）
+
+        Args:
+            model_name (str): 模型ID
+
+        Returns:
+            float: 校准系数，样本不足时为1.0
+        """
+        if not self.stats or not model_name:
+            return 1.0
+        ratio = self.stats.token_ratio(model_name, MIN_CALIBRATION_CALLS)
+        if ratio is None:
+            return 1.0
+        low, high = CALIBRATION_RANGE
+        return min(high, max(low, ratio))
+
+    def estimate(self, text, model_name=None):
+        """
+        估计文本的token数（已校准）
+
+        Args:
+            text (str): 文本
+            model_name (str, optional): 模型ID
+
+        Returns:
+            int: 估计的token数
+        """
+        return int(round(self.raw_estimate(text, model_name) * self.calibration(model_name)))
+
+    def estimate_messages(self, messages, model_name=None, calibrated=True):
+        """
+        估计一次对话请求的输入token数
+
+        Args:
+            messages (list): 消息列表，每条为{"role": ..., "content": ...}
+            model_name (str, optional): 模型ID
+            calibrated (bool): 是否应用校准系数
+
+        Returns:
+            int: 估计的输入token数
+        """
+        overhead = self.profile(model_name)["message_overhead"]
+        total = sum(self.raw_estimate(message.get("content", ""), model_name) + overhead for message in messages)
+        if calibrated:
+            total = total * self.calibration(model_name)
+        return int(round(total))
+
+    def estimate_seconds(self, model_name, output_tokens):
+        """
+        估计生成指定数量token的耗时
+
+        有调用统计时按该模型的平均延迟和平均输出token数折算，否则使用模型系列的默认速度。
+
+        Args:
+            model_name (str): 模型ID
+            output_tokens (int): 输出token数
+
+        Returns:
+            float: 估计耗时（秒）
+        """
+        if self.stats:
+            mean_latency = self.stats.mean_latency(model_name)
+            mean_output = self.stats.mean_completion_tokens(model_name)
+            if mean_latency and mean_output:
+                return mean_latency * output_tokens / mean_output
+            if mean_latency:
+                return mean_latency
+        profile = self.profile(model_name)
+        return profile["first_token_seconds"] + output_tokens / profile["output_tokens_per_second"]
+
+
+_estimator = None
+
+def get_token_estimator():
+    """
+    获取进程内共享的token估计器
+
+    Returns:
+        TokenEstimator: 共享的token估计器
+    """
+    global _estimator
+    if _estimator is None:
+        _estimator = TokenEstimator()
+    return _estimator
+
+
+def estimate_tokens(text, model_name=None):
+    """
+    估计文本token数的快捷函数
+
+    Args:
+        text (str): 文本
+        model_name (str, optional): 模型ID
+
+    Returns:
+        int: 估计的token数
+    """
+    return get_token_estimator().estimate(text, model_name)
@@ -8,9 +8,10 @@
 import os
 import logging
 import json
-from dotenv import load_dotenv
 from pathlib import Path
 
+from src.exam_layout import get_exam_layout
+
 def setup_logging(log_level="info"):
     """
     设置日志记录级别和格式。
@@ -45,7 +46,8 @@ def load_api_key():
     Returns:
         str: OpenRouter API密钥
     """
-    load_dotenv()
+    from src.model_config import load_env
+    load_env()
     api_key = os.getenv("OPENROUTER_API_KEY")
     
     if not api_key:
@@ -143,33 +145,15 @@ def make_output_path(input_path, output_dir, ext=".csv"):
     name_without_ext = os.path.splitext(basename)[0]
     return os.path.join(output_dir, f"{name_without_ext}{ext}")
 
-def get_question_type(question_number):
+def get_question_type(question_number, exam_type=None):
     """
     根据题号确定题型。
     
     Args:
         question_number (int): 题号(1-52)
+        exam_type (str, optional): 考试类型
     
     Returns:
         str: 题型描述
     """
-    if 1 <= question_number <= 20:
-        return "完形填空"
-    elif 21 <= question_number <= 25:
-        return "阅读 Text 1"
-    elif 26 <= question_number <= 30:
-        return "阅读 Text 2"
-    elif 31 <= question_number <= 35:
-        return "阅读 Text 3"
-    elif 36 <= question_number <= 40:
-        return "阅读 Text 4"
-    elif 41 <= question_number <= 45:
-        return "新题型"
-    elif 46 <= question_number <= 50:
-        return "翻译"
-    elif question_number == 51:
-        return "写作A"
-    elif question_number == 52:
-        return "写作B"
-    else:
-        return "未知题型" 
\ No newline at end of file
+    return get_exam_layout(exam_type).label(question_number) 
\ No newline at end of file
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+监视目录模块，持续监视输入目录并处理新到达或被修改的真题文件。
+
+Linux下通过inotify（ctypes调用libc，无需额外依赖）接收文件事件，
+不可用时退回到定时轮询。文件写入稳定后才会加入处理队列；已处理文件的
+签名（修改时间、大小）保存在状态文件中，重启后不会重复处理。
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import fnmatch
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("考研英语真题处理.watcher")
+
+# inotify事件掩码（见<sys/inotify.h>）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+
+# Word等程序打开文档时生成的临时文件
+IGNORED_PREFIXES = ("~$", ".~", ".")
+
+
+class InotifyBackend:
+    """
+    基于inotify的目录事件源（仅Linux）。
+    """
+
+    def __init__(self, directory):
+        """
+        初始化inotify监视
+
+        Args:
+            directory (str): 监视的目录
+
+        Raises:
+            OSError: 当前平台不支持inotify或初始化失败
+        """
+        import ctypes
+        import ctypes.util
+        import select
+
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify仅在Linux下可用")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1失败")
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"无法监视目录: {directory}")
+        self._poll = select.poll()
+        self._poll.register(self._fd, select.POLLIN)
+
+    def wait(self, timeout):
+        """
+        等待文件事件
+
+        Args:
+            timeout (float): 最长等待时间（秒）
+
+        Returns:
+            set: 发生变化的文件名集合
+        """
+        import struct
+
+        names = set()
+        if not self._poll.poll(int(timeout * 1000)):
+            return names
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+
+        # struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+        offset = 0
+        while offset + 16 <= len(data):
+            _, _, _, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+            if name:
+                names.add(os.fsdecode(name))
+            offset += 16 + length
+        return names
+
+    def close(self):
+        """关闭inotify文件描述符"""
+        os.close(self._fd)
+
+
+class PollingBackend:
+    """
+    基于定时扫描的目录事件源，inotify不可用时使用。
+    """
+
+    def __init__(self, directory, interval=2.0):
+        """
+        初始化轮询
+
+        Args:
+            directory (str): 监视的目录
+            interval (float): 扫描间隔（秒）
+        """
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        """返回目录中文件的(修改时间, 大小)快照"""
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout):
+        """
+        等待下一次扫描并返回变化的文件
+
+        Args:
+            timeout (float): 最长等待时间（秒）
+
+        Returns:
+            set: 新增或发生变化的文件名集合
+        """
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {name for name, sig in snapshot.items() if self._snapshot.get(name) != sig}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class FolderWatcher:
+    """
+    监视输入目录，把新到达或被修改的文件交给处理函数。
+    """
+
+    def __init__(self, input_dir, handler, file_pattern="*.docx;*.txt", workers=1,
+                 settle_time=1.0, poll_interval=2.0, state_path=None, use_inotify=True):
+        """
+        初始化目录监视器
+
+        Args:
+            input_dir (str): 监视的输入目录
+            handler (callable): 处理函数，参数为文件路径，返回是否处理成功
+            file_pattern (str): 文件匹配模式，多个模式用分号分隔
+            workers (int): 同时处理的文件数
+            settle_time (float): 文件大小保持不变多长时间（秒）后才认为写入完成
+            poll_interval (float): 轮询模式下的扫描间隔（秒）
+            state_path (str, optional): 已处理文件状态的保存路径，默认为输入目录下的.watch_state.json
+            use_inotify (bool): 是否优先使用inotify
+        """
+        self.input_dir = input_dir
+        self.handler = handler
+        self.patterns = [p.strip() for p in file_pattern.split(';') if p.strip()]
+        self.workers = max(1, workers)
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.state_path = state_path or os.path.join(input_dir, ".watch_state.json")
+        self.use_inotify = use_inotify
+
+        self._state = self._load_state()
+        self._state_lock = threading.Lock()
+        self._pending = {}       # 文件名 -> 最近一次看到变化的时间
+        self._inflight = set()
+        self._rerun = set()      # 处理期间再次发生变化的文件
+        self._signature_at_seen = {}
+
+    def _load_state(self):
+        """读取已处理文件的签名"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        """保存已处理文件的签名（原子替换）"""
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _matches(self, name):
+        """判断文件名是否需要处理"""
+        if name.startswith(IGNORED_PREFIXES):
+            return False
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def _signature(self, name):
+        """返回文件签名[修改时间, 大小]，文件不存在时返回None"""
+        try:
+            stat = os.stat(os.path.join(self.input_dir, name))
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _is_processed(self, name):
+        """判断文件当前版本是否已处理过"""
+        with self._state_lock:
+            return self._state.get(name) == self._signature(name)
+
+    def _backend(self):
+        """创建事件源：优先inotify，失败时退回轮询"""
+        if self.use_inotify:
+            try:
+                backend = InotifyBackend(self.input_dir)
+                logger.info("使用inotify监视目录")
+                return backend
+            except OSError as e:
+                logger.warning(f"inotify不可用（{str(e)}），改用轮询")
+        logger.info(f"使用轮询监视目录，间隔 {self.poll_interval} 秒")
+        return PollingBackend(self.input_dir, self.poll_interval)
+
+    def _run_handler(self, name, signature):
+        """在线程中处理一个文件并记录结果"""
+        path = os.path.join(self.input_dir, name)
+        try:
+            success = self.handler(path)
+        except Exception as e:
+            logger.error(f"处理文件 {name} 时出错: {str(e)}", exc_info=True)
+            success = False
+
+        with self._state_lock:
+            self._inflight.discard(name)
+            if success:
+                self._state[name] = signature
+                self._save_state()
+            rerun = name in self._rerun
+            self._rerun.discard(name)
+        if rerun:
+            self._pending[name] = time.time()
+        logger.info(f"{'✅' if success else '❌'} {name} 处理{'完成' if success else '失败'}")
+
+    def _dispatch_ready(self, executor):
+        """将写入已稳定的文件提交处理"""
+        now = time.time()
+        for name, seen_at in list(self._pending.items()):
+            if now - seen_at < self.settle_time:
+                continue
+            signature = self._signature(name)
+            if signature is None:
+                del self._pending[name]
+                continue
+            # 文件在稳定期内仍在变化（大小或修改时间不同），继续等待
+            if signature != self._signature_at_seen.get(name):
+                self._signature_at_seen[name] = signature
+                self._pending[name] = now
+                continue
+            del self._pending[name]
+            with self._state_lock:
+                if self._state.get(name) == signature:
+                    continue
+                if name in self._inflight:
+                    self._rerun.add(name)
+                    continue
+                self._inflight.add(name)
+            logger.info(f"加入处理队列: {name}")
+            executor.submit(self._run_handler, name, signature)
+
+    def _mark(self, name):
+        """记录文件发生了变化"""
+        if self._matches(name):
+            self._pending[name] = time.time()
+            self._signature_at_seen[name] = self._signature(name)
+
+    def run(self, stop_event=None):
+        """
+        开始监视，直到stop_event被设置或收到KeyboardInterrupt
+
+        Args:
+            stop_event (threading.Event, optional): 停止信号
+        """
+        stop_event = stop_event or threading.Event()
+        backend = self._backend()
+
+        # 启动时处理目录中尚未处理过的文件
+        for name in sorted(os.listdir(self.input_dir)):
+            if self._matches(name) and not self._is_processed(name):
+                self._mark(name)
+
+        logger.info(f"开始监视目录: {self.input_dir}（匹配: {';'.join(self.patterns)}）")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while not stop_event.is_set():
+                    timeout = self.settle_time / 2 if self._pending else 1.0
+                    for name in backend.wait(timeout):
+                        self._mark(name)
+                    self._dispatch_ready(executor)
+            except KeyboardInterrupt:
+                logger.info("收到中断信号，等待进行中的文件处理完成...")
+            finally:
+                backend.close()